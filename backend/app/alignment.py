@@ -0,0 +1,117 @@
+"""序列对齐模块 - 以带宽受限的编辑距离对齐提交与参照的数字组序列"""
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 编辑操作: (类型, 参照下标, 提交下标)
+# - mismatch: 参照第 i 组与提交第 j 组对应但值不同
+# - missing: 参照第 i 组在提交中缺失，j 为其应在的提交位置（下一个提交组的下标）
+# - extra: 提交第 j 组在参照中不存在，i 为其所在的参照位置（下一个参照组的下标）
+Edit = Tuple[str, int, int]
+
+
+def _common_run(reference: np.ndarray, submitted: np.ndarray, i: int, j: int) -> int:
+    """
+    reference[i:] 与 submitted[j:] 的公共前缀长度
+
+    先逐个比较前几组（多数对角线在此即遇到不同），较长的相同区段再分块向量化比较，块长逐次放大
+    """
+    limit = min(len(reference) - i, len(submitted) - j)
+    done = 0
+    while done < min(limit, 8):
+        if reference[i + done] != submitted[j + done]:
+            return done
+        done += 1
+    chunk = 32
+    while done < limit:
+        end = min(done + chunk, limit)
+        diff = np.flatnonzero(reference[i + done:i + end] != submitted[j + done:j + end])
+        if len(diff):
+            return done + int(diff[0])
+        done = end
+        chunk *= 4
+    return limit
+
+
+def align_groups(
+    reference: np.ndarray,
+    submitted: np.ndarray,
+    max_edits: int
+) -> Optional[List[Edit]]:
+    """
+    求最少编辑操作（替换、缺失、多余各计1）的对齐
+
+    采用对角线延伸算法（Landau-Vishkin）：第 e 轮只计算对角线 -e..e 上
+    以 e 次编辑能到达的最远位置，并沿对角线跳过相同的连续组。
+    耗时约为 O(e² + 序列长度)，两序列相近时接近线性；编辑数超过上限即放弃
+
+    Args:
+        reference: 参照各组的值（一维数组）
+        submitted: 提交各组的值（一维数组）
+        max_edits: 编辑数上限
+
+    Returns:
+        按位置排列的编辑操作列表，编辑数超过上限时返回None
+    """
+    n, m = len(reference), len(submitted)
+    target = m - n
+    if abs(target) > max_edits:
+        return None
+
+    def common_run(i: int, j: int) -> int:
+        return _common_run(reference, submitted, i, j)
+
+    # 对角线 d = j - i；furthest[d] 为当前编辑数下对角线 d 上能到达的最远参照下标
+    furthest = {0: common_run(0, 0)}
+    # 每轮各对角线的来源操作及延伸前的参照下标，用于回溯
+    history = [{0: (None, 0)}]
+
+    edits = 0
+    while furthest.get(target) != n:
+        edits += 1
+        if edits > max_edits:
+            return None
+
+        previous = furthest
+        furthest = {}
+        steps = {}
+        # 从对角线 d 到达终点至少还需 |target - d| 次编辑，超出上限的对角线不再计算
+        slack = max_edits - edits
+        for d in range(max(-edits, -n, target - slack), min(edits, m, target + slack) + 1):
+            best, op = -1, None
+            # 替换：参照与提交各前进一组
+            i = previous.get(d)
+            if i is not None and i < n and i + d < m:
+                best, op = i + 1, "mismatch"
+            # 缺失：参照前进一组
+            i = previous.get(d + 1)
+            if i is not None and i < n and i + 1 > best:
+                best, op = i + 1, "missing"
+            # 多余：提交前进一组
+            i = previous.get(d - 1)
+            if i is not None and i + d <= m and i > best:
+                best, op = i, "extra"
+            if op is None:
+                continue
+            furthest[d] = best + common_run(best, best + d)
+            steps[d] = (op, best)
+        history.append(steps)
+
+    # 从终点回溯编辑操作
+    result = []
+    d = target
+    for steps in reversed(history[1:]):
+        op, i = steps[d]
+        if op == "mismatch":
+            result.append((op, i - 1, i - 1 + d))
+        elif op == "missing":
+            result.append((op, i - 1, i + d))
+            d += 1
+        else:
+            result.append((op, i, i + d - 1))
+            d -= 1
+    result.reverse()
+    return result
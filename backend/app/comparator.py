@@ -1,132 +1,236 @@
 """报文比对模块 - 比对提交内容与标准参照"""
 import logging
+from dataclasses import dataclass
 from typing import List, Tuple
-from .models import MessageContent, MessageGroup, ErrorDetail
+
+import numpy as np
+
+from .models import MessageContent, ErrorDetail
+from .group_table import GroupTable
+from .alignment import Edit, align_groups
+from .config import COMPARE_ALIGN, COMPARE_ALIGN_MAX_EDITS
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class GroupDiff:
+    """比对结果（各下标数组按位置升序）"""
+    mismatched: np.ndarray            # 值不一致的参照组下标
+    mismatched_submitted: np.ndarray  # 与之对应的提交组下标
+    missing: np.ndarray               # 提交内容缺失的参照组下标
+    missing_at: np.ndarray            # 缺失组应在的提交位置
+    extra: np.ndarray                 # 提交内容多余的组下标（提交中的下标）
+    extra_at: np.ndarray              # 多余组所在的参照位置
+    total_groups: int                 # 参照总组数
+    aligned: bool = False             # 是否经序列对齐（否则为逐位置比对）
+    
+    @property
+    def error_count(self) -> int:
+        return len(self.mismatched) + len(self.missing) + len(self.extra)
+
+
+def _positional_diff(sub_codes: np.ndarray, ref_codes: np.ndarray, identical: bool) -> GroupDiff:
+    """按全局索引逐位置比对：公共部分一次向量化比较，长度差部分为缺失/多余"""
+    total_groups = len(ref_codes)
+    submitted_count = len(sub_codes)
+    common = min(total_groups, submitted_count)
+    if identical:
+        mismatched = np.empty(0, dtype=np.int64)
+    else:
+        mismatched = np.flatnonzero(sub_codes[:common] != ref_codes[:common])
+    missing = np.arange(submitted_count, total_groups)
+    extra = np.arange(total_groups, submitted_count)
+    return GroupDiff(
+        mismatched=mismatched,
+        mismatched_submitted=mismatched,
+        missing=missing,
+        missing_at=np.full(len(missing), submitted_count),
+        extra=extra,
+        extra_at=np.full(len(extra), total_groups),
+        total_groups=total_groups
+    )
+
+
+def _aligned_diff(edits: List[Edit], total_groups: int) -> GroupDiff:
+    """由对齐的编辑操作生成比对结果"""
+    pairs = {"mismatch": ([], []), "missing": ([], []), "extra": ([], [])}
+    for op, i, j in edits:
+        refs, subs = pairs[op]
+        refs.append(i)
+        subs.append(j)
+    
+    def as_array(values):
+        return np.array(values, dtype=np.int64)
+    
+    return GroupDiff(
+        mismatched=as_array(pairs["mismatch"][0]),
+        mismatched_submitted=as_array(pairs["mismatch"][1]),
+        missing=as_array(pairs["missing"][0]),
+        missing_at=as_array(pairs["missing"][1]),
+        extra=as_array(pairs["extra"][1]),
+        extra_at=as_array(pairs["extra"][0]),
+        total_groups=total_groups,
+        aligned=True
+    )
+
+
+def diff_tables(
+    submitted: GroupTable,
+    reference: GroupTable,
+    raw: bool = False,
+    max_edits: int = 0
+) -> GroupDiff:
+    """
+    比对两份报文的数字组
+    
+    两份报文的值缓冲区各视为一个定长字符串数组（不复制数据），先一次向量化比较
+    得到逐位置的不一致掩码，长度差部分直接给出缺失/多余区间。
+    允许对齐时，若逐位置比对有多处错误，再以序列对齐（见 align_groups）查找
+    错误更少的对应关系：漏抄或多抄一组只计一处错误，不使其后各组整体错位
+    
+    Args:
+        submitted: 提交内容的数字组表
+        reference: 参照标准的数字组表
+        raw: 是否比较提交内容易混字符修正前的原始值（默认比较解析时已修正的值）
+        max_edits: 序列对齐的编辑数上限，0表示只做逐位置比对
+        
+    Returns:
+        比对结果
+        
+    Raises:
+        ValueError: 两份报文的每组位数不同
+    """
+    if submitted.message_format.digits_per_group != reference.message_format.digits_per_group:
+        raise ValueError(
+            f"提交内容与参照的报文格式不一致: "
+            f"{submitted.message_format.spec} / {reference.message_format.spec}"
+        )
+    sub_digits = submitted.original_digits() if raw else submitted.digits
+    ref_digits = reference.digits
+    
+    sub_codes = GroupTable(sub_digits, message_format=submitted.message_format).codes()
+    ref_codes = reference.codes()
+    # 公共部分完全一致（常见情况）时免去逐组比较
+    width = min(len(sub_digits), len(ref_digits))
+    diff = _positional_diff(sub_codes, ref_codes, sub_digits[:width] == ref_digits[:width])
+    
+    # 对齐只在能减少错误数时采用，编辑数上限不超过逐位置比对的错误数
+    limit = min(max_edits, diff.error_count - 1)
+    if limit > 0:
+        edits = align_groups(ref_codes, sub_codes, limit)
+        if edits is not None:
+            diff = _aligned_diff(edits, diff.total_groups)
+    return diff
+
+
 class MessageComparator:
     """报文比对器"""
     
-    def __init__(self):
-        pass
+    def __init__(self, align: bool = COMPARE_ALIGN, max_edits: int = COMPARE_ALIGN_MAX_EDITS):
+        """
+        Args:
+            align: 是否按序列对齐比对（否则严格按全局索引逐位置比对）
+            max_edits: 序列对齐的编辑数上限，超过时退回逐位置比对
+        """
+        self.align = align
+        self.max_edits = max_edits
     
     def compare(
         self,
         submitted: MessageContent,
-        reference: MessageContent
+        reference: MessageContent,
+        raw: bool = False
     ) -> Tuple[List[ErrorDetail], int, int]:
         """
         比对提交内容与参照标准
         
+        由 diff_tables 求出出错位置，只为这些位置构建错误详情。
+        对齐比对时，多余的组按其在提交内容中的位置记录
+        
         Args:
             submitted: 提交的报文内容
             reference: 参照标准内容
+            raw: 是否比较提交内容易混字符修正前的原始值
             
         Returns:
             (错误列表, 总组数, 错误数)
         """
-        errors = []
-        total_groups = len(reference.groups)
-        
-        # 创建参照内容索引映射
-        ref_map = {g.global_index: g for g in reference.groups}
-        sub_map = {g.global_index: g for g in submitted.groups}
+        ref_table = reference.table
+        sub_table = submitted.table
+        diff = diff_tables(sub_table, ref_table, raw, self.max_edits if self.align else 0)
+        submitted_value = sub_table.raw_value if raw else sub_table.value
+        debug = logger.isEnabledFor(logging.DEBUG)
         
-        # 遍历参照内容进行比对
-        for idx in range(total_groups):
-            ref_group = ref_map.get(idx)
-            sub_group = sub_map.get(idx)
-            
-            if ref_group is None:
-                continue
-            
-            if sub_group is None:
-                # 提交内容缺失
-                error = ErrorDetail(
-                    segment=ref_group.segment,
-                    line=ref_group.line,
-                    position=ref_group.position,
-                    global_index=ref_group.global_index,
-                    submitted_value="(缺失)",
-                    correct_value=ref_group.value,
-                    error_type="missing"
-                )
-                errors.append(error)
-                logger.debug(f"缺失: 位置 {ref_group.segment}-{ref_group.line}-{ref_group.position}")
-            
-            elif self._normalize_value(sub_group.value) != self._normalize_value(ref_group.value):
-                # 内容不匹配
-                error = ErrorDetail(
-                    segment=ref_group.segment,
-                    line=ref_group.line,
-                    position=ref_group.position,
-                    global_index=ref_group.global_index,
-                    submitted_value=sub_group.value,
-                    correct_value=ref_group.value,
-                    error_type="mismatch"
-                )
-                errors.append(error)
+        errors = []
+        # 不匹配
+        # 每个错误的排序键: (参照位置, 提交位置)
+        order = []
+        for (idx, segment, line, position), sub_idx in zip(
+            self._locate(ref_table, diff.mismatched), diff.mismatched_submitted.tolist()
+        ):
+            errors.append(ErrorDetail(
+                segment=segment,
+                line=line,
+                position=position,
+                global_index=idx,
+                submitted_value=submitted_value(sub_idx),
+                correct_value=ref_table.value(idx),
+                error_type="mismatch"
+            ))
+            order.append((idx, sub_idx))
+            if debug:
                 logger.debug(
-                    f"错误: 位置 {ref_group.segment}-{ref_group.line}-{ref_group.position}, "
-                    f"提交:{sub_group.value}, 正确:{ref_group.value}"
+                    f"错误: 位置 {segment}-{line}-{position}, "
+                    f"提交:{submitted_value(sub_idx)}, 正确:{ref_table.value(idx)}"
                 )
         
-        # 检查多余内容
-        for idx in sub_map:
-            if idx >= total_groups:
-                sub_group = sub_map[idx]
-                error = ErrorDetail(
-                    segment=sub_group.segment,
-                    line=sub_group.line,
-                    position=sub_group.position,
-                    global_index=sub_group.global_index,
-                    submitted_value=sub_group.value,
-                    correct_value="(多余)",
-                    error_type="extra"
-                )
-                errors.append(error)
+        # 提交内容缺失
+        for (idx, segment, line, position), sub_idx in zip(
+            self._locate(ref_table, diff.missing), diff.missing_at.tolist()
+        ):
+            errors.append(ErrorDetail(
+                segment=segment,
+                line=line,
+                position=position,
+                global_index=idx,
+                submitted_value="(缺失)",
+                correct_value=ref_table.value(idx),
+                error_type="missing"
+            ))
+            order.append((idx, sub_idx))
+            if debug:
+                logger.debug(f"缺失: 位置 {segment}-{line}-{position}")
         
-        # 按位置排序错误
-        errors.sort(key=lambda e: e.global_index)
+        # 多余内容
+        for (idx, segment, line, position), ref_idx in zip(
+            self._locate(sub_table, diff.extra), diff.extra_at.tolist()
+        ):
+            errors.append(ErrorDetail(
+                segment=segment,
+                line=line,
+                position=position,
+                global_index=idx,
+                submitted_value=submitted_value(idx),
+                correct_value="(多余)",
+                error_type="extra"
+            ))
+            order.append((ref_idx, idx))
         
+        # 逐位置比对时三类错误的下标区间依次递增，已按位置排列；对齐比对时按对齐顺序重排
+        if diff.aligned:
+            errors = [errors[k] for k in sorted(range(len(errors)), key=order.__getitem__)]
         error_count = len(errors)
-        logger.info(f"比对完成: 总组数 {total_groups}, 错误数 {error_count}")
+        logger.info(f"比对完成: 总组数 {diff.total_groups}, 错误数 {error_count}")
         
-        return errors, total_groups, error_count
+        return errors, diff.total_groups, error_count
     
-    def _normalize_value(self, value: str) -> str:
-        """
-        标准化值以进行比较
-        处理OCR可能的识别误差
-        """
-        # 移除空格
-        normalized = value.strip().replace(' ', '')
-        
-        # 常见OCR错误修正映射
-        ocr_corrections = {
-            'O': '0',  # 字母O -> 数字0
-            'o': '0',
-            'l': '1',  # 小写L -> 数字1
-            'I': '1',  # 大写I -> 数字1
-            'Z': '2',  # 有时Z被误认为2
-            'S': '5',  # S -> 5
-            's': '5',
-            'B': '8',  # B -> 8
-            'G': '6',  # G -> 6
-            'g': '9',  # g -> 9
-            'q': '9',  # q -> 9
-        }
-        
-        result = ''
-        for char in normalized:
-            if char in ocr_corrections:
-                result += ocr_corrections[char]
-            else:
-                result += char
-        
-        return result
+    @staticmethod
+    def _locate(table: GroupTable, indexes):
+        """逐个给出指定组的 (全局索引, 段号, 行号, 组位置)"""
+        indexes = np.asarray(indexes, dtype=np.int64)
+        segments, lines, positions = table.locations(indexes)
+        return zip(indexes.tolist(), segments.tolist(), lines.tolist(), positions.tolist())
     
     def compare_with_tolerance(
         self,
@@ -145,29 +249,8 @@ class MessageComparator:
         Returns:
             (错误列表, 总组数, 错误数)
         """
-        if allow_ocr_correction:
-            # 先尝试OCR修正
-            corrected_groups = []
-            for group in submitted.groups:
-                corrected_value = self._normalize_value(group.value)
-                corrected_group = MessageGroup(
-                    segment=group.segment,
-                    line=group.line,
-                    position=group.position,
-                    value=corrected_value,
-                    global_index=group.global_index
-                )
-                corrected_groups.append(corrected_group)
-            
-            corrected_submitted = MessageContent(
-                header=submitted.header,
-                groups=corrected_groups,
-                raw_text=submitted.raw_text
-            )
-            
-            return self.compare(corrected_submitted, reference)
-        
-        return self.compare(submitted, reference)
+        # 易混字符已在解析时修正，这里只选择比较修正后的值还是原始值
+        return self.compare(submitted, reference, raw=not allow_ocr_correction)
 
 
 def create_comparator() -> MessageComparator:
@@ -6,21 +6,113 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent.parent
 UPLOAD_DIR = BASE_DIR / "uploads"
 TEMPLATE_DIR = BASE_DIR / "templates"
+CACHE_DIR = BASE_DIR / "cache"
+REFERENCE_DIR = BASE_DIR / "references"
+DATA_DIR = BASE_DIR / "data"
 
 # 确保目录存在
 UPLOAD_DIR.mkdir(exist_ok=True)
+CACHE_DIR.mkdir(exist_ok=True)
+REFERENCE_DIR.mkdir(exist_ok=True)
+DATA_DIR.mkdir(exist_ok=True)
 
 # OCR配置
 OCR_LANG = "ch"  # 中文识别
 USE_GPU = False  # Docker环境默认不使用GPU
+OCR_DPI = 300     # PDF渲染分辨率
+# 直接渲染为单通道灰度图（后续预处理、区域检测均使用灰度图），关闭时按RGB渲染后转换
+OCR_RENDER_GRAY = os.getenv("OCR_RENDER_GRAY", "true").lower() == "true"
 
-# 报文格式配置
+# 自适应多分辨率识别：先以低分辨率识别整页，仅对置信度或数字数不足的行以高分辨率重新识别
+OCR_ADAPTIVE = os.getenv("OCR_ADAPTIVE", "false").lower() == "true"
+OCR_LOW_DPI = int(os.getenv("OCR_LOW_DPI", 150))
+OCR_ESCALATE_CONFIDENCE = float(os.getenv("OCR_ESCALATE_CONFIDENCE", 0.9))
+
+# 图像预处理预设: full（二值化+NLM去噪）, adaptive（按图像质量跳过去噪）, fast, morph, none
+OCR_PREPROCESS_PRESET = os.getenv("OCR_PREPROCESS_PRESET", "full")
+
+# 置信度低于该值的文本框/单元格放大、强去噪后二次识别，0表示关闭
+OCR_REFINE_CONFIDENCE = float(os.getenv("OCR_REFINE_CONFIDENCE", 0.8))
+
+# OCR易混字符修正：解析报文主体时先将易混字母替换为数字再分组，
+# 格式为逗号分隔的 "识别字符:数字"，为空表示不修正
+OCR_CONFUSION_MAP = os.getenv("OCR_CONFUSION_MAP", "O:0,o:0,l:1,I:1,Z:2,S:5,s:5,B:8,G:6,g:9,q:9")
+
+# 页面文本层中至少有这么多行数字组（每行不少于3组）时直接采用文本层，否则该页走OCR
+OCR_TEXT_LAYER_MIN_ROWS = int(os.getenv("OCR_TEXT_LAYER_MIN_ROWS", 3))
+
+# 表格区域检测在按该比例缩小的图像上进行，结果再映射回原分辨率
+OCR_REGION_DETECT_SCALE = float(os.getenv("OCR_REGION_DETECT_SCALE", 0.25))
+
+# 版面识别模式: detect（整页文本检测+按行分组）, grid（按表格线切分单元格，跳过检测直接批量识别）
+OCR_LAYOUT_MODE = os.getenv("OCR_LAYOUT_MODE", "detect")
+
+# OCR引擎参数（主进程与OCR工作进程共用，保证识别结果一致）
+OCR_ENGINE_OPTIONS = {
+    "use_angle_cls": True,
+    "det_db_thresh": 0.3,
+    "det_db_box_thresh": 0.5,
+    # 网格模式下单元格直接送入识别器，使用更大的识别批量
+    "rec_batch_num": 30 if OCR_LAYOUT_MODE == "grid" else 6,
+}
+
+# OCR工作进程数，0表示在批阅线程中直接识别（不启用进程池）
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", 0))
+# 进程池分派粒度: document（整份文档分派给一个进程）, page（逐页分派，降低多页文档延迟）
+OCR_DISPATCH_MODE = os.getenv("OCR_DISPATCH_MODE", "document")
+# 未启用进程池时的页面并行线程数。各线程共用一个OCR引擎且识别调用串行，
+# 只有渲染与预处理并行；识别本身的页面并行需设置 OCR_WORKERS > 0 并使用 page 分派
+OCR_PAGE_WORKERS = int(os.getenv("OCR_PAGE_WORKERS", 1))
+
+# OCR结果缓存配置（按PDF内容哈希与OCR参数缓存识别结果）
+OCR_CACHE_ENABLED = os.getenv("OCR_CACHE_ENABLED", "true").lower() == "true"
+OCR_CACHE_DIR = CACHE_DIR / "ocr"
+OCR_CACHE_MAX_BYTES = int(os.getenv("OCR_CACHE_MAX_MB", 256)) * 1024 * 1024
+
+# 参照报文解析缓存条目数（按内容哈希缓存解析结果）
+REFERENCE_CACHE_SIZE = int(os.getenv("REFERENCE_CACHE_SIZE", 64))
+
+# 报文格式配置（标准格式 standard）
 DIGITS_PER_GROUP = 4      # 每组4个数字
 GROUPS_PER_LINE = 10      # 每行10组
 LINES_PER_SEGMENT = 10    # 每段10行
 SEGMENTS_COUNT = 3        # 通常3段
 TOTAL_GROUPS = GROUPS_PER_LINE * LINES_PER_SEGMENT * SEGMENTS_COUNT  # 300组
 
+# 默认报文格式：格式名，或 "每组位数x每行组数x每段行数x段数" 格式串（如 "4x10x10x30"），可按请求另行指定
+MESSAGE_FORMAT = os.getenv("MESSAGE_FORMAT", "standard")
+# 自定义格式名，逗号分隔的 "名称=格式串"，如 "long=4x10x10x30,five=5x10x10x3"
+MESSAGE_FORMATS = os.getenv("MESSAGE_FORMATS", "")
+
+# 比对配置：按序列对齐比对（漏抄、多抄一组只计一处错误，不使后续各组整体错位），
+# 编辑数超过上限时退回逐位置比对
+COMPARE_ALIGN = os.getenv("COMPARE_ALIGN", "true").lower() == "true"
+COMPARE_ALIGN_MAX_EDITS = int(os.getenv("COMPARE_ALIGN_MAX_EDITS", 100))
+
+# 启动时预热OCR引擎（加载模型并执行一次识别），预热完成前 /ready 返回503
+OCR_WARMUP = os.getenv("OCR_WARMUP", "false").lower() == "true"
+OCR_WARMUP_TIMEOUT = float(os.getenv("OCR_WARMUP_TIMEOUT", 600))              # 单次预热等待工作进程就绪的最长秒数
+OCR_WARMUP_RETRY_INTERVAL = float(os.getenv("OCR_WARMUP_RETRY_INTERVAL", 30))  # 预热失败后的重试间隔（秒），0表示不重试
+
+# 批阅任务队列配置
+REVIEW_WORKERS = int(os.getenv("REVIEW_WORKERS", 2))  # 同时执行的批阅任务数
+REVIEW_BATCH_MAX_FILES = int(os.getenv("REVIEW_BATCH_MAX_FILES", 200))  # 批量批阅单次最多PDF数
+
+# 批阅结果数据库（SQLite）
+RESULT_DB_PATH = Path(os.getenv("RESULT_DB_PATH", str(DATA_DIR / "reviews.db")))
+
+# 上传大小限制（与前端nginx的 client_max_body_size 一致）与分块大小
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_MB", 50)) * 1024 * 1024
+UPLOAD_ZIP_MAX_BYTES = int(os.getenv("UPLOAD_ZIP_MAX_MB", 500)) * 1024 * 1024  # 批量批阅的zip压缩包
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# 上传文件登记与清理
+UPLOAD_REGISTRY_PATH = Path(os.getenv("UPLOAD_REGISTRY_PATH", str(DATA_DIR / "uploads.db")))
+UPLOAD_TTL_HOURS = float(os.getenv("UPLOAD_TTL_HOURS", 24))        # 上传文件超过该时间未访问即清理
+UPLOAD_QUOTA_MB = int(os.getenv("UPLOAD_QUOTA_MB", 2048))          # 上传目录总大小上限
+REPORT_TTL_MINUTES = float(os.getenv("REPORT_TTL_MINUTES", 60))    # 报告文件保留时间（可随时重新生成）
+UPLOAD_SWEEP_INTERVAL = int(os.getenv("UPLOAD_SWEEP_INTERVAL", 600))  # 清理间隔（秒）
+
 # 评分配置
 TOTAL_SCORE = 100         # 总分100分
 DEDUCT_PER_ERROR = 1      # 每错误扣1分
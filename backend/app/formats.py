@@ -0,0 +1,135 @@
+"""报文格式模块 - 每组位数、每行组数、每段行数与段数构成的报文格式"""
+import logging
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from .config import (
+    DIGITS_PER_GROUP, GROUPS_PER_LINE, LINES_PER_SEGMENT, SEGMENTS_COUNT,
+    MESSAGE_FORMAT, MESSAGE_FORMATS
+)
+
+logger = logging.getLogger(__name__)
+
+# 格式串: 每组位数x每行组数x每段行数x段数
+_SPEC_PATTERN = re.compile(r'\s*(\d+)\s*[xX×*]\s*(\d+)\s*[xX×*]\s*(\d+)\s*[xX×*]\s*(\d+)\s*')
+
+
+@dataclass(frozen=True)
+class MessageFormat:
+    """
+    报文格式
+
+    报文主体每 digits_per_group 个字符为一组，每行 groups_per_line 组，
+    每 lines_per_segment 行为一段，共 segments 段。段数只用于给出应有组数，
+    解析时不限制段数
+    """
+    name: str
+    digits_per_group: int
+    groups_per_line: int
+    lines_per_segment: int
+    segments: int
+
+    def __post_init__(self):
+        for field in ('digits_per_group', 'groups_per_line', 'lines_per_segment', 'segments'):
+            if getattr(self, field) <= 0:
+                raise ValueError(f"报文格式 {self.name} 的 {field} 须为正整数")
+
+    @property
+    def spec(self) -> str:
+        """格式串，如 "4x10x10x3"（可由 get_format 还原）"""
+        return (
+            f"{self.digits_per_group}x{self.groups_per_line}"
+            f"x{self.lines_per_segment}x{self.segments}"
+        )
+
+    @property
+    def digits_per_line(self) -> int:
+        return self.digits_per_group * self.groups_per_line
+
+    @property
+    def total_groups(self) -> int:
+        """应有组数"""
+        return self.groups_per_line * self.lines_per_segment * self.segments
+
+
+STANDARD_FORMAT = MessageFormat(
+    "standard", DIGITS_PER_GROUP, GROUPS_PER_LINE, LINES_PER_SEGMENT, SEGMENTS_COUNT
+)
+
+
+def parse_format_spec(spec: str, name: Optional[str] = None) -> MessageFormat:
+    """
+    解析格式串
+
+    Args:
+        spec: "每组位数x每行组数x每段行数x段数"，如 "4x10x10x30"
+        name: 格式名，为空时以规范化的格式串为名
+
+    Returns:
+        报文格式
+
+    Raises:
+        ValueError: 格式串错误
+    """
+    match = _SPEC_PATTERN.fullmatch(spec)
+    if not match:
+        raise ValueError(
+            f"报文格式错误: {spec!r}，应为格式名或 \"每组位数x每行组数x每段行数x段数\"（如 \"4x10x10x3\"）"
+        )
+    values = [int(v) for v in match.groups()]
+    return MessageFormat(name or "x".join(map(str, values)), *values)
+
+
+def parse_format_registry(spec: str) -> Dict[str, MessageFormat]:
+    """
+    解析自定义格式名配置
+
+    Args:
+        spec: 逗号分隔的 "名称=格式串"
+
+    Returns:
+        格式名 -> 报文格式（含标准格式 standard）
+
+    Raises:
+        ValueError: 配置格式错误
+    """
+    formats = {STANDARD_FORMAT.name: STANDARD_FORMAT}
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, value = item.partition('=')
+        name = name.strip()
+        if not sep or not name:
+            raise ValueError(f"自定义报文格式配置错误: {item!r}，应为 \"名称=格式串\"")
+        formats[name] = parse_format_spec(value, name)
+    return formats
+
+
+FORMATS = parse_format_registry(MESSAGE_FORMATS)
+
+
+def get_format(name: Optional[str] = None) -> MessageFormat:
+    """
+    按格式名或格式串取得报文格式
+
+    Args:
+        name: 已登记的格式名（standard 及 MESSAGE_FORMATS 中的名称），
+              或 "4x10x10x3" 形式的格式串；为空时取默认格式 MESSAGE_FORMAT
+
+    Returns:
+        报文格式
+
+    Raises:
+        ValueError: 未知的格式名或格式串错误
+    """
+    if name is None:
+        name = MESSAGE_FORMAT
+    name = name.strip()
+    if name in FORMATS:
+        return FORMATS[name]
+    return parse_format_spec(name)
+
+
+DEFAULT_FORMAT = get_format()
@@ -0,0 +1,267 @@
+"""数字组存储模块 - 以连续字符缓冲区紧凑存储报文数字组"""
+import math
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from .formats import DEFAULT_FORMAT, STANDARD_FORMAT, MessageFormat
+
+
+class GroupTable:
+    """
+    报文数字组的紧凑存储
+
+    - 各组的值依次拼接为一个定长字符缓冲区（每组为报文格式的 digits_per_group 个字符，
+      标准格式第 i 组为 digits[i * 4:(i + 1) * 4]），组的全局索引即其下标
+    - 行结构只记录每行第一组的下标；段号、行号、组位置由行号按报文格式算术推出
+      （第 r 行: 段 r // lines_per_segment + 1，行 r % lines_per_segment + 1）
+    - 识别置信度为 float64 数组（未知为NaN），参照报文为None
+    - 解析时修正过易混字符的，raw_digits 保存修正前的原始值（与 digits 等长），
+      未修正任何字符时为None
+
+    解析与比对全程使用本结构，MessageGroup 对象只在需要输出时按需生成
+    """
+
+    __slots__ = ("digits", "line_starts", "confidence", "raw_digits", "message_format")
+
+    def __init__(
+        self,
+        digits: str = "",
+        line_starts: Optional[np.ndarray] = None,
+        confidence: Optional[np.ndarray] = None,
+        raw_digits: Optional[str] = None,
+        message_format: MessageFormat = DEFAULT_FORMAT
+    ):
+        width = message_format.digits_per_group
+        if len(digits) % width:
+            raise ValueError(f"数字组缓冲区长度须为 {width} 的整数倍: {len(digits)}")
+        if raw_digits is not None and len(raw_digits) != len(digits):
+            raise ValueError("原始值缓冲区长度须与数字组缓冲区一致")
+        self.digits = digits
+        self.line_starts = (
+            np.asarray(line_starts, dtype=np.int64) if line_starts is not None
+            else np.empty(0, dtype=np.int64)
+        )
+        self.confidence = confidence
+        self.raw_digits = raw_digits
+        self.message_format = message_format
+
+    def __len__(self) -> int:
+        return len(self.digits) // self.message_format.digits_per_group
+
+    def value(self, index: int) -> str:
+        """第 index 组的值"""
+        width = self.message_format.digits_per_group
+        return self.digits[index * width:(index + 1) * width]
+
+    def raw_value(self, index: int) -> str:
+        """第 index 组修正前的原始值"""
+        if self.raw_digits is None:
+            return self.value(index)
+        width = self.message_format.digits_per_group
+        return self.raw_digits[index * width:(index + 1) * width]
+
+    def original_digits(self) -> str:
+        """修正前的原始值缓冲区"""
+        return self.digits if self.raw_digits is None else self.raw_digits
+
+    def values(self) -> List[str]:
+        """所有组的值"""
+        width = self.message_format.digits_per_group
+        return [self.digits[i:i + width] for i in range(0, len(self.digits), width)]
+
+    def codes(self) -> np.ndarray:
+        """所有组的值构成的定长字符串数组（标准格式为 dtype <U4），用于向量化比较"""
+        width = self.message_format.digits_per_group
+        return np.frombuffer(self.digits.encode('utf-32-le'), dtype=f'<U{width}')
+
+    def rows(self) -> np.ndarray:
+        """每组所在的行（从0开始，跨段连续编号）"""
+        count = len(self)
+        if not len(self.line_starts):
+            return np.zeros(count, dtype=np.int64)
+        ends = np.append(self.line_starts[1:], count)
+        return np.repeat(np.arange(len(self.line_starts)), ends - self.line_starts)
+
+    def locations(self, indexes: Optional[np.ndarray] = None):
+        """
+        计算各组的段号、行号、组位置（均从1开始）
+
+        Args:
+            indexes: 组下标数组，为空时计算全部组
+
+        Returns:
+            (段号数组, 行号数组, 组位置数组)
+        """
+        if indexes is None:
+            indexes = np.arange(len(self))
+        rows = self.rows()[indexes]
+        lines_per_segment = self.message_format.lines_per_segment
+        segments = rows // lines_per_segment + 1
+        lines = rows % lines_per_segment + 1
+        positions = indexes - self.line_starts[rows] + 1 if len(rows) else rows
+        return segments, lines, positions
+
+    def confidence_at(self, index: int) -> Optional[float]:
+        """第 index 组的识别置信度，未知时为None"""
+        if self.confidence is None:
+            return None
+        value = float(self.confidence[index])
+        return None if math.isnan(value) else value
+
+    def to_groups(self) -> list:
+        """生成 MessageGroup 列表（用于接口输出与持久化）"""
+        from .models import MessageGroup
+
+        segments, lines, positions = self.locations()
+        return [
+            MessageGroup(
+                segment=segment,
+                line=line,
+                position=position,
+                value=self.value(index),
+                global_index=index,
+                confidence=self.confidence_at(index),
+                raw_value=self._changed_raw_value(index)
+            )
+            for index, (segment, line, position) in enumerate(
+                zip(segments.tolist(), lines.tolist(), positions.tolist())
+            )
+        ]
+
+    def _changed_raw_value(self, index: int) -> Optional[str]:
+        """修正前的原始值，未修正时为None"""
+        if self.raw_digits is None:
+            return None
+        raw = self.raw_value(index)
+        return raw if raw != self.value(index) else None
+
+    @classmethod
+    def from_groups(
+        cls,
+        groups: Sequence,
+        message_format: MessageFormat = STANDARD_FORMAT
+    ) -> "GroupTable":
+        """
+        由数字组列表构建（兼容旧格式数据）
+
+        Args:
+            groups: MessageGroup 或等价的字典列表，按全局索引排列
+            message_format: 报文格式（未记录格式的旧数据均为标准格式）
+        """
+        builder = GroupTableBuilder(message_format)
+        current_row = None
+        values, confidences, raw_values = [], [], []
+        for group in groups:
+            if not isinstance(group, dict):
+                group = group.model_dump()
+            row = (group["segment"] - 1) * message_format.lines_per_segment + (group["line"] - 1)
+            if row != current_row and values:
+                builder.add_line(values, confidences, raw_values)
+                values, confidences, raw_values = [], [], []
+            current_row = row
+            values.append(group["value"])
+            confidences.append(group.get("confidence"))
+            raw_values.append(group.get("raw_value") or group["value"])
+        if values:
+            builder.add_line(values, confidences, raw_values)
+        return builder.build()
+
+
+class GroupTableBuilder:
+    """按行追加数字组，最后一次性生成 GroupTable"""
+
+    def __init__(self, message_format: MessageFormat = DEFAULT_FORMAT):
+        self.message_format = message_format
+        self._chunks: List[str] = []
+        self._raw_chunks: List[str] = []
+        self._has_raw = False
+        self._line_starts: List[int] = []
+        self._confidences: List[Optional[float]] = []
+        self._has_confidence = False
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add_line(
+        self,
+        values: Sequence[str],
+        confidences: Optional[Iterable[Optional[float]]] = None,
+        raw_values: Optional[Sequence[str]] = None
+    ):
+        """
+        追加一行数字组
+
+        Args:
+            values: 该行各组的值（每个 digits_per_group 个字符）
+            confidences: 各组的识别置信度（可选）
+            raw_values: 各组修正前的原始值（可选，与 values 相同时可省略）
+        """
+        self.add_row(
+            "".join(values),
+            confidences,
+            "".join(raw_values) if raw_values is not None else None
+        )
+
+    def add_row(
+        self,
+        digits: str,
+        confidences: Optional[Iterable[Optional[float]]] = None,
+        raw_digits: Optional[str] = None
+    ):
+        """
+        以拼接好的字符串追加一行数字组（解析器直接按行切出的字符串，免去逐组拆分）
+
+        Args:
+            digits: 该行各组的值首尾相接，长度须为 digits_per_group 的整数倍
+            confidences: 各组的识别置信度（可选）
+            raw_digits: 修正前的原始值（可选，与 digits 相同时可省略）
+        """
+        if not digits:
+            return
+        count = len(digits) // self.message_format.digits_per_group
+        self._line_starts.append(self._count)
+        self._chunks.append(digits)
+        if raw_digits is not None and raw_digits != digits:
+            self._has_raw = True
+            self._raw_chunks.append(raw_digits)
+        else:
+            self._raw_chunks.append(digits)
+        self._count += count
+        if confidences is None:
+            self._confidences.extend([None] * count)
+        else:
+            confidences = list(confidences)
+            self._confidences.extend(confidences)
+            self._has_confidence = self._has_confidence or any(c is not None for c in confidences)
+
+    def add_digits(self, digits: str, groups_per_line: Optional[int] = None):
+        """
+        追加连续的数字串，按固定每行组数换行（用于标准格式参照报文）
+
+        Args:
+            digits: 数字串，长度须为 digits_per_group 的整数倍
+            groups_per_line: 每行组数，为空时取报文格式的每行组数
+        """
+        groups_per_line = groups_per_line or self.message_format.groups_per_line
+        count = len(digits) // self.message_format.digits_per_group
+        self._line_starts.extend(range(self._count, self._count + count, groups_per_line))
+        self._chunks.append(digits)
+        self._raw_chunks.append(digits)
+        self._confidences.extend([None] * count)
+        self._count += count
+
+    def build(self) -> GroupTable:
+        confidence = None
+        if self._has_confidence:
+            confidence = np.array(
+                [np.nan if c is None else c for c in self._confidences], dtype=np.float64
+            )
+        return GroupTable(
+            "".join(self._chunks),
+            np.array(self._line_starts, dtype=np.int64),
+            confidence,
+            "".join(self._raw_chunks) if self._has_raw else None,
+            self.message_format
+        )
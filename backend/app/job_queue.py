@@ -0,0 +1,183 @@
+"""批阅任务队列模块 - 在事件循环之外执行批阅任务"""
+import asyncio
+import logging
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, Optional
+
+from .models import ReviewResult, MessageHeader
+from .formats import MessageFormat
+from .review_service import ReviewService, get_review_service
+from .config import REVIEW_WORKERS, OCR_WORKERS
+
+logger = logging.getLogger(__name__)
+
+
+class ReviewJobQueue:
+    """
+    批阅任务队列
+
+    提交任务后立即返回批阅ID，OCR、比对等耗时操作在有界线程池中执行，
+    状态通过 ReviewResult.status 反映: processing -> completed / failed
+    """
+
+    def __init__(self, service: ReviewService, max_workers: int = REVIEW_WORKERS):
+        self.service = service
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="review-worker"
+        )
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        pdf_path: str,
+        txt_path: str,
+        pdf_filename: str = "",
+        txt_filename: str = "",
+        reference_id: Optional[str] = None,
+        message_format: Optional[MessageFormat] = None
+    ) -> ReviewResult:
+        """
+        提交批阅任务
+
+        Args:
+            pdf_path: PDF文件路径
+            txt_path: TXT参照文件路径
+            pdf_filename: PDF原始文件名
+            txt_filename: TXT原始文件名
+            reference_id: 参照报文库ID（指定时txt_path可为空）
+            message_format: 报文格式（为空时使用默认格式）
+
+        Returns:
+            状态为 processing 的占位结果
+        """
+        review_id = str(uuid.uuid4())[:8]
+
+        pending = ReviewResult(
+            id=review_id,
+            created_at=datetime.now(),
+            pdf_filename=pdf_filename or Path(pdf_path).name,
+            txt_filename=txt_filename or Path(txt_path).name,
+            total_groups=0,
+            error_count=0,
+            score=0,
+            errors=[],
+            header_info=MessageHeader(),
+            status="processing",
+            message="批阅任务处理中"
+        )
+        self.service.save_result(pending)
+
+        # 任务结束前，上传目录清理不会删除其使用的文件
+        paths = [pdf_path, txt_path]
+        registry = self.service.upload_registry
+        registry.pin(paths)
+
+        future = self.executor.submit(
+            self.service.review,
+            pdf_path=pdf_path,
+            txt_path=txt_path,
+            pdf_filename=pdf_filename,
+            txt_filename=txt_filename,
+            review_id=review_id,
+            reference_id=reference_id,
+            message_format=message_format
+        )
+        with self._lock:
+            self._futures[review_id] = future
+
+        def _finished(_: Future):
+            registry.unpin(paths)
+            self._discard(review_id)
+
+        future.add_done_callback(_finished)
+
+        logger.info(f"批阅任务已提交 {review_id}，排队中任务数 {self.pending_count()}")
+        return pending
+
+    def _discard(self, review_id: str):
+        """任务结束后移除跟踪的Future"""
+        with self._lock:
+            self._futures.pop(review_id, None)
+
+    def pending_count(self) -> int:
+        """获取未完成（排队或执行中）的任务数"""
+        with self._lock:
+            return len(self._futures)
+
+    async def wait(
+        self,
+        review_id: str,
+        timeout: Optional[float] = None
+    ) -> Optional[ReviewResult]:
+        """
+        异步等待任务完成，不阻塞事件循环
+
+        Args:
+            review_id: 批阅ID
+            timeout: 最长等待秒数，None表示一直等待
+
+        Returns:
+            当前批阅结果（超时时仍为 processing 状态）
+        """
+        with self._lock:
+            future = self._futures.get(review_id)
+
+        if future is not None:
+            try:
+                await asyncio.wait_for(
+                    asyncio.shield(asyncio.wrap_future(future)),
+                    timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                pass
+
+        return self.service.get_result(review_id)
+
+    async def iter_completed(self, review_ids: Iterable[str]) -> AsyncIterator[ReviewResult]:
+        """
+        按完成顺序异步产出一组任务的结果，不阻塞事件循环
+
+        Args:
+            review_ids: 批阅ID列表
+
+        Yields:
+            已结束（completed / failed）的批阅结果
+        """
+        waiting = {}
+        for review_id in review_ids:
+            with self._lock:
+                future = self._futures.get(review_id)
+            if future is None:
+                # 已经结束的任务
+                yield self.service.get_result(review_id)
+            else:
+                waiting[asyncio.wrap_future(future)] = review_id
+
+        while waiting:
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            for waiter in done:
+                yield self.service.get_result(waiting.pop(waiter))
+
+    def shutdown(self, wait: bool = False):
+        """关闭线程池"""
+        self.executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+# 全局任务队列实例
+_queue_instance: Optional[ReviewJobQueue] = None
+
+
+def get_job_queue() -> ReviewJobQueue:
+    """获取批阅任务队列单例"""
+    global _queue_instance
+    if _queue_instance is None:
+        # 启用OCR进程池时，并发任务数不少于工作进程数，批量批阅时各进程均可满载
+        _queue_instance = ReviewJobQueue(get_review_service(), max(REVIEW_WORKERS, OCR_WORKERS))
+    return _queue_instance
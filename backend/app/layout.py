@@ -0,0 +1,126 @@
+"""版面重建模块 - 将OCR文本框按行、列聚类并排序"""
+import logging
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 版面算法版本（算法变化时修改，使OCR结果缓存失效）
+LAYOUT_VERSION = "gap-v1"
+
+# 行（列）间隔阈值为文本框高度（宽度）中位数的比例
+ROW_GAP_RATIO = 0.5
+COL_GAP_RATIO = 0.5
+# 倾斜校正的最大斜率（约5°），超出视为估计异常
+MAX_SKEW_SLOPE = 0.0875
+
+
+@dataclass
+class Layout:
+    """版面重建结果"""
+    rows: List[np.ndarray]  # 各行的文本框索引，行从上到下、行内从左到右
+    row_index: np.ndarray   # 每个文本框所在的行号
+    col_index: np.ndarray   # 每个文本框所在的列号
+    skew: float             # 估计的行倾斜斜率（dy/dx）
+
+    def positions(self) -> List[Tuple[int, int]]:
+        """每个文本框的网格位置 (行, 列)"""
+        return list(zip(self.row_index.tolist(), self.col_index.tolist()))
+
+
+def boxes_from_results(results: Sequence[Tuple[str, float, List]]) -> np.ndarray:
+    """
+    提取识别结果的文本框
+
+    Args:
+        results: (文本, 置信度, 位置) 元组列表，位置为 [中心x, 中心y, 左, 上, 右, 下]
+
+    Returns:
+        N x 4 数组: 左, 上, 右, 下
+    """
+    if not results:
+        return np.empty((0, 4), dtype=np.float64)
+    return np.array([pos[2:6] for _, _, pos in results], dtype=np.float64)
+
+
+def _gap_clusters(values: np.ndarray, gap: float) -> np.ndarray:
+    """
+    一维间隔聚类：排序后相邻值之差超过阈值处断开
+
+    Returns:
+        每个值的簇编号（按值从小到大编号）
+    """
+    order = np.argsort(values, kind="stable")
+    breaks = np.diff(values[order]) > gap
+    labels = np.empty(len(values), dtype=np.int64)
+    labels[order] = np.concatenate(([0], np.cumsum(breaks)))
+    return labels
+
+
+def _estimate_skew(cx: np.ndarray, cy: np.ndarray, labels: np.ndarray) -> float:
+    """
+    估计行倾斜斜率：各行中心点的最小二乘斜率取中位数
+
+    按行号用 bincount 一次性求和，不逐行拟合
+    """
+    n = np.bincount(labels).astype(np.float64)
+    sx = np.bincount(labels, cx)
+    sy = np.bincount(labels, cy)
+    sxx = np.bincount(labels, cx * cx)
+    sxy = np.bincount(labels, cx * cy)
+    denom = n * sxx - sx * sx
+    valid = (n >= 3) & (denom > 1e-6 * np.maximum(n * sxx, 1.0))
+    if not valid.any():
+        return 0.0
+    slope = float(np.median((n * sxy - sx * sy)[valid] / denom[valid]))
+    return slope if abs(slope) <= MAX_SKEW_SLOPE else 0.0
+
+
+def build_layout(boxes: np.ndarray) -> Layout:
+    """
+    按文本框聚类行和列
+
+    - 行：文本框中心y（经倾斜校正）排序后，相邻间隔超过文本框高度中位数的一半处断行。
+      行由相邻文本框链式连接，不以某个文本框的y为基准
+    - 列：文本框中心x排序后，相邻间隔超过文本框宽度中位数的一半处分列
+    - 阈值由本页文本框尺寸得出，与渲染分辨率无关
+
+    Args:
+        boxes: N x 4 数组（左, 上, 右, 下）
+
+    Returns:
+        版面重建结果
+    """
+    count = len(boxes)
+    if count == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return Layout(rows=[], row_index=empty, col_index=empty, skew=0.0)
+
+    cx = (boxes[:, 0] + boxes[:, 2]) / 2
+    cy = (boxes[:, 1] + boxes[:, 3]) / 2
+    height = max(float(np.median(boxes[:, 3] - boxes[:, 1])), 1.0)
+    width = max(float(np.median(boxes[:, 2] - boxes[:, 0])), 1.0)
+
+    # 先按原始y聚类估计倾斜，再按校正后的y重新聚类
+    labels = _gap_clusters(cy, height * ROW_GAP_RATIO)
+    skew = _estimate_skew(cx, cy, labels)
+    if skew:
+        labels = _gap_clusters(cy - skew * (cx - cx.mean()), height * ROW_GAP_RATIO)
+
+    # 行号按行平均y重新编号（从上到下）
+    row_count = int(labels.max()) + 1
+    row_y = np.bincount(labels, cy, minlength=row_count) / np.bincount(labels, minlength=row_count)
+    rank = np.empty(row_count, dtype=np.int64)
+    rank[np.argsort(row_y, kind="stable")] = np.arange(row_count)
+    row_index = rank[labels]
+
+    col_index = _gap_clusters(cx, width * COL_GAP_RATIO)
+
+    # 按 (行, 左边界) 排序后按行切分
+    order = np.lexsort((boxes[:, 0], row_index))
+    splits = np.flatnonzero(np.diff(row_index[order])) + 1
+    rows = np.split(order, splits)
+
+    return Layout(rows=rows, row_index=row_index, col_index=col_index, skew=skew)
@@ -7,21 +7,33 @@
 3. 比对并评分
 4. 生成批阅报告
 """
-import os
+import json
+import hashlib
 import uuid
+import asyncio
 import logging
+import zipfile
+
+import aiofiles
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, Query
+from fastapi import FastAPI, File, Form, Request, UploadFile, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 
-from .config import UPLOAD_DIR, API_HOST, API_PORT
-from .models import ReviewResult, ReviewSummary
+from .config import (
+    API_HOST, API_PORT, OCR_WARMUP, REVIEW_BATCH_MAX_FILES, UPLOAD_SWEEP_INTERVAL,
+    UPLOAD_MAX_BYTES, UPLOAD_ZIP_MAX_BYTES, UPLOAD_CHUNK_SIZE
+)
+from .models import ReferenceInfo
+from .formats import FORMATS, DEFAULT_FORMAT, MessageFormat, get_format
 from .review_service import get_review_service
+from .job_queue import get_job_queue
 
 # 配置日志
 logging.basicConfig(
@@ -30,13 +42,42 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+async def sweep_uploads_periodically():
+    """定期清理上传目录（过期上传、遗留文件、过期报告，及超出配额的部分）"""
+    registry = get_review_service().upload_registry
+    while True:
+        try:
+            await run_in_threadpool(registry.sweep)
+        except Exception as e:
+            logger.error(f"上传目录清理失败: {str(e)}")
+        await asyncio.sleep(UPLOAD_SWEEP_INTERVAL)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期管理"""
+    if OCR_WARMUP:
+        # 后台预热OCR引擎，/health 保持可用，/ready 在预热完成后才返回就绪
+        service = get_review_service()
+        loop = asyncio.get_running_loop()
+        app.state.warmup_task = loop.run_in_executor(None, service.warm_up)
+    sweeper_task = asyncio.create_task(sweep_uploads_periodically())
+    yield
+    sweeper_task.cancel()
+    # 关闭批阅任务线程池和OCR进程池
+    get_job_queue().shutdown()
+    get_review_service().close()
+
+
 # 创建FastAPI应用
 app = FastAPI(
     title="报文自动批阅工具",
     description="基于OCR的手抄报文自动批阅系统",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS配置
@@ -49,6 +90,31 @@ app.add_middleware(
 )
 
 
+# 单文件上传接口的请求体上限（文件上限加上multipart封装的余量），按Content-Length提前拒绝
+_MULTIPART_OVERHEAD = 64 * 1024
+_BODY_LIMITS = {
+    "/api/upload/pdf": UPLOAD_MAX_BYTES + _MULTIPART_OVERHEAD,
+    "/api/upload/txt": UPLOAD_MAX_BYTES + _MULTIPART_OVERHEAD,
+    "/api/references": UPLOAD_MAX_BYTES + _MULTIPART_OVERHEAD,
+    "/api/review/quick": 2 * (UPLOAD_MAX_BYTES + _MULTIPART_OVERHEAD),
+    # 最多 REVIEW_BATCH_MAX_FILES 份PDF加一份参照TXT
+    "/api/review/batch": (REVIEW_BATCH_MAX_FILES + 1) * (UPLOAD_MAX_BYTES + _MULTIPART_OVERHEAD),
+}
+
+
+@app.middleware("http")
+async def limit_request_body(request: Request, call_next):
+    """请求体声明的大小超过接口上限时，在读取请求体之前直接返回413"""
+    limit = _BODY_LIMITS.get(request.url.path)
+    length = request.headers.get("content-length")
+    if limit is not None and length is not None and length.isdigit() and int(length) > limit:
+        return JSONResponse(
+            status_code=413,
+            content={"detail": f"请求体过大，该接口上限 {limit // (1024 * 1024)}MB"}
+        )
+    return await call_next(request)
+
+
 class UploadResponse(BaseModel):
     """上传响应"""
     file_id: str
@@ -60,7 +126,9 @@ class UploadResponse(BaseModel):
 class ReviewRequest(BaseModel):
     """批阅请求"""
     pdf_file_id: str
-    txt_file_id: str
+    txt_file_id: Optional[str] = None   # 已上传的TXT文件ID
+    reference_id: Optional[str] = None  # 参照报文库ID（与txt_file_id二选一）
+    message_format: Optional[str] = None  # 报文格式名或格式串（如 4x10x10x30），为空时使用默认格式
 
 
 class ReviewResponse(BaseModel):
@@ -70,8 +138,133 @@ class ReviewResponse(BaseModel):
     message: str
 
 
-# 文件存储映射
-file_storage = {}
+def _new_file_id() -> str:
+    """分配上传文件ID"""
+    return str(uuid.uuid4())[:8]
+
+
+def resolve_format(name: Optional[str]) -> Optional[MessageFormat]:
+    """
+    解析请求指定的报文格式
+    
+    Args:
+        name: 格式名或格式串，为空时使用默认格式
+        
+    Returns:
+        报文格式，未指定时为None
+        
+    Raises:
+        HTTPException: 未知的格式名或格式串错误（400）
+    """
+    if not name:
+        return None
+    try:
+        return get_format(name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _too_large(filename: str, max_bytes: int) -> HTTPException:
+    """文件超过大小上限的413错误"""
+    return HTTPException(
+        status_code=413,
+        detail=f"文件过大: {filename}，上限 {max_bytes // (1024 * 1024)}MB"
+    )
+
+
+async def spool_upload(file: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES) -> Tuple[Path, int, str]:
+    """
+    分块流式写入上传文件到临时文件
+    
+    按 UPLOAD_CHUNK_SIZE 分块读取并以异步文件IO写入磁盘，同时计算SHA-256，
+    单个上传的内存占用与文件大小无关；超过大小上限时立即中止并删除已写入部分
+    
+    Args:
+        file: 上传文件
+        max_bytes: 大小上限（字节）
+        
+    Returns:
+        (临时文件路径, 文件大小, SHA-256)
+        
+    Raises:
+        HTTPException: 413 文件超过大小上限
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise _too_large(file.filename, max_bytes)
+    
+    file_path = get_review_service().upload_registry.incoming_path()
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(file_path, 'wb') as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise _too_large(file.filename, max_bytes)
+                digest.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        file_path.unlink(missing_ok=True)
+        raise
+    return file_path, size, digest.hexdigest()
+
+
+async def receive_upload(
+    file: UploadFile,
+    file_type: str,
+    max_bytes: int = UPLOAD_MAX_BYTES
+) -> Tuple[str, Path, int]:
+    """
+    分块流式保存上传文件并按内容哈希登记
+    
+    内容与已有上传相同时不再保存新文件，新的文件ID指向同一内容文件
+    
+    Args:
+        file: 上传文件
+        file_type: 文件类型（pdf, txt）
+        max_bytes: 大小上限（字节）
+        
+    Returns:
+        (文件ID, 内容文件路径, 文件大小)
+        
+    Raises:
+        HTTPException: 413 文件超过大小上限
+    """
+    temp_path, size, sha256 = await spool_upload(file, max_bytes)
+    file_id = _new_file_id()
+    try:
+        blob_path = await run_in_threadpool(
+            get_review_service().upload_registry.store,
+            file_id, temp_path, file.filename, file_type, size, sha256
+        )
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return file_id, blob_path, size
+
+
+async def read_upload(file: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES) -> bytes:
+    """
+    分块读取上传文件内容（用于参照报文等小文件），超过大小上限时立即中止
+    
+    Raises:
+        HTTPException: 413 文件超过大小上限
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise _too_large(file.filename, max_bytes)
+    
+    content = bytearray()
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        content.extend(chunk)
+        if len(content) > max_bytes:
+            raise _too_large(file.filename, max_bytes)
+    return bytes(content)
 
 
 @app.get("/")
@@ -91,6 +284,64 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    就绪检查
+    
+    报告OCR引擎加载状态、工作进程数和任务队列深度；
+    启用预热时，引擎就绪前返回503，供编排系统只向已预热的实例分发流量
+    """
+    service = get_review_service()
+    queue = get_job_queue()
+    
+    ready = service.engine_state == "ready" or not OCR_WARMUP
+    body = {
+        "ready": ready,
+        "engine_state": service.engine_state,
+        "model_loaded": service.engine_loaded,
+        "ocr_workers": service.ocr_pool.num_workers if service.ocr_pool is not None else 0,
+        "review_workers": queue.max_workers,
+        "queue_depth": queue.pending_count(),
+    }
+    return JSONResponse(content=body, status_code=200 if ready else 503)
+
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """OCR结果缓存统计（命中/未命中/淘汰次数）"""
+    service = get_review_service()
+    if service.ocr_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **service.ocr_cache.stats()}
+
+
+@app.get("/api/formats")
+async def list_formats():
+    """可选的报文格式（批阅接口的 message_format 参数可取格式名或任意格式串）"""
+    return {
+        "default": DEFAULT_FORMAT.name,
+        "formats": [
+            {
+                "name": f.name,
+                "spec": f.spec,
+                "digits_per_group": f.digits_per_group,
+                "groups_per_line": f.groups_per_line,
+                "lines_per_segment": f.lines_per_segment,
+                "segments": f.segments,
+                "total_groups": f.total_groups
+            }
+            for f in FORMATS.values()
+        ]
+    }
+
+
+@app.get("/api/uploads/stats")
+async def upload_stats():
+    """上传目录统计（登记文件数、磁盘占用、清理耗时与释放字节数）"""
+    return get_review_service().upload_registry.stats()
+
+
 @app.post("/api/upload/pdf", response_model=UploadResponse)
 async def upload_pdf(file: UploadFile = File(...)):
     """
@@ -102,33 +353,20 @@ async def upload_pdf(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail="请上传PDF格式文件")
     
     try:
-        # 生成文件ID
-        file_id = str(uuid.uuid4())[:8]
-        
-        # 保存文件
-        file_path = UPLOAD_DIR / f"{file_id}_{file.filename}"
-        content = await file.read()
-        
-        with open(file_path, 'wb') as f:
-            f.write(content)
-        
-        # 存储映射
-        file_storage[file_id] = {
-            'path': str(file_path),
-            'filename': file.filename,
-            'type': 'pdf',
-            'size': len(content)
-        }
+        # 分块保存并登记文件
+        file_id, _, size = await receive_upload(file, 'pdf')
         
         logger.info(f"PDF文件上传成功: {file_id} - {file.filename}")
         
         return UploadResponse(
             file_id=file_id,
             filename=file.filename,
-            size=len(content),
+            size=size,
             message="PDF文件上传成功"
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"PDF上传失败: {str(e)}")
         raise HTTPException(status_code=500, detail=f"文件上传失败: {str(e)}")
@@ -145,38 +383,73 @@ async def upload_txt(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail="请上传TXT格式文件")
     
     try:
-        # 生成文件ID
-        file_id = str(uuid.uuid4())[:8]
-        
-        # 保存文件
-        file_path = UPLOAD_DIR / f"{file_id}_{file.filename}"
-        content = await file.read()
-        
-        with open(file_path, 'wb') as f:
-            f.write(content)
-        
-        # 存储映射
-        file_storage[file_id] = {
-            'path': str(file_path),
-            'filename': file.filename,
-            'type': 'txt',
-            'size': len(content)
-        }
+        # 分块保存并登记文件
+        file_id, _, size = await receive_upload(file, 'txt')
         
         logger.info(f"TXT文件上传成功: {file_id} - {file.filename}")
         
         return UploadResponse(
             file_id=file_id,
             filename=file.filename,
-            size=len(content),
+            size=size,
             message="TXT文件上传成功"
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"TXT上传失败: {str(e)}")
         raise HTTPException(status_code=500, detail=f"文件上传失败: {str(e)}")
 
 
+@app.delete("/api/upload/{file_id}")
+async def delete_upload(file_id: str):
+    """
+    删除上传文件
+    
+    释放文件ID；内容相同的其他上传仍引用该内容时保留文件，引用全部释放后删除
+    """
+    if not await run_in_threadpool(get_review_service().upload_registry.release, file_id):
+        raise HTTPException(status_code=404, detail="文件未找到")
+    return {"message": "文件已删除"}
+
+
+@app.post("/api/references", response_model=ReferenceInfo)
+async def create_reference(file: UploadFile = File(...)):
+    """
+    上传参照报文到参照库
+    
+    参照报文解析校验后按内容哈希生成稳定ID，批阅时可通过reference_id复用
+    """
+    if not file.filename.lower().endswith('.txt'):
+        raise HTTPException(status_code=400, detail="请上传TXT格式文件")
+    
+    content = await read_upload(file)
+    try:
+        library = get_review_service().reference_library
+        return await run_in_threadpool(library.add, content, file.filename)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="参照文件须为UTF-8编码")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/references")
+async def list_references():
+    """获取参照报文库列表"""
+    items = get_review_service().reference_library.list()
+    return {"total": len(items), "items": items}
+
+
+@app.get("/api/references/{reference_id}", response_model=ReferenceInfo)
+async def get_reference(reference_id: str):
+    """获取参照报文信息"""
+    info = get_review_service().reference_library.get_info(reference_id)
+    if not info:
+        raise HTTPException(status_code=404, detail="参照报文未找到")
+    return info
+
+
 @app.post("/api/review", response_model=ReviewResponse)
 async def start_review(request: ReviewRequest):
     """
@@ -184,35 +457,69 @@ async def start_review(request: ReviewRequest):
     
     将PDF提取的报文内容与TXT参照报文进行逐组比对
     """
-    # 验证文件
-    pdf_info = file_storage.get(request.pdf_file_id)
-    txt_info = file_storage.get(request.txt_file_id)
+    message_format = resolve_format(request.message_format)
     
+    # 验证文件
+    registry = get_review_service().upload_registry
+    pdf_info = registry.get(request.pdf_file_id)
     if not pdf_info:
         raise HTTPException(status_code=404, detail="PDF文件未找到")
-    if not txt_info:
-        raise HTTPException(status_code=404, detail="TXT文件未找到")
     
-    try:
-        service = get_review_service()
-        
-        # 执行批阅
-        result = service.review(
-            pdf_path=pdf_info['path'],
-            txt_path=txt_info['path'],
-            pdf_filename=pdf_info['filename'],
-            txt_filename=txt_info['filename']
-        )
-        
-        return ReviewResponse(
-            review_id=result.id,
-            status=result.status,
-            message=result.message
-        )
-        
-    except Exception as e:
-        logger.error(f"批阅失败: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"批阅处理失败: {str(e)}")
+    if request.reference_id:
+        # 使用参照报文库中预解析的参照
+        reference_info = get_review_service().reference_library.get_info(request.reference_id)
+        if not reference_info:
+            raise HTTPException(status_code=404, detail="参照报文未找到")
+        txt_info = {'path': '', 'filename': reference_info.filename}
+    elif request.txt_file_id:
+        txt_info = registry.get(request.txt_file_id)
+        if not txt_info:
+            raise HTTPException(status_code=404, detail="TXT文件未找到")
+    else:
+        raise HTTPException(status_code=400, detail="请提供txt_file_id或reference_id")
+    
+    # 提交批阅任务，立即返回批阅ID，客户端轮询获取结果
+    pending = get_job_queue().submit(
+        pdf_path=pdf_info['path'],
+        txt_path=txt_info['path'],
+        pdf_filename=pdf_info['filename'],
+        txt_filename=txt_info['filename'],
+        reference_id=request.reference_id,
+        message_format=message_format
+    )
+    
+    return ReviewResponse(
+        review_id=pending.id,
+        status=pending.status,
+        message=pending.message
+    )
+
+
+@app.get("/api/review/{review_id}/status", response_model=ReviewResponse)
+async def get_review_status(
+    review_id: str,
+    wait: float = Query(0, ge=0, le=60, description="最长等待秒数（长轮询），0表示立即返回")
+):
+    """
+    获取批阅任务状态
+    
+    状态: processing（处理中）, completed（已完成）, failed（失败）
+    """
+    queue = get_job_queue()
+    
+    if wait > 0:
+        result = await queue.wait(review_id, timeout=wait)
+    else:
+        result = queue.service.get_result(review_id)
+    
+    if not result:
+        raise HTTPException(status_code=404, detail="批阅任务未找到")
+    
+    return ReviewResponse(
+        review_id=result.id,
+        status=result.status,
+        message=result.message
+    )
 
 
 @app.get("/api/review/{review_id}")
@@ -254,20 +561,52 @@ async def get_review_result(review_id: str):
                 "error_type": e.error_type
             }
             for e in result.errors
-        ]
+        ],
+        "escalations": [region.model_dump() for region in result.escalations],
+        "page_routes": [route.model_dump() for route in result.page_routes]
     }
 
 
 @app.get("/api/reviews")
-async def list_reviews():
+async def list_reviews(
+    page: int = Query(1, ge=1, description="页码（从1开始）"),
+    page_size: int = Query(20, ge=1, le=200, description="每页条数"),
+    sort_by: str = Query("created_at", description="排序字段: created_at, score, error_count, pdf_filename, status"),
+    order: str = Query("desc", pattern="^(asc|desc)$", description="排序方向: asc, desc"),
+    status: Optional[str] = Query(None, description="按状态过滤: processing, completed, failed"),
+    keyword: Optional[str] = Query(None, description="按PDF/TXT文件名过滤（包含匹配）"),
+    min_score: Optional[float] = Query(None, description="最低得分"),
+    max_score: Optional[float] = Query(None, description="最高得分"),
+    created_after: Optional[datetime] = Query(None, description="创建时间下限"),
+    created_before: Optional[datetime] = Query(None, description="创建时间上限")
+):
     """
-    获取所有批阅记录
+    分页查询批阅记录
+    
+    分页、排序与过滤均在结果数据库中完成
     """
     service = get_review_service()
-    results = service.list_results()
+    try:
+        total, results = await run_in_threadpool(
+            service.list_results,
+            offset=(page - 1) * page_size,
+            limit=page_size,
+            sort_by=sort_by,
+            descending=order == "desc",
+            status=status,
+            filename=keyword,
+            min_score=min_score,
+            max_score=max_score,
+            created_after=created_after,
+            created_before=created_before
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return {
-        "total": len(results),
+        "total": total,
+        "page": page,
+        "page_size": page_size,
         "items": [
             {
                 "id": r.id,
@@ -318,7 +657,8 @@ async def get_report(
 @app.post("/api/review/quick")
 async def quick_review(
     pdf_file: UploadFile = File(..., description="PDF手抄报文文件"),
-    txt_file: UploadFile = File(..., description="TXT参照标准文件")
+    txt_file: UploadFile = File(..., description="TXT参照标准文件"),
+    message_format: Optional[str] = Form(None, description="报文格式名或格式串（如 4x10x10x30），为空时使用默认格式")
 ):
     """
     快速批阅（一键上传并批阅）
@@ -330,30 +670,23 @@ async def quick_review(
         raise HTTPException(status_code=400, detail="请上传PDF格式的手抄报文文件")
     if not txt_file.filename.lower().endswith('.txt'):
         raise HTTPException(status_code=400, detail="请上传TXT格式的参照文件")
+    fmt = resolve_format(message_format)
     
     try:
-        # 保存PDF
-        pdf_id = str(uuid.uuid4())[:8]
-        pdf_path = UPLOAD_DIR / f"{pdf_id}_{pdf_file.filename}"
-        pdf_content = await pdf_file.read()
-        with open(pdf_path, 'wb') as f:
-            f.write(pdf_content)
-        
-        # 保存TXT
-        txt_id = str(uuid.uuid4())[:8]
-        txt_path = UPLOAD_DIR / f"{txt_id}_{txt_file.filename}"
-        txt_content = await txt_file.read()
-        with open(txt_path, 'wb') as f:
-            f.write(txt_content)
+        # 分块保存PDF和TXT
+        _, pdf_path, _ = await receive_upload(pdf_file, 'pdf')
+        _, txt_path, _ = await receive_upload(txt_file, 'txt')
         
-        # 执行批阅
-        service = get_review_service()
-        result = service.review(
+        # 提交批阅任务并等待完成（在线程池中执行，不阻塞事件循环）
+        queue = get_job_queue()
+        pending = queue.submit(
             pdf_path=str(pdf_path),
             txt_path=str(txt_path),
             pdf_filename=pdf_file.filename,
-            txt_filename=txt_file.filename
+            txt_filename=txt_file.filename,
+            message_format=fmt
         )
+        result = await queue.wait(pending.id)
         
         # 返回完整结果
         return {
@@ -380,11 +713,199 @@ async def quick_review(
             "errors_truncated": len(result.errors) > 20
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"快速批阅失败: {str(e)}")
         raise HTTPException(status_code=500, detail=f"批阅处理失败: {str(e)}")
 
 
+def _too_many_files() -> HTTPException:
+    """批量批阅的PDF数超过上限的400错误"""
+    return HTTPException(
+        status_code=400,
+        detail=f"单次最多批阅 {REVIEW_BATCH_MAX_FILES} 份PDF"
+    )
+
+
+def _release_uploads(file_ids: List[str]):
+    """释放请求失败前已登记的上传文件"""
+    registry = get_review_service().upload_registry
+    for file_id in file_ids:
+        try:
+            registry.release(file_id)
+        except Exception as e:
+            logger.error(f"释放上传文件失败: {file_id} - {str(e)}")
+
+
+def _extract_pdfs_from_zip(
+    zip_path: Path,
+    max_files: int,
+    max_bytes: int = UPLOAD_MAX_BYTES
+) -> List[Tuple[str, str, Path]]:
+    """
+    将zip压缩包中的PDF文件逐个分块解压到上传目录并登记
+    
+    解压前先按目录清点PDF数，超过 max_files 时不解压任何文件；
+    解压中途出错时释放本压缩包中已登记的PDF
+    
+    Args:
+        zip_path: zip文件路径
+        max_files: 最多可解压的PDF数（批量批阅剩余的名额）
+        max_bytes: 单个PDF的大小上限（字节）
+        
+    Returns:
+        (文件ID, 文件名, 保存路径) 列表，按压缩包内顺序
+        
+    Raises:
+        zipfile.BadZipFile: 不是有效的zip文件
+        HTTPException: 400 PDF数超过上限；413 压缩包中的文件超过大小上限
+    """
+    registry = get_review_service().upload_registry
+    pdfs = []
+    with zipfile.ZipFile(zip_path) as archive:
+        members = []
+        for info in archive.infolist():
+            # 只取文件名，忽略目录结构（防止路径穿越）及macOS附带的元数据文件
+            name = Path(info.filename).name
+            if info.is_dir() or name.startswith('.') or '__MACOSX' in info.filename:
+                continue
+            if not name.lower().endswith('.pdf'):
+                continue
+            if info.file_size > max_bytes:
+                raise _too_large(name, max_bytes)
+            members.append((name, info))
+        if len(members) > max_files:
+            raise _too_many_files()
+        
+        try:
+            for name, info in members:
+                file_path = registry.incoming_path()
+                digest = hashlib.sha256()
+                size = 0
+                try:
+                    with archive.open(info) as src, open(file_path, 'wb') as out:
+                        for chunk in iter(lambda: src.read(UPLOAD_CHUNK_SIZE), b''):
+                            size += len(chunk)
+                            if size > max_bytes:
+                                raise _too_large(name, max_bytes)
+                            digest.update(chunk)
+                            out.write(chunk)
+                except BaseException:
+                    file_path.unlink(missing_ok=True)
+                    raise
+                
+                file_id = _new_file_id()
+                blob_path = registry.store(file_id, file_path, name, 'pdf', size, digest.hexdigest())
+                pdfs.append((file_id, name, blob_path))
+        except BaseException:
+            _release_uploads([file_id for file_id, _, _ in pdfs])
+            raise
+    return pdfs
+
+
+@app.post("/api/review/batch")
+async def batch_review(
+    pdf_files: List[UploadFile] = File(..., description="PDF手抄报文文件（可多个），或包含PDF的zip压缩包"),
+    txt_file: Optional[UploadFile] = File(None, description="TXT参照标准文件"),
+    reference_id: Optional[str] = Form(None, description="参照报文库ID（与txt_file二选一）"),
+    message_format: Optional[str] = Form(None, description="报文格式名或格式串（如 4x10x10x30），为空时使用默认格式")
+):
+    """
+    批量批阅（一份参照，多份PDF）
+    
+    参照报文只解析一次（入参照库后按ID复用），各PDF提交到任务队列并行批阅；
+    响应为NDJSON流，每份PDF完成后立即输出一行结果（按完成顺序，index为提交顺序）
+    """
+    fmt = resolve_format(message_format)
+    service = get_review_service()
+    library = service.reference_library
+    
+    # 参照报文
+    if txt_file is not None:
+        if not txt_file.filename.lower().endswith('.txt'):
+            raise HTTPException(status_code=400, detail="请上传TXT格式的参照文件")
+        txt_content = await read_upload(txt_file)
+        try:
+            reference_info = await run_in_threadpool(library.add, txt_content, txt_file.filename)
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="参照文件须为UTF-8编码")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    elif reference_id:
+        reference_info = library.get_info(reference_id)
+        if not reference_info:
+            raise HTTPException(status_code=404, detail="参照报文未找到")
+    else:
+        raise HTTPException(status_code=400, detail="请提供txt_file或reference_id")
+    
+    for upload in pdf_files:
+        if not upload.filename.lower().endswith(('.pdf', '.zip')):
+            raise HTTPException(status_code=400, detail=f"请上传PDF或zip文件: {upload.filename}")
+    if sum(upload.filename.lower().endswith('.pdf') for upload in pdf_files) > REVIEW_BATCH_MAX_FILES:
+        raise _too_many_files()
+    
+    # 分块保存PDF（zip压缩包先保存再逐个解压），边保存边计数，达到上限即停止；
+    # 请求中途失败时释放已登记的PDF
+    submissions = []  # (文件ID, 文件名, 内容文件路径)
+    try:
+        for upload in pdf_files:
+            remaining = REVIEW_BATCH_MAX_FILES - len(submissions)
+            if upload.filename.lower().endswith('.pdf'):
+                if remaining <= 0:
+                    raise _too_many_files()
+                file_id, pdf_path, _ = await receive_upload(upload, 'pdf')
+                submissions.append((file_id, upload.filename, pdf_path))
+                continue
+            
+            zip_path, _, _ = await spool_upload(upload, UPLOAD_ZIP_MAX_BYTES)
+            try:
+                submissions.extend(await run_in_threadpool(_extract_pdfs_from_zip, zip_path, remaining))
+            except zipfile.BadZipFile:
+                raise HTTPException(status_code=400, detail=f"无效的zip文件: {upload.filename}")
+            finally:
+                # 压缩包只用于解压，不登记
+                zip_path.unlink(missing_ok=True)
+        
+        if not submissions:
+            raise HTTPException(status_code=400, detail="未找到需要批阅的PDF文件")
+    except BaseException:
+        _release_uploads([file_id for file_id, _, _ in submissions])
+        raise
+    
+    # 提交批阅任务
+    queue = get_job_queue()
+    indexes = {}
+    for index, (_, filename, pdf_path) in enumerate(submissions):
+        pending = queue.submit(
+            pdf_path=str(pdf_path),
+            txt_path='',
+            pdf_filename=filename,
+            txt_filename=reference_info.filename,
+            reference_id=reference_info.id,
+            message_format=fmt
+        )
+        indexes[pending.id] = index
+    
+    logger.info(f"批量批阅已提交: {len(indexes)} 份PDF，参照 {reference_info.id}")
+    
+    async def stream_results():
+        async for result in queue.iter_completed(list(indexes)):
+            yield json.dumps({
+                "index": indexes[result.id],
+                "id": result.id,
+                "pdf_filename": result.pdf_filename,
+                "reference_id": reference_info.id,
+                "total_groups": result.total_groups,
+                "error_count": result.error_count,
+                "score": result.score,
+                "status": result.status,
+                "message": result.message
+            }, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -1,34 +1,62 @@
 """报文解析模块 - 解析报文结构"""
 import re
 import logging
+from itertools import compress
 from typing import List, Tuple, Optional
-from .models import MessageHeader, MessageGroup, MessageContent
-from .config import (
-    DIGITS_PER_GROUP, GROUPS_PER_LINE, LINES_PER_SEGMENT, SEGMENTS_COUNT
-)
+from .models import MessageHeader, MessageContent
+from .group_table import GroupTable, GroupTableBuilder
+from .normalization import OCRNormalizer, create_normalizer
+from .tokenizer import GroupTokenizer, fit_line
+from .formats import MessageFormat, DEFAULT_FORMAT
 
 logger = logging.getLogger(__name__)
 
+# 头部关键词
+HEADER_KEYWORD_PATTERN = re.compile('组|时间|日期|报文|号|第')
+GROUP_COUNT_PATTERN = re.compile(r'(\d+)\s*组')
+TIMESTAMP_PATTERN = re.compile(r'(\d{4}[-/年]\d{1,2}[-/月]\d{1,2}日?|\d{1,2}:\d{2}(:\d{2})?)')
+
+# 数字组不少于该数的行才是数据行
+MIN_DATA_LINE_GROUPS = 3
+# 头部检查范围内数字组达到该数的行视为数据行（不再是头部）
+HEADER_MAX_GROUPS = 5
+# 参照报文中数字达到该数的行为数据行
+REFERENCE_DATA_LINE_DIGITS = 30
+
 
 class MessageParser:
     """报文解析器"""
     
-    def __init__(self):
-        # 数字提取正则表达式
-        self.digit_pattern = re.compile(r'\d+')
-        # 头部关键词
-        self.header_keywords = ['组', '时间', '日期', '报文', '号', '第']
+    def __init__(
+        self,
+        normalizer: Optional[OCRNormalizer] = None,
+        message_format: MessageFormat = DEFAULT_FORMAT
+    ):
+        # 报文主体的易混字符修正（为空时不修正），编译进切分器的转换表
+        self.normalizer = normalizer
+        self.tokenizer = GroupTokenizer(normalizer.confusions if normalizer is not None else None)
+        # 未指定报文格式时使用的格式
+        self.message_format = message_format
     
-    def parse_header(self, lines: List[str]) -> Tuple[MessageHeader, int]:
+    def parse_header(
+        self,
+        lines: List[str],
+        message_format: Optional[MessageFormat] = None
+    ) -> Tuple[MessageHeader, int]:
         """
         解析报文头部（前三行）
         
         Args:
             lines: 所有行
+            message_format: 报文格式（为空时使用解析器的默认格式）
             
         Returns:
             (头部信息, 头部结束行索引)
         """
+        message_format = message_format or self.message_format
+        # 数字组超过 HEADER_MAX_GROUPS - 1 组（按不修正易混字符计）的行为数据行
+        max_header_chars = message_format.digits_per_group * (HEADER_MAX_GROUPS - 1)
+        
         header = MessageHeader()
         header_lines = []
         header_end_idx = 0
@@ -39,33 +67,23 @@ class MessageParser:
             if not line:
                 continue
             
-            # 检测是否为头部行
-            is_header = False
-            for keyword in self.header_keywords:
-                if keyword in line:
-                    is_header = True
-                    break
-            
-            # 如果该行主要包含数字组（4位数字连续），则不是头部
-            digit_groups = self._extract_digit_groups(line)
-            if len(digit_groups) >= 5:  # 超过5组数字，认为是数据行
-                is_header = False
+            # 含头部关键词且不是数据行的为头部行
+            is_header = (
+                HEADER_KEYWORD_PATTERN.search(line) is not None
+                and len(self.tokenizer.plain_chars(line)) <= max_header_chars
+            )
             
             if is_header or i < 3:
                 header_lines.append(line)
                 header_end_idx = i + 1
                 
                 # 尝试提取组数
-                if '组' in line:
-                    match = re.search(r'(\d+)\s*组', line)
-                    if match:
-                        header.group_count = match.group(1)
+                match = GROUP_COUNT_PATTERN.search(line)
+                if match:
+                    header.group_count = match.group(1)
                 
                 # 尝试提取时间
-                time_match = re.search(
-                    r'(\d{4}[-/年]\d{1,2}[-/月]\d{1,2}日?|\d{1,2}:\d{2}(:\d{2})?)',
-                    line
-                )
+                time_match = TIMESTAMP_PATTERN.search(line)
                 if time_match:
                     header.timestamp = time_match.group(0)
             else:
@@ -76,90 +94,108 @@ class MessageParser:
         
         return header, header_end_idx
     
-    def _extract_digit_groups(self, text: str) -> List[str]:
+    @staticmethod
+    def _group_confidences(
+        digit_confidences: List[Optional[float]],
+        width: int
+    ) -> List[Optional[float]]:
         """
-        从文本中提取数字组
+        计算各数字组的识别置信度（组内字符置信度的最小值）
         
         Args:
-            text: 输入文本
+            digit_confidences: 该行各分组字符的置信度（已按每行最多组数截取）
+            width: 每组字符数
             
         Returns:
-            数字组列表
+            与数字组一一对应的置信度列表
         """
-        groups = []
-        
-        # 移除非数字字符（保留空格）
-        cleaned = re.sub(r'[^\d\s]', ' ', text)
-        
-        # 提取所有数字
-        all_digits = ''.join(cleaned.split())
+        if None not in digit_confidences:
+            # 各字符置信度均已知（常见情况）
+            return [
+                min(digit_confidences[i:i + width])
+                for i in range(0, len(digit_confidences), width)
+            ]
         
-        # 按4位分组
-        for i in range(0, len(all_digits), DIGITS_PER_GROUP):
-            group = all_digits[i:i + DIGITS_PER_GROUP]
-            if len(group) == DIGITS_PER_GROUP:
-                groups.append(group)
-            elif len(group) > 0:
-                # 补零或记录不完整组
-                groups.append(group.ljust(DIGITS_PER_GROUP, '?'))
-        
-        return groups
+        confidences = []
+        for i in range(0, len(digit_confidences), width):
+            known = [c for c in digit_confidences[i:i + width] if c is not None]
+            confidences.append(min(known) if known else None)
+        return confidences
     
-    def parse_body(self, lines: List[str], start_idx: int = 0) -> List[MessageGroup]:
+    def parse_body(
+        self,
+        lines: List[str],
+        start_idx: int = 0,
+        confidences: Optional[List[List[Optional[float]]]] = None,
+        message_format: Optional[MessageFormat] = None
+    ) -> GroupTable:
         """
         解析报文主体
         
+        每个数据行为一行（最多 groups_per_line 组），每 lines_per_segment 行为一段。
+        是否为数据行按未修正的数字数判断，数据行再经切分器一次转换得到修正易混字符后的
+        分组字符，按格式定长切分为组；有字符被修正时一并记录修正前的值，比对时不再重复修正
+        
         Args:
             lines: 所有行
             start_idx: 开始解析的行索引
+            confidences: 每行的逐字符识别置信度（可选）
+            message_format: 报文格式（为空时使用解析器的默认格式）
             
         Returns:
-            数字组列表
+            数字组表
         """
-        groups = []
-        global_idx = 0
-        segment = 1
-        line_in_segment = 1
+        message_format = message_format or self.message_format
+        width = message_format.digits_per_group
+        max_groups = message_format.groups_per_line
+        line_chars = width * max_groups
+        # 不足 MIN_DATA_LINE_GROUPS 组（末组不完整也计一组）的行不是数据行
+        min_chars = width * (MIN_DATA_LINE_GROUPS - 1) + 1
         
-        for line_idx, line in enumerate(lines[start_idx:]):
-            line = line.strip()
-            if not line:
-                continue
-            
-            # 提取该行的数字组
-            line_groups = self._extract_digit_groups(line)
+        tokenizer = self.tokenizer
+        builder = GroupTableBuilder(message_format)
+        
+        for line_idx in range(start_idx, len(lines)):
+            line = lines[line_idx]
+            plain = tokenizer.plain_chars(line)
             
-            # 跳过非数据行（数字组太少）
-            if len(line_groups) < 3:
+            # 跳过非数据行（数字组太少）：按未修正的数字判断，
+            # 避免文字行中的易混字母被修正为数字后误计为数据行
+            if len(plain) < min_chars:
                 continue
+            # 只对数据行修正易混字符
+            chars = tokenizer.chars(line) if tokenizer.corrects else plain
+            digits = fit_line(chars, width, max_groups)
             
-            # 处理每个数字组
-            for pos_idx, value in enumerate(line_groups[:GROUPS_PER_LINE]):
-                group = MessageGroup(
-                    segment=segment,
-                    line=line_in_segment,
-                    position=pos_idx + 1,
-                    value=value,
-                    global_index=global_idx
-                )
-                groups.append(group)
-                global_idx += 1
+            # 有字符被修正时记录各组的原始值
+            raw_digits = None
+            if tokenizer.corrects:
+                raw_digits = fit_line(tokenizer.raw_chars(line), width, max_groups)
             
-            # 更新段和行计数
-            line_in_segment += 1
-            if line_in_segment > LINES_PER_SEGMENT:
-                line_in_segment = 1
-                segment += 1
+            # 各组的识别置信度
+            group_conf = None
+            if confidences is not None:
+                digit_conf = list(compress(confidences[line_idx], tokenizer.char_mask(line)))
+                group_conf = self._group_confidences(digit_conf[:line_chars], width)
+            
+            builder.add_row(digits, group_conf, raw_digits)
         
-        logger.info(f"解析主体完成，共 {len(groups)} 组数字")
-        return groups
+        logger.info(f"解析主体完成，共 {len(builder)} 组数字")
+        return builder.build()
     
-    def parse_message(self, lines: List[str]) -> MessageContent:
+    def parse_message(
+        self,
+        lines: List[str],
+        confidences: Optional[List[List[Optional[float]]]] = None,
+        message_format: Optional[MessageFormat] = None
+    ) -> MessageContent:
         """
         解析完整报文
         
         Args:
             lines: OCR识别的行列表
+            confidences: 每行的逐字符识别置信度（可选），保留到各数字组
+            message_format: 报文格式（为空时使用解析器的默认格式）
             
         Returns:
             报文内容对象
@@ -168,20 +204,25 @@ class MessageParser:
         content.raw_text = "\n".join(lines)
         
         # 解析头部
-        header, body_start = self.parse_header(lines)
+        header, body_start = self.parse_header(lines, message_format)
         content.header = header
         
         # 解析主体
-        content.groups = self.parse_body(lines, body_start)
+        content.table = self.parse_body(lines, body_start, confidences, message_format)
         
         return content
     
-    def parse_reference_txt(self, txt_path: str) -> MessageContent:
+    def parse_reference_txt(
+        self,
+        txt_path: str,
+        message_format: Optional[MessageFormat] = None
+    ) -> MessageContent:
         """
         解析参照标准报文TXT文件
         
         Args:
             txt_path: TXT文件路径
+            message_format: 报文格式（为空时使用解析器的默认格式）
             
         Returns:
             报文内容对象
@@ -192,29 +233,58 @@ class MessageParser:
         # 清理行
         lines = [line.strip() for line in lines if line.strip()]
         
-        return self.parse_message(lines)
+        return self.parse_message(lines, message_format=message_format)
 
 
 class MessageParserV2:
     """
     增强版报文解析器
-    针对标准格式进行优化：每行10组，每组4个数字
+    针对标准格式进行优化：每行若干组定长数字（标准格式每行10组，每组4个数字）
     """
     
-    def __init__(self):
-        self.digit_pattern = re.compile(r'\d{4}')
+    def __init__(self, message_format: MessageFormat = DEFAULT_FORMAT):
+        # 只取数字（参照报文中没有占位符，也不修正易混字符）
+        self.tokenizer = GroupTokenizer(keep_placeholder=False)
+        # 未指定报文格式时使用的格式
+        self.message_format = message_format
     
-    def parse_txt_file(self, txt_path: str) -> MessageContent:
+    def parse_txt_file(
+        self,
+        txt_path: str,
+        message_format: Optional[MessageFormat] = None
+    ) -> MessageContent:
         """
         解析标准TXT参照文件
-        格式: 每行包含10组4位数字，可能有空格分隔
+        格式: 每行包含若干组定长数字，可能有空格分隔
         """
-        content = MessageContent()
-        groups = []
-        
         with open(txt_path, 'r', encoding='utf-8') as f:
             raw_text = f.read()
         
+        return self.parse_txt_content(raw_text, message_format)
+    
+    def parse_txt_content(
+        self,
+        raw_text: str,
+        message_format: Optional[MessageFormat] = None
+    ) -> MessageContent:
+        """
+        解析标准参照报文文本
+        
+        Args:
+            raw_text: TXT文件内容
+            message_format: 报文格式（为空时使用解析器的默认格式）
+            
+        Returns:
+            报文内容对象
+        """
+        message_format = message_format or self.message_format
+        width = message_format.digits_per_group
+        # 数字达到30个（整行不足40个数字的格式为整行的3/4）认为是数据行；
+        # 主体按格式重新换行，不要求文本中的行与格式一致
+        min_data_digits = min(REFERENCE_DATA_LINE_DIGITS, message_format.digits_per_line * 3 // 4)
+        
+        content = MessageContent()
+        
         content.raw_text = raw_text
         lines = raw_text.strip().split('\n')
         
@@ -224,67 +294,38 @@ class MessageParserV2:
         
         for i, line in enumerate(lines[:5]):
             # 检查是否为数据行
-            digits_in_line = re.findall(r'\d', line)
-            if len(digits_in_line) >= 30:  # 至少有30个数字认为是数据行
+            if len(self.tokenizer.chars(line)) >= min_data_digits:
                 body_start = i
                 break
             header.raw_lines.append(line)
             
             # 提取头部信息
-            if '组' in line:
-                match = re.search(r'(\d+)\s*组', line)
-                if match:
-                    header.group_count = match.group(1)
+            match = GROUP_COUNT_PATTERN.search(line)
+            if match:
+                header.group_count = match.group(1)
         
         content.header = header
         
-        # 解析主体
-        global_idx = 0
-        segment = 1
-        line_in_segment = 1
-        
+        # 解析主体：各行的数字按定长分组（不足一组的尾部丢弃）后首尾相接，
+        # 每 groups_per_line 组为一行
+        body = []
         for line in lines[body_start:]:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # 提取所有数字
-            all_digits = re.sub(r'\D', '', line)
-            
-            # 按4位分组
-            for i in range(0, len(all_digits), DIGITS_PER_GROUP):
-                if i + DIGITS_PER_GROUP <= len(all_digits):
-                    value = all_digits[i:i + DIGITS_PER_GROUP]
-                    position = (global_idx % GROUPS_PER_LINE) + 1
-                    
-                    group = MessageGroup(
-                        segment=segment,
-                        line=line_in_segment,
-                        position=position,
-                        value=value,
-                        global_index=global_idx
-                    )
-                    groups.append(group)
-                    global_idx += 1
-                    
-                    # 更新段和行计数
-                    if position == GROUPS_PER_LINE:
-                        line_in_segment += 1
-                        if line_in_segment > LINES_PER_SEGMENT:
-                            line_in_segment = 1
-                            segment += 1
+            all_digits = self.tokenizer.chars(line)
+            body.append(all_digits[:len(all_digits) - len(all_digits) % width])
         
-        content.groups = groups
-        logger.info(f"TXT解析完成，共 {len(groups)} 组数字")
+        builder = GroupTableBuilder(message_format)
+        builder.add_digits(''.join(body))
+        content.table = builder.build()
+        logger.info(f"TXT解析完成，共 {content.group_count} 组数字")
         
         return content
 
 
-def create_parser() -> MessageParser:
-    """创建报文解析器"""
-    return MessageParser()
+def create_parser(message_format: MessageFormat = DEFAULT_FORMAT) -> MessageParser:
+    """创建报文解析器（按配置修正OCR易混字符）"""
+    return MessageParser(create_normalizer(), message_format)
 
 
-def create_parser_v2() -> MessageParserV2:
+def create_parser_v2(message_format: MessageFormat = DEFAULT_FORMAT) -> MessageParserV2:
     """创建增强版报文解析器"""
-    return MessageParserV2()
+    return MessageParserV2(message_format)
@@ -1,8 +1,11 @@
 """数据模型定义"""
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, computed_field, model_validator
 from typing import List, Optional
 from datetime import datetime
 
+from .group_table import GroupTable
+from .formats import STANDARD_FORMAT, get_format
+
 
 class MessageHeader(BaseModel):
     """报文头部信息"""
@@ -18,14 +21,53 @@ class MessageGroup(BaseModel):
     position: int          # 组位置 (1-10)
     value: str             # 4位数字值
     global_index: int      # 全局索引 (0-299)
+    confidence: Optional[float] = None  # OCR识别置信度（组内字符最小值），参照报文为空
+    raw_value: Optional[str] = None     # 易混字符修正前的识别值，未修正时为空
 
 
 class MessageContent(BaseModel):
-    """报文内容"""
+    """
+    报文内容
+
+    数字组以 GroupTable 紧凑存储；groups 在访问时才生成 MessageGroup 列表，
+    仅用于接口输出与持久化，内部处理应直接使用 table。
+    报文格式随 table 保存，输出为格式串 message_format，读回时据此还原段、行结构
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     header: MessageHeader = Field(default_factory=MessageHeader)
-    groups: List[MessageGroup] = Field(default_factory=list)
+    table: GroupTable = Field(default_factory=GroupTable, exclude=True)
     raw_text: str = ""
 
+    @model_validator(mode='before')
+    @classmethod
+    def _groups_to_table(cls, data):
+        """兼容以 groups 列表构造（及旧格式持久化数据，未记录报文格式的均为标准格式）"""
+        if isinstance(data, dict) and ('groups' in data or 'message_format' in data):
+            data = dict(data)
+            spec = data.pop('message_format', None)
+            if 'groups' in data:
+                message_format = get_format(spec) if spec else STANDARD_FORMAT
+                data['table'] = GroupTable.from_groups(data.pop('groups'), message_format)
+        return data
+
+    @computed_field
+    @property
+    def message_format(self) -> str:
+        """报文格式串"""
+        return self.table.message_format.spec
+
+    @computed_field
+    @property
+    def groups(self) -> List[MessageGroup]:
+        """数字组列表（每次访问重新生成）"""
+        return self.table.to_groups()
+
+    @property
+    def group_count(self) -> int:
+        """数字组数"""
+        return len(self.table)
+
 
 class ErrorDetail(BaseModel):
     """错误详情"""
@@ -38,6 +80,23 @@ class ErrorDetail(BaseModel):
     error_type: str        # 错误类型: mismatch, missing, extra
 
 
+class EscalatedRegion(BaseModel):
+    """自适应识别中以高分辨率重新识别的区域"""
+    page: int          # 页码（从1开始）
+    top: float         # 区域上边界（PDF坐标，pt）
+    bottom: float      # 区域下边界（PDF坐标，pt）
+    reason: str        # 升级原因: low_confidence, digit_count, empty_page
+    low_res_text: str  # 低分辨率识别结果
+    high_res_text: str # 高分辨率识别结果
+
+
+class PageRoute(BaseModel):
+    """单页的处理路径"""
+    page: int        # 页码（从1开始）
+    route: str       # 处理路径: text（PDF文本层）, ocr（渲染后识别）
+    digit_rows: int  # 文本层中的数字组行数
+
+
 class ReviewResult(BaseModel):
     """批阅结果"""
     id: str
@@ -51,12 +110,16 @@ class ReviewResult(BaseModel):
     header_info: MessageHeader # 头部信息
     status: str = "completed"  # 状态: processing, completed, failed
     message: str = ""          # 状态信息
+    escalations: List[EscalatedRegion] = Field(default_factory=list)  # 高分辨率重识别的区域
+    page_routes: List[PageRoute] = Field(default_factory=list)        # 各页处理路径
 
 
 class ReviewRequest(BaseModel):
     """批阅请求"""
     pdf_file_id: str
-    txt_file_id: str
+    txt_file_id: Optional[str] = None   # 已上传的TXT文件ID
+    reference_id: Optional[str] = None  # 参照报文库ID（与txt_file_id二选一）
+    message_format: Optional[str] = None  # 报文格式名或格式串，为空时使用默认格式
 
 
 class ReviewSummary(BaseModel):
@@ -67,3 +130,13 @@ class ReviewSummary(BaseModel):
     score: float
     error_count: int
     status: str
+
+
+class ReferenceInfo(BaseModel):
+    """参照报文库条目"""
+    id: str                    # 参照ID（内容哈希前缀，相同内容ID稳定）
+    filename: str              # 原始文件名
+    sha256: str                # 内容SHA-256
+    group_count: int           # 数字组数
+    header_info: MessageHeader # 头部信息
+    created_at: datetime
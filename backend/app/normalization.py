@@ -0,0 +1,49 @@
+"""OCR字符修正模块 - 识别结果中易混字符的修正映射"""
+import logging
+from typing import Dict
+
+from .config import OCR_CONFUSION_MAP
+
+logger = logging.getLogger(__name__)
+
+
+def parse_confusion_map(spec: str) -> Dict[str, str]:
+    """
+    解析易混字符映射配置
+
+    Args:
+        spec: 逗号分隔的 "识别字符:数字"，如 "O:0,l:1"
+
+    Returns:
+        识别字符 -> 数字 的映射
+
+    Raises:
+        ValueError: 格式错误，或映射的源、目标不是单个字符，或目标不是数字
+    """
+    confusions = {}
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        source, sep, target = item.partition(':')
+        if not sep or len(source) != 1 or len(target) != 1 or not target.isdigit():
+            raise ValueError(f"易混字符映射格式错误: {item!r}，应为 \"识别字符:数字\"")
+        confusions[source] = target
+    return confusions
+
+
+class OCRNormalizer:
+    """
+    OCR易混字符修正配置
+
+    只保存 识别字符 -> 数字 的映射，由解析器的数字组切分器编译进其转换表，
+    在取出分组字符的同一次 str.translate 中完成修正
+    """
+
+    def __init__(self, confusions: Dict[str, str]):
+        self.confusions = dict(confusions)
+
+
+def create_normalizer(spec: str = OCR_CONFUSION_MAP) -> OCRNormalizer:
+    """按配置创建OCR易混字符修正器"""
+    return OCRNormalizer(parse_confusion_map(spec))
@@ -0,0 +1,147 @@
+"""OCR结果缓存模块 - 按PDF内容哈希与OCR参数持久化识别结果"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from .config import OCR_CACHE_DIR, OCR_CACHE_MAX_BYTES
+from .models import EscalatedRegion, PageRoute
+from .ocr_processor import PDFRecognition
+
+logger = logging.getLogger(__name__)
+
+
+def file_sha256(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """分块计算文件的SHA-256"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class OCRResultCache:
+    """
+    OCR结果磁盘缓存
+
+    键为 PDF内容SHA-256 与 OCR参数签名 的组合哈希，同一文档在相同参数下
+    只识别一次。总大小超过上限时按最近访问时间（LRU）淘汰
+    """
+
+    def __init__(self, cache_dir: Path = OCR_CACHE_DIR, max_bytes: int = OCR_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def make_key(self, pdf_path: str, signature: dict, content_hash: Optional[str] = None) -> str:
+        """
+        生成缓存键
+
+        Args:
+            pdf_path: PDF文件路径
+            signature: OCR参数签名（渲染分辨率、阈值、预处理等）
+            content_hash: 已知的PDF内容SHA-256（如上传登记的内容哈希），为空时读取文件计算
+
+        Returns:
+            缓存键（十六进制哈希）
+        """
+        settings = json.dumps(signature, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(
+            f"{content_hash or file_sha256(pdf_path)}:{settings}".encode('utf-8')
+        ).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[PDFRecognition]:
+        """读取缓存，命中时刷新访问时间"""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return PDFRecognition(
+            data['lines'],
+            [(text, conf) for text, conf in data['results']],
+            [EscalatedRegion.model_validate(region) for region in data.get('escalations', [])],
+            [PageRoute.model_validate(route) for route in data.get('routes', [])]
+        )
+
+    def put(self, key: str, recognition: PDFRecognition):
+        """写入缓存（原子替换），并在超出容量时淘汰旧条目"""
+        path = self._entry_path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'lines': recognition.lines,
+                    'results': [(text, float(conf)) for text, conf in recognition.results],
+                    'escalations': [region.model_dump() for region in recognition.escalations],
+                    'routes': [route.model_dump() for route in recognition.routes]
+                }, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError) as e:
+            logger.warning(f"OCR缓存写入失败: {str(e)}")
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        self._evict()
+
+    def _evict(self):
+        """按最近访问时间淘汰，直至总大小不超过上限"""
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in self.cache_dir.glob("*.json"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry))
+                total += stat.st_size
+
+            if total <= self.max_bytes:
+                return
+
+            entries.sort(key=lambda e: e[0])
+            for _, size, entry in entries:
+                if total <= self.max_bytes:
+                    break
+                entry.unlink(missing_ok=True)
+                total -= size
+                self.evictions += 1
+            logger.info(f"OCR缓存淘汰完成，当前大小 {total} 字节")
+
+    def stats(self) -> dict:
+        """缓存命中统计"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'max_bytes': self.max_bytes,
+            }
+
+
+def create_ocr_cache(
+    cache_dir: Path = OCR_CACHE_DIR,
+    max_bytes: int = OCR_CACHE_MAX_BYTES
+) -> OCRResultCache:
+    """创建OCR结果缓存"""
+    return OCRResultCache(cache_dir, max_bytes)
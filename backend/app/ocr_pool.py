@@ -0,0 +1,168 @@
+"""OCR进程池模块 - 每个工作进程持有一个常驻的PaddleOCR引擎"""
+import logging
+import multiprocessing
+import os
+import queue
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, Tuple, Optional
+
+from .ocr_processor import OCRProcessor, PDFRecognition, PageResult, bounded_map, create_ocr_processor
+from .config import OCR_ENGINE_OPTIONS, OCR_WARMUP_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# 工作进程内的OCR处理器（由进程初始化函数创建，整个进程生命周期内复用）
+_worker_processor: Optional[OCRProcessor] = None
+
+
+def _init_worker(use_gpu: bool, engine_options: dict, ready_queue):
+    """
+    工作进程初始化：创建并加载OCR引擎，完成后向 ready_queue 报告 (进程ID, 引擎是否已加载)
+
+    每个进程恰好报告一次，主进程据此确认全部工作进程的状态
+    （探测任务可能全部落在先启动的进程上，不能用来确认每个进程）
+    """
+    global _worker_processor
+    _worker_processor = create_ocr_processor(use_gpu=use_gpu, engine_options=engine_options)
+    # 立即加载模型并预热，避免首个任务承担加载耗时；失败时保留延迟加载，不影响文本型PDF处理
+    try:
+        _worker_processor.warm_up()
+        logger.info(f"OCR工作进程 {os.getpid()} 初始化完成")
+    except Exception as e:
+        logger.warning(f"OCR工作进程 {os.getpid()} 预加载引擎失败: {str(e)}")
+    ready_queue.put((os.getpid(), _worker_processor.is_loaded))
+
+
+def _warm_up_in_worker(_: int) -> Tuple[int, bool]:
+    """引擎未加载时在工作进程中重新加载，返回进程ID及其OCR引擎是否已加载"""
+    if not _worker_processor.is_loaded:
+        try:
+            _worker_processor.warm_up()
+        except Exception as e:
+            logger.warning(f"OCR工作进程 {os.getpid()} 加载引擎失败: {str(e)}")
+    return os.getpid(), _worker_processor.is_loaded
+
+
+def _process_pdf_in_worker(pdf_path: str) -> PDFRecognition:
+    """在工作进程中处理整份PDF"""
+    return _worker_processor.process_pdf(pdf_path)
+
+
+def _process_page_in_worker(image: np.ndarray) -> PageResult:
+    """在工作进程中处理单页图像"""
+    return _worker_processor.process_page(image)
+
+
+class OCRWorkerPool:
+    """
+    OCR工作进程池
+
+    每个进程独立初始化一次OCR引擎（参数与主进程一致），
+    多份文档可在不同CPU核心上并行识别
+    """
+
+    def __init__(
+        self,
+        num_workers: int,
+        use_gpu: bool = False,
+        engine_options: Optional[dict] = None
+    ):
+        self.num_workers = num_workers
+        self.loaded_workers = 0
+        self.engine_options = dict(OCR_ENGINE_OPTIONS if engine_options is None else engine_options)
+        # 使用spawn启动方式，避免fork继承主进程中的线程和模型状态
+        context = multiprocessing.get_context("spawn")
+        # 各工作进程初始化完成后报告状态
+        self._ready_queue = context.Queue()
+        # 已报告的工作进程: 进程ID -> 引擎是否已加载
+        self._workers: Dict[int, bool] = {}
+        self.executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(use_gpu, self.engine_options, self._ready_queue)
+        )
+        logger.info(f"OCR进程池已创建，工作进程数 {num_workers}")
+
+    def process_pdf(self, pdf_path: str) -> PDFRecognition:
+        """
+        将PDF分派给空闲工作进程处理（阻塞直至完成）
+
+        Args:
+            pdf_path: PDF文件路径
+
+        Returns:
+            识别结果
+        """
+        return self.executor.submit(_process_pdf_in_worker, pdf_path).result()
+
+    def map_pages(self, images: Iterable[np.ndarray]) -> Iterator[PageResult]:
+        """
+        将各页图像分派给工作进程并行识别
+
+        在途页面数不超过工作进程数，页面按需渲染
+
+        Args:
+            images: 页面图像迭代器
+
+        Returns:
+            按页序产出的各页处理结果
+        """
+        return bounded_map(self.executor, _process_page_in_worker, images, self.num_workers)
+
+    def _record(self, pid: int, loaded: bool):
+        # 引擎加载后不会卸载，先后到达的报告取并集
+        self._workers[pid] = self._workers.get(pid, False) or loaded
+
+    def warm_up(self, timeout: float = OCR_WARMUP_TIMEOUT) -> int:
+        """
+        启动全部工作进程并等待其完成引擎加载
+
+        提交与进程数相同的加载任务（进程按需创建，同时也使引擎加载失败的进程重试加载），
+        再等待各进程初始化时的报告，直至全部进程报告或超时。可重复调用
+
+        Args:
+            timeout: 最长等待秒数
+
+        Returns:
+            引擎已加载的工作进程数
+        """
+        deadline = time.monotonic() + timeout
+        futures = [self.executor.submit(_warm_up_in_worker, i) for i in range(self.num_workers)]
+
+        while len(self._workers) < self.num_workers:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                self._record(*self._ready_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        for future in futures:
+            try:
+                self._record(*future.result(timeout=max(0.0, deadline - time.monotonic())))
+            except Exception as e:
+                logger.warning(f"OCR工作进程加载任务未完成: {str(e)}")
+
+        self.loaded_workers = sum(1 for loaded in self._workers.values() if loaded)
+        logger.info(
+            f"OCR进程池预热: {len(self._workers)}/{self.num_workers} 个进程已启动，"
+            f"{self.loaded_workers} 个引擎已加载"
+        )
+        return self.loaded_workers
+
+    def shutdown(self, wait: bool = True):
+        """关闭进程池"""
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def create_ocr_pool(
+    num_workers: int,
+    use_gpu: bool = False,
+    engine_options: Optional[dict] = None
+) -> OCRWorkerPool:
+    """创建OCR进程池"""
+    return OCRWorkerPool(num_workers, use_gpu=use_gpu, engine_options=engine_options)
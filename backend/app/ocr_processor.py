@@ -1,38 +1,210 @@
 """PDF OCR处理模块 - 使用PaddleOCR进行手写数字识别"""
 import logging
-from pathlib import Path
-from typing import List, Tuple, Optional
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Tuple, Optional, TypeVar
 import numpy as np
 import cv2
 from PIL import Image
 import fitz  # PyMuPDF
 
+from .config import (
+    OCR_LANG, OCR_ENGINE_OPTIONS, OCR_DPI, OCR_RENDER_GRAY, OCR_LAYOUT_MODE,
+    OCR_ADAPTIVE, OCR_LOW_DPI, OCR_ESCALATE_CONFIDENCE, OCR_PREPROCESS_PRESET,
+    OCR_REFINE_CONFIDENCE, OCR_TEXT_LAYER_MIN_ROWS, OCR_REGION_DETECT_SCALE,
+    DIGITS_PER_GROUP, GROUPS_PER_LINE
+)
+from .table_grid import detect_grid, is_blank
+from .layout import LAYOUT_VERSION, boxes_from_results, build_layout
+from .preprocessing import create_pipeline
+from .models import EscalatedRegion, PageRoute
+
 logger = logging.getLogger(__name__)
 
+# 单页处理结果: (行列表, (文本, 置信度)元组列表)
+PageResult = Tuple[List[str], List[Tuple[str, float]]]
+
+
+def line_char_confidences(
+    lines: List[str],
+    results: List[Tuple[str, float]]
+) -> Optional[List[List[Optional[float]]]]:
+    """
+    将识别置信度映射到每行的每个字符
+    
+    各处理路径输出的行文本都是连续若干识别结果以空格连接而成，
+    据此依次对齐；分隔用的空格置信度为None
+    
+    Args:
+        lines: 行列表
+        results: (文本, 置信度) 元组列表
+        
+    Returns:
+        每行的逐字符置信度列表，无法对齐时返回None
+    """
+    confidences = []
+    idx = 0
+    for line in lines:
+        char_conf = []
+        while len(char_conf) < len(line):
+            if idx >= len(results):
+                return None
+            text, confidence = results[idx]
+            idx += 1
+            if char_conf:
+                char_conf.append(None)
+            char_conf.extend([float(confidence)] * len(text))
+        if len(char_conf) != len(line):
+            return None
+        confidences.append(char_conf)
+    return confidences
+
+
+@dataclass
+class PDFRecognition:
+    """整份PDF的识别结果"""
+    lines: List[str]                  # 行列表
+    results: List[Tuple[str, float]]  # (文本, 置信度)元组列表，与行内顺序一致
+    escalations: List[EscalatedRegion] = field(default_factory=list)  # 高分辨率重识别的区域
+    routes: List[PageRoute] = field(default_factory=list)             # 各页处理路径
+
+
+class _PixmapBuffer:
+    """
+    以 __array_interface__ 暴露Pixmap的像素缓冲区
+
+    np.asarray 得到的数组直接引用渲染结果的内存（不复制），
+    且数组的base指向本对象，保证Pixmap在数组释放前不会被回收
+    """
+
+    def __init__(self, pix: "fitz.Pixmap"):
+        self.pix = pix
+        self.__array_interface__ = {
+            'shape': (pix.height, pix.width, pix.n) if pix.n > 1 else (pix.height, pix.width),
+            'typestr': '|u1',
+            'data': (pix.samples_ptr, False),
+            'strides': (pix.stride, pix.n, 1) if pix.n > 1 else (pix.stride, 1),
+            'version': 3,
+        }
+
+
+# 文本层中的4位数字组
+_DIGIT_GROUP_PATTERN = re.compile(r'\d{4}')
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def bounded_map(
+    executor: Executor,
+    func: Callable[[T], R],
+    items: Iterable[T],
+    window: int
+) -> Iterator[R]:
+    """
+    有界并行映射，按输入顺序产出结果
+    
+    与 Executor.map 不同，最多只有 window 个任务同时在途，
+    输入迭代器被惰性消费，避免一次性渲染全部页面
+    """
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        del item
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
 
 class OCRProcessor:
     """PDF OCR处理器"""
     
-    def __init__(self, use_gpu: bool = False):
+    def __init__(
+        self,
+        use_gpu: bool = False,
+        engine_options: Optional[dict] = None,
+        layout_mode: str = OCR_LAYOUT_MODE,
+        adaptive: bool = OCR_ADAPTIVE,
+        preprocess_preset: str = OCR_PREPROCESS_PRESET
+    ):
         self.use_gpu = use_gpu
+        self.layout_mode = layout_mode
+        self.adaptive = adaptive
+        self.low_dpi = OCR_LOW_DPI
+        self.escalate_confidence = OCR_ESCALATE_CONFIDENCE
+        self.preprocess_pipeline = create_pipeline(preprocess_preset)
+        self.refine_confidence = OCR_REFINE_CONFIDENCE
+        self.text_layer_min_rows = OCR_TEXT_LAYER_MIN_ROWS
+        self.render_gray = OCR_RENDER_GRAY
+        self.region_detect_scale = OCR_REGION_DETECT_SCALE
+        self.engine_options = dict(OCR_ENGINE_OPTIONS if engine_options is None else engine_options)
         self._ocr = None
+        # PaddleOCR实例非线程安全，多个批阅任务共享时需串行调用
+        self._ocr_lock = threading.Lock()
     
     @property
     def ocr(self):
         """延迟加载OCR引擎"""
         if self._ocr is None:
-            from paddleocr import PaddleOCR
-            self._ocr = PaddleOCR(
-                use_angle_cls=True,
-                lang='ch',
-                use_gpu=self.use_gpu,
-                show_log=False,
-                det_db_thresh=0.3,
-                det_db_box_thresh=0.5,
-                rec_batch_num=6,
-            )
+            with self._ocr_lock:
+                if self._ocr is None:
+                    self._ocr = self._create_engine()
         return self._ocr
     
+    @property
+    def is_loaded(self) -> bool:
+        """OCR引擎是否已加载"""
+        return self._ocr is not None
+    
+    def warm_up(self):
+        """
+        预热：加载模型并执行一次识别
+        
+        首次推理会触发内存分配等初始化，预热后首个批阅任务不再承担这部分耗时
+        """
+        dummy = np.full((64, 320, 3), 255, dtype=np.uint8)
+        cv2.putText(dummy, "1234 5678", (10, 45), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 2)
+        
+        engine = self.ocr
+        with self._ocr_lock:
+            engine.ocr(dummy, cls=True)
+        logger.info("OCR引擎预热完成")
+    
+    def _create_engine(self):
+        """创建PaddleOCR引擎"""
+        from paddleocr import PaddleOCR
+        return PaddleOCR(
+            lang=OCR_LANG,
+            use_gpu=self.use_gpu,
+            show_log=False,
+            **self.engine_options
+        )
+    
+    def cache_signature(self) -> dict:
+        """
+        影响识别结果的全部参数，用于OCR结果缓存的键
+        
+        修改渲染、预处理或引擎参数后缓存自动失效
+        """
+        return {
+            'dpi': OCR_DPI,
+            'render_gray': self.render_gray,
+            'lang': OCR_LANG,
+            'engine': self.engine_options,
+            'preprocess': self.preprocess_pipeline.signature(),
+            'layout': LAYOUT_VERSION,
+            'region_detect_scale': self.region_detect_scale,
+            'layout_mode': self.layout_mode,
+            'refine_confidence': self.refine_confidence,
+            'adaptive': [self.low_dpi, self.escalate_confidence] if self.adaptive else None,
+            'text_layer_min_rows': self.text_layer_min_rows,
+        }
+    
     def extract_text_from_pdf(self, pdf_path: str) -> List[str]:
         """
         直接从PDF提取文本（用于数字化PDF，非扫描件）
@@ -47,10 +219,7 @@ class OCRProcessor:
         try:
             doc = fitz.open(pdf_path)
             for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                text = page.get_text()
-                page_lines = text.strip().split('\n')
-                lines.extend([line.strip() for line in page_lines if line.strip()])
+                lines.extend(self.extract_page_text(doc.load_page(page_num)))
             doc.close()
             logger.info(f"PDF文本提取完成，共 {len(lines)} 行")
         except Exception as e:
@@ -58,45 +227,114 @@ class OCRProcessor:
             raise
         return lines
     
-    def pdf_to_images(self, pdf_path: str, dpi: int = 300) -> List[np.ndarray]:
+    @staticmethod
+    def extract_page_text(page: "fitz.Page") -> List[str]:
+        """提取单页文本层的非空行"""
+        return [line.strip() for line in page.get_text().strip().split('\n') if line.strip()]
+    
+    @staticmethod
+    def count_digit_rows(lines: List[str]) -> int:
+        """统计数字组行数（至少包含3个4位数字组的行，与报文解析的数据行判定一致）"""
+        return sum(1 for line in lines if len(_DIGIT_GROUP_PATTERN.findall(line)) >= 3)
+    
+    @staticmethod
+    def _pixmap_to_image(pix: "fitz.Pixmap") -> np.ndarray:
         """
-        将PDF转换为图像列表
+        将渲染结果转换为图像数组
+        
+        灰度渲染结果直接以零拷贝视图返回单通道图像；彩色结果转换为BGR（OpenCV标准）
+        """
+        img = np.asarray(_PixmapBuffer(pix))
+        
+        if pix.n == 4:  # RGBA
+            return cv2.cvtColor(img, cv2.COLOR_RGBA2BGR)
+        elif pix.n == 3:  # RGB
+            return cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+        return img
+    
+    def render_page(
+        self,
+        page: "fitz.Page",
+        dpi: int = OCR_DPI,
+        clip: Optional["fitz.Rect"] = None,
+        gray: Optional[bool] = None
+    ) -> np.ndarray:
+        """
+        渲染单页（或页面中的矩形区域）为图像
+        
+        Args:
+            page: PDF页面
+            dpi: 渲染分辨率
+            clip: 渲染区域（PDF坐标，单位pt），为空时渲染整页
+            gray: 是否直接渲染为灰度图，为空时按配置
+            
+        Returns:
+            灰度图像数组，或BGR图像数组（gray为False时）
+        """
+        if gray is None:
+            gray = self.render_gray
+        mat = fitz.Matrix(dpi / 72, dpi / 72)
+        if gray:
+            pix = page.get_pixmap(matrix=mat, clip=clip, colorspace=fitz.csGRAY, alpha=False)
+        else:
+            pix = page.get_pixmap(matrix=mat, clip=clip)
+        return self._pixmap_to_image(pix)
+    
+    def iter_pdf_images(
+        self,
+        pdf_path: str,
+        dpi: int = OCR_DPI,
+        pages: Optional[Iterable[int]] = None
+    ) -> Iterator[np.ndarray]:
+        """
+        逐页渲染PDF图像（生成器）
+        
+        每次只渲染一页，调用方处理完并释放引用后再渲染下一页，
+        单个请求的峰值内存约为一页图像
         
         Args:
             pdf_path: PDF文件路径
             dpi: 转换分辨率
+            pages: 需要渲染的页面索引（从0开始），为空时渲染全部页面
             
-        Returns:
-            图像数组列表
+        Yields:
+            页面图像数组
         """
-        images = []
         try:
             doc = fitz.open(pdf_path)
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                # 高分辨率渲染以提高OCR准确率
-                mat = fitz.Matrix(dpi / 72, dpi / 72)
-                pix = page.get_pixmap(matrix=mat)
-                
-                # 转换为numpy数组
-                img = np.frombuffer(pix.samples, dtype=np.uint8).reshape(
-                    pix.height, pix.width, pix.n
-                )
-                
-                # 转换为BGR格式（OpenCV标准）
-                if pix.n == 4:  # RGBA
-                    img = cv2.cvtColor(img, cv2.COLOR_RGBA2BGR)
-                elif pix.n == 3:  # RGB
-                    img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
-                
-                images.append(img)
-            doc.close()
-            logger.info(f"成功将PDF转换为 {len(images)} 页图像")
         except Exception as e:
             logger.error(f"PDF转换失败: {str(e)}")
             raise
         
-        return images
+        page_count = 0
+        try:
+            for page_num in (range(len(doc)) if pages is None else pages):
+                try:
+                    # 高分辨率渲染以提高OCR准确率
+                    img = self.render_page(doc.load_page(page_num), dpi)
+                except Exception as e:
+                    logger.error(f"PDF第 {page_num + 1} 页转换失败: {str(e)}")
+                    raise
+                
+                page_count += 1
+                yield img
+                del img
+            logger.info(f"成功将PDF转换为 {page_count} 页图像")
+        finally:
+            doc.close()
+    
+    def pdf_to_images(self, pdf_path: str, dpi: int = OCR_DPI) -> List[np.ndarray]:
+        """
+        将PDF转换为图像列表
+        
+        Args:
+            pdf_path: PDF文件路径
+            dpi: 转换分辨率
+            
+        Returns:
+            图像数组列表
+        """
+        return list(self.iter_pdf_images(pdf_path, dpi=dpi))
     
     def preprocess_image(self, image: np.ndarray) -> np.ndarray:
         """
@@ -108,40 +346,42 @@ class OCRProcessor:
         Returns:
             预处理后的图像
         """
-        # 转换为灰度图
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image.copy()
-        
-        # 自适应二值化处理手写字迹
-        binary = cv2.adaptiveThreshold(
-            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-            cv2.THRESH_BINARY, 11, 2
+        # 按配置的流水线执行灰度化、二值化、去噪等步骤
+        gray, timings = self.preprocess_pipeline.run(image)
+        logger.debug(
+            f"预处理({self.preprocess_pipeline.name}): " +
+            ", ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in timings.items())
         )
         
-        # 去噪
-        denoised = cv2.fastNlMeansDenoising(binary, None, 10, 7, 21)
-        
         # 转回BGR以供OCR使用
-        processed = cv2.cvtColor(denoised, cv2.COLOR_GRAY2BGR)
+        processed = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
         
         return processed
     
-    def detect_table_region(self, image: np.ndarray) -> Optional[np.ndarray]:
+    def detect_table_box(self, image: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
         """
-        检测表格区域
+        检测表格区域的边界框
+        
+        边缘检测与轮廓查找在缩小后的图像上进行（只需一个外接矩形，
+        无需全分辨率），得到的边界框再映射回原图坐标
         
         Args:
-            image: 输入图像
+            image: 输入图像（灰度或BGR）
             
         Returns:
-            表格区域图像，如果未检测到返回原图
+            原图坐标下的 (x, y, w, h)，未检测到足够大的表格时返回None
         """
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        height, width = gray.shape
+        
+        scale = self.region_detect_scale
+        if 0 < scale < 1:
+            small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        else:
+            small, scale = gray, 1.0
         
         # 边缘检测
-        edges = cv2.Canny(gray, 50, 150)
+        edges = cv2.Canny(small, 50, 150)
         
         # 查找轮廓
         contours, _ = cv2.findContours(
@@ -151,20 +391,49 @@ class OCRProcessor:
         if contours:
             # 找到最大轮廓（假设是表格）
             largest_contour = max(contours, key=cv2.contourArea)
-            x, y, w, h = cv2.boundingRect(largest_contour)
+            sx, sy, sw, sh = cv2.boundingRect(largest_contour)
             
             # 确保区域足够大
-            if w > image.shape[1] * 0.3 and h > image.shape[0] * 0.3:
+            if sw > small.shape[1] * 0.3 and sh > small.shape[0] * 0.3:
+                # 映射回原图坐标（向外取整，不丢失边缘像素）
+                x = int(sx / scale)
+                y = int(sy / scale)
+                w = int(np.ceil((sx + sw) / scale)) - x
+                h = int(np.ceil((sy + sh) / scale)) - y
+                
                 # 添加边距
                 margin = 10
                 x = max(0, x - margin)
                 y = max(0, y - margin)
-                w = min(image.shape[1] - x, w + 2 * margin)
-                h = min(image.shape[0] - y, h + 2 * margin)
+                w = min(width - x, w + 2 * margin)
+                h = min(height - y, h + 2 * margin)
                 
-                return image[y:y+h, x:x+w]
+                return x, y, w, h
+        
+        return None
+    
+    def detect_table_region(
+        self,
+        image: np.ndarray,
+        box: Optional[Tuple[int, int, int, int]] = None
+    ) -> Optional[np.ndarray]:
+        """
+        检测表格区域
+        
+        Args:
+            image: 输入图像
+            box: 已检测到的边界框（由 detect_table_box 得到），为空时重新检测
+            
+        Returns:
+            表格区域图像，如果未检测到返回原图
+        """
+        if box is None:
+            box = self.detect_table_box(image)
+        if box is None:
+            return image
         
-        return image
+        x, y, w, h = box
+        return image[y:y+h, x:x+w]
     
     def extract_text_from_image(self, image: np.ndarray) -> List[Tuple[str, float, List]]:
         """
@@ -174,7 +443,8 @@ class OCRProcessor:
             image: 输入图像
             
         Returns:
-            (文本, 置信度, 位置) 元组列表
+            (文本, 置信度, 位置) 元组列表，
+            位置为 [中心x, 中心y, 左, 上, 右, 下]
         """
         results = []
         
@@ -183,7 +453,9 @@ class OCRProcessor:
             processed = self.preprocess_image(image)
             
             # OCR识别
-            ocr_result = self.ocr.ocr(processed, cls=True)
+            engine = self.ocr
+            with self._ocr_lock:
+                ocr_result = engine.ocr(processed, cls=True)
             
             if ocr_result and ocr_result[0]:
                 for line in ocr_result[0]:
@@ -195,7 +467,14 @@ class OCRProcessor:
                     center_y = (box[0][1] + box[2][1]) / 2
                     center_x = (box[0][0] + box[2][0]) / 2
                     
-                    results.append((text, confidence, [center_x, center_y]))
+                    # 文本框外接矩形，用于低置信度结果的重识别
+                    xs = [point[0] for point in box]
+                    ys = [point[1] for point in box]
+                    
+                    results.append((
+                        text, confidence,
+                        [center_x, center_y, min(xs), min(ys), max(xs), max(ys)]
+                    ))
             
             # 按y坐标排序（从上到下），然后按x坐标排序（从左到右）
             results.sort(key=lambda x: (x[2][1], x[2][0]))
@@ -208,73 +487,510 @@ class OCRProcessor:
         
         return results
     
-    def process_pdf(self, pdf_path: str, use_ocr: bool = True) -> Tuple[List[str], List[Tuple[str, float]]]:
+    def _cluster_rows(
+        self,
+        results: List[Tuple[str, float, List]]
+    ) -> List[List[Tuple[str, float, List]]]:
         """
-        处理PDF文件，提取所有文本
+        按文本框将识别结果聚成行（行间阈值由本页文本框高度得出）
         
         Args:
-            pdf_path: PDF文件路径
-            use_ocr: 是否使用OCR（对于数字化PDF可以设为False）
+            results: (文本, 置信度, 位置) 元组列表
+            
+        Returns:
+            行列表（从上到下），每行为该行的识别结果（从左到右）
+        """
+        layout = build_layout(boxes_from_results(results))
+        return [[results[i] for i in row] for row in layout.rows]
+    
+    def _group_rows(
+        self,
+        results: List[Tuple[str, float, List]]
+    ) -> Tuple[List[str], List[Tuple[str, float]]]:
+        """
+        将识别结果组织成行
+        
+        Args:
+            results: (文本, 置信度, 位置) 元组列表
+            
+        Returns:
+            (行列表, (文本, 置信度)元组列表)，后者与行内顺序一致
+        """
+        rows = self._cluster_rows(results)
+        lines = [" ".join(text for text, _, _ in row) for row in rows]
+        texts = [(text, confidence) for row in rows for text, confidence, _ in row]
+        return lines, texts
+    
+    def recognize_cells(self, cells: List[np.ndarray]) -> List[Tuple[str, float]]:
+        """
+        跳过文本检测，直接批量识别单元格图像
+        
+        Args:
+            cells: 单元格图像列表（BGR）
+            
+        Returns:
+            (文本, 置信度) 元组列表，与输入顺序一致
+        """
+        if not cells:
+            return []
+        
+        engine = self.ocr
+        with self._ocr_lock:
+            # 识别器按 rec_batch_num 分批推理
+            rec_results, _ = engine.text_recognizer(cells)
+        
+        return [(text, float(confidence)) for text, confidence in rec_results]
+    
+    def rerecognize(self, crops: List[np.ndarray]) -> List[Tuple[str, float]]:
+        """
+        使用更重的设置重新识别低置信度区域
+        
+        区域放大2倍、强去噪并二值化后跳过检测直接识别
+        
+        Args:
+            crops: 区域图像列表
+            
+        Returns:
+            (文本, 置信度) 元组列表，与输入顺序一致
+        """
+        prepared = []
+        for crop in crops:
+            gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+            gray = cv2.resize(gray, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
+            gray = cv2.fastNlMeansDenoising(gray, None, 15, 7, 21)
+            _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            prepared.append(cv2.cvtColor(binary, cv2.COLOR_GRAY2BGR))
+        return self.recognize_cells(prepared)
+    
+    def refine_low_confidence(
+        self,
+        image: np.ndarray,
+        results: List[Tuple[str, float, List]]
+    ) -> List[Tuple[str, float, List]]:
+        """
+        对置信度低于阈值的文本框进行二次识别，仅在置信度提高时采用新结果
+        
+        Args:
+            image: 识别所用的图像
+            results: extract_text_from_image 的结果
             
         Returns:
-            (行列表, (文本, 置信度)元组列表)
+            更新后的结果（顺序不变）
         """
-        # 首先尝试直接提取文本
+        if self.refine_confidence <= 0:
+            return results
+        
+        targets = [i for i, (_, confidence, _) in enumerate(results) if confidence < self.refine_confidence]
+        if not targets:
+            return results
+        
+        h, w = image.shape[:2]
+        crops = []
+        for i in targets:
+            _, _, x1, y1, x2, y2 = results[i][2]
+            pad = max(4, int((y2 - y1) * 0.15))
+            crops.append(image[
+                max(0, int(y1) - pad):min(h, int(y2) + pad),
+                max(0, int(x1) - pad):min(w, int(x2) + pad)
+            ])
+        
         try:
-            lines = self.extract_text_from_pdf(pdf_path)
-            # 检查是否提取到足够的数字内容
-            total_digits = sum(len([c for c in line if c.isdigit()]) for line in lines)
-            if total_digits >= 100:  # 如果有足够多的数字，认为是数字化PDF
-                logger.info(f"使用直接文本提取，找到 {total_digits} 个数字")
-                return lines, [(line, 1.0) for line in lines]
+            recognized = self.rerecognize(crops)
         except Exception as e:
-            logger.warning(f"直接文本提取失败，尝试OCR: {str(e)}")
+            logger.warning(f"低置信度区域二次识别失败: {str(e)}")
+            return results
         
-        # 如果直接提取失败或内容不足，使用OCR
-        if not use_ocr:
-            return lines, [(line, 1.0) for line in lines]
+        refined = list(results)
+        improved = 0
+        for i, (text, confidence) in zip(targets, recognized):
+            if text and confidence > refined[i][1]:
+                refined[i] = (text, confidence, refined[i][2])
+                improved += 1
+        logger.info(f"低置信度二次识别: {len(targets)} 个区域，{improved} 个结果改进")
         
-        all_lines = []
-        all_results = []
+        return refined
+    
+    def process_page_grid(self, image: np.ndarray) -> Optional[PageResult]:
+        """
+        网格模式处理单页：按表格线切分数字组单元格并批量识别
         
-        # 转换PDF为图像
-        images = self.pdf_to_images(pdf_path)
+        表格上方区域（报文头部）仍使用文本检测识别；表格内每个单元格
+        直接对应一个数字组，行列由网格位置确定，无需按坐标分组
         
-        for page_idx, image in enumerate(images):
-            logger.info(f"处理第 {page_idx + 1} 页...")
+        Args:
+            image: 页面图像
             
-            # 检测表格区域
-            table_region = self.detect_table_region(image)
+        Returns:
+            (该页行列表, (文本, 置信度)元组列表)，未检测到表格网格时返回None
+        """
+        grid = detect_grid(image)
+        if grid is None:
+            return None
+        
+        page_lines = []
+        page_results = []
+        
+        # 表格上方的头部信息
+        if grid.top > image.shape[0] * 0.03:
+            header_lines, header_results = self._group_rows(
+                self.extract_text_from_image(image[:grid.top])
+            )
+            page_lines.extend(header_lines)
+            page_results.extend(header_results)
+        
+        # 切分非空单元格
+        cells = []
+        slots = []
+        for row in range(grid.rows):
+            for col in range(grid.cols):
+                x1, y1, x2, y2 = grid.cell_box(row, col)
+                cell = image[y1:y2, x1:x2]
+                if is_blank(cell):
+                    continue
+                if cell.ndim == 2:
+                    cell = cv2.cvtColor(cell, cv2.COLOR_GRAY2BGR)
+                cells.append(cell)
+                slots.append((row, col))
+        
+        cell_results = self.recognize_cells(cells)
+        
+        # 低置信度单元格二次识别
+        if self.refine_confidence > 0:
+            targets = [i for i, (_, confidence) in enumerate(cell_results) if confidence < self.refine_confidence]
+            if targets:
+                try:
+                    for i, (text, confidence) in zip(targets, self.rerecognize([cells[i] for i in targets])):
+                        if text and confidence > cell_results[i][1]:
+                            cell_results[i] = (text, confidence)
+                except Exception as e:
+                    logger.warning(f"低置信度单元格二次识别失败: {str(e)}")
+        
+        recognized = dict(zip(slots, cell_results))
+        logger.info(f"网格模式: {grid.rows} 行 x {grid.cols} 列，识别 {len(cells)} 个单元格")
+        
+        # 按网格位置重建行；空白单元格以?占位，保持组位置不偏移。
+        # 结果与行内数字组一一对应（行文本即各组以空格连接），便于按组保留置信度
+        for row in range(grid.rows):
+            row_cells = [recognized.get((row, col)) for col in range(grid.cols)]
+            if all(cell is None for cell in row_cells):
+                continue  # 未填写的空行
             
-            # 提取文本
-            results = self.extract_text_from_image(table_region)
+            tokens = []
+            for cell in row_cells:
+                if cell is None:
+                    token, confidence = '?' * DIGITS_PER_GROUP, 0.0
+                else:
+                    text, confidence = cell
+                    digits = ''.join(c for c in text if c.isdigit())
+                    token = digits[:DIGITS_PER_GROUP].ljust(DIGITS_PER_GROUP, '?')
+                tokens.append(token)
+                page_results.append((token, confidence))
+            page_lines.append(" ".join(tokens))
+        
+        return page_lines, page_results
+    
+    def process_page(self, image: np.ndarray) -> Tuple[List[str], List[Tuple[str, float]]]:
+        """
+        处理单页图像：检测表格区域、识别文本并组织成行
+        
+        Args:
+            image: 页面图像
             
-            # 组织成行
-            current_line = []
-            current_y = -1
-            y_threshold = 30  # 同一行的y坐标阈值
+        Returns:
+            (该页行列表, (文本, 置信度)元组列表)
+        """
+        # 整页倾斜校正在区域检测之前执行一次，之后的检测、识别与重识别裁剪都在同一坐标系中
+        image, _ = self.preprocess_pipeline.prepare_page(image)
+        
+        if self.layout_mode == "grid":
+            page = self.process_page_grid(image)
+            if page is not None:
+                return page
+            logger.info("未检测到表格网格，回退到文本检测模式")
+        
+        # 检测表格区域
+        table_region = self.detect_table_region(image)
+        
+        # 提取文本，低置信度文本框二次识别后组织成行
+        results = self.extract_text_from_image(table_region)
+        results = self.refine_low_confidence(table_region, results)
+        return self._group_rows(results)
+    
+    def _escalation_reason(self, row: List[Tuple[str, float, List]]) -> Optional[str]:
+        """判断低分辨率识别的一行是否需要以高分辨率重新识别"""
+        if min(confidence for _, confidence, _ in row) < self.escalate_confidence:
+            return "low_confidence"
+        
+        digits = sum(c.isdigit() for text, _, _ in row for c in text)
+        # 数据行（至少3组数字）的数字数不足一整行
+        if DIGITS_PER_GROUP * 3 <= digits < DIGITS_PER_GROUP * GROUPS_PER_LINE:
+            return "digit_count"
+        
+        return None
+    
+    def process_page_adaptive(
+        self,
+        page: "fitz.Page",
+        page_idx: int
+    ) -> Tuple[List[str], List[Tuple[str, float]], List[EscalatedRegion]]:
+        """
+        自适应多分辨率识别单页
+        
+        先以低分辨率渲染并识别整页，再仅将置信度低于阈值或数字数不足的行
+        按原分辨率重新渲染该行所在的区域并识别，替换低分辨率结果
+        
+        Args:
+            page: PDF页面
+            page_idx: 页面索引（从0开始）
+        
+        Returns:
+            (该页行列表, (文本, 置信度)元组列表, 升级区域列表)
+        """
+        page_lines = []
+        page_results = []
+        escalations = []
+        
+        low_scale = self.low_dpi / 72
+        high_scale = OCR_DPI / 72
+        page_rect = page.rect
+        image = self.render_page(page, self.low_dpi)
+        # 行检测在倾斜校正后的低分辨率图像上进行，行的位置再映射回未旋转的页面坐标，
+        # 以便按原页面裁剪高分辨率区域
+        image, matrix = self.preprocess_pipeline.prepare_page(image)
+        
+        box = self.detect_table_box(image)
+        if box is None:
+            box = (0, 0, image.shape[1], image.shape[0])
+        x, y, w, h = box
+        rows = self._cluster_rows(self.extract_text_from_image(image[y:y+h, x:x+w]))
+        del image
+        
+        if not rows:
+            # 低分辨率下未识别到内容，整页按原分辨率识别
+            page_lines, page_results = self.process_page(self.render_page(page, OCR_DPI))
+            escalations.append(EscalatedRegion(
+                page=page_idx + 1,
+                top=page_rect.y0,
+                bottom=page_rect.y1,
+                reason="empty_page",
+                low_res_text="",
+                high_res_text="\n".join(page_lines)
+            ))
+            return page_lines, page_results, escalations
+        
+        # 各文本框中心的纵坐标（pt，未旋转的页面坐标），用于确定每行的重识别范围
+        row_ys = [
+            self._page_points([(x + pos[0], y + pos[1]) for _, _, pos in row], matrix)[:, 1] / low_scale
+            for row in rows
+        ]
+        centers = [float(ys.mean()) for ys in row_ys]
+        spacing = float(np.median(np.diff(centers))) if len(centers) > 1 else 24.0
+        corners = self._page_points([(x, y), (x + w, y), (x, y + h), (x + w, y + h)], matrix)
+        left = max(page_rect.x0, page_rect.x0 + corners[:, 0].min() / low_scale)
+        right = min(page_rect.x1, page_rect.x0 + corners[:, 0].max() / low_scale)
+        
+        for row, ys in zip(rows, row_ys):
+            low_text = " ".join(text for text, _, _ in row)
+            reason = self._escalation_reason(row)
             
-            for text, confidence, pos in results:
-                if current_y < 0:
-                    current_y = pos[1]
+            if reason is not None:
+                top = max(page_rect.y0, page_rect.y0 + min(ys) - spacing * 0.5)
+                bottom = min(page_rect.y1, page_rect.y0 + max(ys) + spacing * 0.5)
+                band = self.render_page(page, OCR_DPI, clip=fitz.Rect(left, top, right, bottom))
                 
-                if abs(pos[1] - current_y) < y_threshold:
-                    current_line.append(text)
-                else:
-                    if current_line:
-                        all_lines.append(" ".join(current_line))
-                    current_line = [text]
-                    current_y = pos[1]
+                # 只保留中心位于本行范围内的结果，排除相邻行的残缺文字
+                low_edge = (min(ys) - top - spacing * 0.35) * high_scale
+                high_edge = (max(ys) - top + spacing * 0.35) * high_scale
+                band_results = [
+                    item for item in self.extract_text_from_image(band)
+                    if low_edge <= item[2][1] <= high_edge
+                ]
                 
-                all_results.append((text, confidence))
+                if band_results:
+                    band_lines, band_texts = self._group_rows(band_results)
+                    page_lines.extend(band_lines)
+                    page_results.extend(band_texts)
+                    escalations.append(EscalatedRegion(
+                        page=page_idx + 1,
+                        top=top,
+                        bottom=bottom,
+                        reason=reason,
+                        low_res_text=low_text,
+                        high_res_text="\n".join(band_lines)
+                    ))
+                    continue
+            
+            page_lines.append(low_text)
+            page_results.extend((text, confidence) for text, confidence, _ in row)
+        
+        return page_lines, page_results, escalations
+    
+    @staticmethod
+    def _page_points(points: List[Tuple[float, float]], matrix: Optional[np.ndarray]) -> np.ndarray:
+        """
+        将倾斜校正后图像中的点映射回未旋转的页面图像坐标
+        
+        Args:
+            points: (x, y) 点列表
+            matrix: 倾斜校正的2x3仿射矩阵（未旋转时为None）
+            
+        Returns:
+            N x 2 坐标数组
+        """
+        points = np.asarray(points, dtype=np.float64)
+        if matrix is None:
+            return points
+        inverse = cv2.invertAffineTransform(matrix)
+        return points @ inverse[:, :2].T + inverse[:, 2]
+    
+    @staticmethod
+    def _log_escalations(escalations: List[EscalatedRegion]):
+        """记录高分辨率重识别的区域"""
+        for region in escalations:
+            logger.info(
+                f"高分辨率重识别: 第 {region.page} 页 [{region.top:.0f}, {region.bottom:.0f}]pt "
+                f"({region.reason}) {region.low_res_text!r} -> {region.high_res_text!r}"
+            )
+    
+    def route_pages(self, pdf_path: str) -> Tuple[List[PageRoute], List[List[str]]]:
+        """
+        逐页判断处理路径
+        
+        文本层中包含足够数字组行的页面直接采用文本层，其余页面（扫描页、
+        手写页、只有封面文字的页面等）走OCR
+        
+        Args:
+            pdf_path: PDF文件路径
+            
+        Returns:
+            (各页处理路径, 各页文本层行列表)
+        """
+        routes = []
+        page_texts = []
+        doc = fitz.open(pdf_path)
+        try:
+            for page_idx in range(len(doc)):
+                page_lines = self.extract_page_text(doc.load_page(page_idx))
+                digit_rows = self.count_digit_rows(page_lines)
+                route = "text" if digit_rows >= self.text_layer_min_rows else "ocr"
+                routes.append(PageRoute(page=page_idx + 1, route=route, digit_rows=digit_rows))
+                page_texts.append(page_lines)
+        finally:
+            doc.close()
+        return routes, page_texts
+    
+    def _ocr_pages(
+        self,
+        pdf_path: str,
+        pages: List[int],
+        page_workers: int = 1,
+        page_mapper: Optional[Callable[[Iterable[np.ndarray]], Iterable[PageResult]]] = None
+    ) -> Tuple[Iterable[PageResult], List[EscalatedRegion]]:
+        """
+        识别指定页面
+        
+        Args:
+            pdf_path: PDF文件路径
+            pages: 页面索引列表（从0开始）
+            page_workers: 页面并行线程数（各线程共用引擎，识别调用串行）
+            page_mapper: 自定义的页面分派函数
+            
+        Returns:
+            (按页序产出的各页处理结果, 自适应识别中升级的区域列表)
+        """
+        if self.adaptive and self.layout_mode == "detect":
+            # 自适应模式需要按区域重新渲染，逐页串行处理
+            doc = fitz.open(pdf_path)
+            try:
+                page_outputs = []
+                escalations = []
+                for page_idx in pages:
+                    page_lines, page_results, page_escalations = self.process_page_adaptive(
+                        doc.load_page(page_idx), page_idx
+                    )
+                    self._log_escalations(page_escalations)
+                    escalations.extend(page_escalations)
+                    page_outputs.append((page_lines, page_results))
+                logger.info(f"自适应识别完成，{len(pages)} 页，升级 {len(escalations)} 个区域")
+                return page_outputs, escalations
+            finally:
+                doc.close()
+        
+        # 逐页渲染，页面图像在处理后即被释放
+        images = self.iter_pdf_images(pdf_path, pages=pages)
+        
+        # 各页相互独立，可并行处理；结果按页序合并，与串行处理输出一致
+        if page_mapper is not None:
+            logger.info("分派页面至OCR工作进程并行处理")
+            return page_mapper(images), []
+        if page_workers > 1:
+            # 线程共用同一个OCR引擎，识别调用经 _ocr_lock 串行，只有渲染与预处理并行
+            logger.info(f"使用 {page_workers} 个线程并行处理页面")
+            with ThreadPoolExecutor(max_workers=page_workers) as executor:
+                return list(bounded_map(executor, self.process_page, images, page_workers)), []
+        return map(self.process_page, images), []
+    
+    def process_pdf(
+        self,
+        pdf_path: str,
+        use_ocr: bool = True,
+        page_workers: int = 1,
+        page_mapper: Optional[Callable[[Iterable[np.ndarray]], Iterable[PageResult]]] = None
+    ) -> PDFRecognition:
+        """
+        处理PDF文件，提取所有文本
+        
+        各页分别判断：文本层包含数字组的页面直接提取文本，其余页面OCR识别，
+        各页的处理路径随识别结果返回
+        
+        Args:
+            pdf_path: PDF文件路径
+            use_ocr: 是否使用OCR，为False时所有页面都采用文本层
+            page_workers: 页面并行线程数，大于1时各OCR页面的渲染与预处理并行；
+                识别调用共用一个引擎仍串行执行，识别并行需使用 page_mapper（OCR进程池）
+            page_mapper: 自定义的页面分派函数（如OCR进程池），
+                接收页面图像迭代器并按页序返回各页处理结果
             
-            if current_line:
-                all_lines.append(" ".join(current_line))
+        Returns:
+            识别结果（行、逐框置信度、各页处理路径与自适应识别中升级的区域）
+        """
+        routes, page_texts = self.route_pages(pdf_path)
+        if not use_ocr:
+            for route in routes:
+                route.route = "text"
         
-        logger.info(f"PDF处理完成，共提取 {len(all_lines)} 行文本")
-        return all_lines, all_results
+        page_outputs = {}
+        for route, page_lines in zip(routes, page_texts):
+            if route.route == "text":
+                page_outputs[route.page - 1] = (page_lines, [(line, 1.0) for line in page_lines])
+        
+        ocr_pages = [route.page - 1 for route in routes if route.route == "ocr"]
+        escalations = []
+        if ocr_pages:
+            ocr_outputs, escalations = self._ocr_pages(pdf_path, ocr_pages, page_workers, page_mapper)
+            page_outputs.update(zip(ocr_pages, ocr_outputs))
+        
+        all_lines = []
+        all_results = []
+        for route in routes:
+            page_lines, page_results = page_outputs[route.page - 1]
+            logger.info(
+                f"第 {route.page} 页处理完成（{route.route}，文本层数字行 {route.digit_rows}），"
+                f"{len(page_lines)} 行"
+            )
+            all_lines.extend(page_lines)
+            all_results.extend(page_results)
+        
+        logger.info(
+            f"PDF处理完成，共提取 {len(all_lines)} 行文本，"
+            f"{len(routes) - len(ocr_pages)} 页使用文本层，{len(ocr_pages)} 页使用OCR"
+        )
+        return PDFRecognition(all_lines, all_results, escalations, routes)
 
 
-def create_ocr_processor(use_gpu: bool = False) -> OCRProcessor:
+def create_ocr_processor(
+    use_gpu: bool = False,
+    engine_options: Optional[dict] = None
+) -> OCRProcessor:
     """创建OCR处理器实例"""
-    return OCRProcessor(use_gpu=use_gpu)
+    return OCRProcessor(use_gpu=use_gpu, engine_options=engine_options)
@@ -0,0 +1,228 @@
+"""图像预处理模块 - 可配置的预处理流水线"""
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import cv2
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ImageQuality:
+    """图像质量快速估计"""
+    noise: float     # 噪声标准差估计
+    contrast: float  # 灰度标准差
+
+    @property
+    def is_clean(self) -> bool:
+        """噪声很低（如数字化渲染），无需去噪"""
+        return self.noise < 1.0
+
+    @property
+    def is_noisy(self) -> bool:
+        """噪声明显（如低质量扫描），需要较强去噪"""
+        return self.noise > 8.0
+
+
+def estimate_quality(gray: np.ndarray) -> ImageQuality:
+    """
+    快速估计图像质量
+
+    在隔4像素采样的图像上做二阶差分卷积（Immerkaer噪声估计），并以中位数
+    代替均值，使占比很小的字迹边缘不影响估计；耗时远小于任何去噪步骤
+
+    Args:
+        gray: 灰度图像
+
+    Returns:
+        图像质量估计
+    """
+    # 跳点采样保留逐像素噪声（面积插值缩放会平均掉噪声）
+    small = np.ascontiguousarray(gray[::4, ::4]).astype(np.float32)
+    kernel = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+    response = cv2.filter2D(small, -1, kernel)[1:-1, 1:-1]
+    # 高斯噪声下 |response| 的中位数约为 0.6745 * 6 * sigma
+    noise = float(np.median(np.abs(response))) / (0.6745 * 6)
+    return ImageQuality(noise=noise, contrast=float(small.std()))
+
+
+# ---------- 预处理步骤 ----------
+# 每个步骤接收并返回单通道灰度图像
+
+def _adaptive_threshold(gray: np.ndarray) -> np.ndarray:
+    """自适应二值化处理手写字迹"""
+    return cv2.adaptiveThreshold(
+        gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+        cv2.THRESH_BINARY, 11, 2
+    )
+
+
+def _median_denoise(gray: np.ndarray) -> np.ndarray:
+    """中值滤波去除椒盐噪声"""
+    return cv2.medianBlur(gray, 3)
+
+
+def _morph_denoise(gray: np.ndarray) -> np.ndarray:
+    """形态学闭运算去除白底上的孤立黑点"""
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (2, 2))
+    return cv2.morphologyEx(gray, cv2.MORPH_CLOSE, kernel)
+
+
+def _nlm_denoise(gray: np.ndarray) -> np.ndarray:
+    """非局部均值去噪（效果好但耗时最长）"""
+    return cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
+
+
+# ---------- 整页步骤 ----------
+# 在区域检测与识别之前对整页执行一次，之后的检测框、裁剪坐标都在校正后的图像中，
+# 不放在逐区域的预处理步骤中（否则识别得到的文本框与调用方使用的图像坐标不一致）
+
+def estimate_skew(gray: np.ndarray) -> float:
+    """
+    根据字迹像素的最小外接矩形估计小角度倾斜
+
+    Returns:
+        倾斜角度（度），无需校正（小于0.3度或超过5度的不可靠估计）时为0
+    """
+    small = cv2.resize(gray, None, fx=0.25, fy=0.25, interpolation=cv2.INTER_AREA)
+    coords = cv2.findNonZero(cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)[1])
+    if coords is None:
+        return 0.0
+
+    angle = cv2.minAreaRect(coords)[-1]
+    # minAreaRect 的角度范围随OpenCV版本不同，统一到 [-45, 45)
+    if angle >= 45:
+        angle -= 90
+    elif angle < -45:
+        angle += 90
+
+    if abs(angle) < 0.3 or abs(angle) > 5:
+        return 0.0
+    return float(angle)
+
+
+def rotate_image(image: np.ndarray, angle: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    绕图像中心旋转
+
+    Returns:
+        (旋转后的图像, 原图坐标到旋转后坐标的2x3仿射矩阵)
+    """
+    h, w = image.shape[:2]
+    matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+    rotated = cv2.warpAffine(
+        image, matrix, (w, h),
+        flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE
+    )
+    return rotated, matrix
+
+
+@dataclass
+class PreprocessStage:
+    """预处理步骤"""
+    name: str
+    func: Callable[[np.ndarray], np.ndarray]
+    # 根据图像质量判断是否跳过该步骤
+    skip_if: Optional[Callable[[ImageQuality], bool]] = None
+
+
+STAGES: Dict[str, PreprocessStage] = {
+    'threshold': PreprocessStage('threshold', _adaptive_threshold),
+    'median': PreprocessStage('median', _median_denoise),
+    'morph': PreprocessStage('morph', _morph_denoise),
+    'nlm': PreprocessStage('nlm', _nlm_denoise),
+    # 按质量跳过的变体
+    'median_if_noisy': PreprocessStage('median_if_noisy', _median_denoise, lambda q: q.is_clean),
+    'nlm_if_noisy': PreprocessStage('nlm_if_noisy', _nlm_denoise, lambda q: not q.is_noisy),
+}
+
+# 整页步骤（由 PreprocessPipeline.prepare_page 执行）
+PAGE_STAGES = ('deskew',)
+
+# 预设流水线（灰度化总是第一步）
+PRESETS: Dict[str, List[str]] = {
+    'full': ['threshold', 'nlm'],                                      # 原有固定流程
+    'adaptive': ['deskew', 'threshold', 'median_if_noisy', 'nlm_if_noisy'],  # 按质量跳过去噪
+    'fast': ['threshold', 'median'],                                   # 中值滤波代替NLM
+    'morph': ['threshold', 'morph'],                                   # 形态学去噪
+    'none': [],                                                        # 仅灰度化
+}
+
+
+class PreprocessPipeline:
+    """图像预处理流水线"""
+
+    def __init__(self, stage_names: List[str], name: str = "custom"):
+        unknown = [s for s in stage_names if s not in STAGES and s not in PAGE_STAGES]
+        if unknown:
+            raise ValueError(f"未知的预处理步骤: {', '.join(unknown)}")
+        self.name = name
+        self.deskew = 'deskew' in stage_names
+        self.stages = [STAGES[s] for s in stage_names if s in STAGES]
+        self._needs_quality = any(stage.skip_if is not None for stage in self.stages)
+
+    def signature(self) -> List[str]:
+        """流水线签名（用于缓存键）"""
+        return (['deskew'] if self.deskew else []) + [stage.name for stage in self.stages]
+
+    def prepare_page(self, image: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        执行整页步骤（倾斜校正），在区域检测与识别之前对整页调用一次
+
+        Args:
+            image: 页面图像（BGR或灰度）
+
+        Returns:
+            (校正后的页面图像, 原图坐标到校正后坐标的2x3仿射矩阵，未旋转时为None)
+        """
+        if not self.deskew:
+            return image, None
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        angle = estimate_skew(gray)
+        if not angle:
+            return image, None
+        logger.debug(f"整页倾斜校正: {angle:.2f}°")
+        return rotate_image(image, angle)
+
+    def run(self, image: np.ndarray) -> Tuple[np.ndarray, Dict[str, float]]:
+        """
+        执行逐区域的预处理步骤（不改变图像几何，结果坐标与输入一致）
+
+        Args:
+            image: 输入图像（BGR或灰度）
+
+        Returns:
+            (预处理后的灰度图像, 各步骤耗时（秒），被跳过的步骤不计入)
+        """
+        timings = {}
+
+        start = time.perf_counter()
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        timings['grayscale'] = time.perf_counter() - start
+
+        quality = None
+        if self._needs_quality:
+            start = time.perf_counter()
+            quality = estimate_quality(gray)
+            timings['quality'] = time.perf_counter() - start
+
+        for stage in self.stages:
+            if stage.skip_if is not None and stage.skip_if(quality):
+                continue
+            start = time.perf_counter()
+            gray = stage.func(gray)
+            timings[stage.name] = time.perf_counter() - start
+
+        if gray is image:
+            gray = gray.copy()
+        return gray, timings
+
+
+def create_pipeline(preset: str) -> PreprocessPipeline:
+    """按预设名称创建预处理流水线"""
+    if preset not in PRESETS:
+        raise ValueError(f"未知的预处理预设: {preset}，可选: {', '.join(PRESETS)}")
+    return PreprocessPipeline(PRESETS[preset], name=preset)
@@ -0,0 +1,228 @@
+"""参照报文库模块 - 参照报文一次上传、预解析并按ID复用"""
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .models import MessageContent, ReferenceInfo
+from .message_parser import MessageParserV2, create_parser_v2
+from .formats import MessageFormat
+from .config import REFERENCE_DIR, REFERENCE_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# 条目信息文件后缀（报文内容保存在 <ID>.json）
+INFO_SUFFIX = ".info.json"
+
+
+class ReferenceLibrary:
+    """
+    参照报文库
+
+    - 参照报文以内容哈希生成稳定ID，解析校验后持久化到 REFERENCE_DIR，
+      条目信息（<ID>.info.json）与报文内容（<ID>.json）分开保存，条目信息常驻内存
+    - 解析结果按内容哈希与报文格式保存在内存LRU中，同一参照在同一格式下只解析一次
+    - 库中保存的是按默认格式解析的结果，以其他格式批阅时由保存的原文重新切分
+    """
+
+    def __init__(
+        self,
+        storage_dir: Path = REFERENCE_DIR,
+        cache_size: int = REFERENCE_CACHE_SIZE,
+        parser: Optional[MessageParserV2] = None
+    ):
+        self.storage_dir = Path(storage_dir)
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_size = cache_size
+        self.parser = parser or create_parser_v2()
+        self._cache: "OrderedDict[Tuple[str, str], MessageContent]" = OrderedDict()
+        self._infos: Dict[str, ReferenceInfo] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _decode(data: bytes) -> str:
+        """解码参照文本（兼容带BOM的UTF-8）"""
+        return data.decode('utf-8-sig')
+
+    def _format(self, message_format: Optional[MessageFormat]) -> MessageFormat:
+        return message_format or self.parser.message_format
+
+    def _cache_get(self, key: Tuple[str, str]) -> Optional[MessageContent]:
+        with self._lock:
+            content = self._cache.get(key)
+            if content is not None:
+                self._cache.move_to_end(key)
+            return content
+
+    def _cache_put(self, key: Tuple[str, str], content: MessageContent):
+        with self._lock:
+            self._cache[key] = content
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def parse_bytes(self, data: bytes, message_format: Optional[MessageFormat] = None) -> MessageContent:
+        """
+        解析参照报文内容，相同内容、相同格式直接返回缓存结果
+
+        返回的对象在多个批阅任务间共享，调用方不应修改
+
+        Args:
+            data: TXT文件内容
+            message_format: 报文格式（为空时使用默认格式）
+
+        Returns:
+            报文内容对象
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        message_format = self._format(message_format)
+        key = (digest, message_format.spec)
+        content = self._cache_get(key)
+        if content is None:
+            content = self.parser.parse_txt_content(self._decode(data), message_format)
+            self._cache_put(key, content)
+        else:
+            logger.info(f"参照报文解析缓存命中: {digest[:12]}")
+        return content
+
+    def parse_file(self, txt_path: str, message_format: Optional[MessageFormat] = None) -> MessageContent:
+        """解析参照TXT文件（经内容哈希缓存）"""
+        with open(txt_path, 'rb') as f:
+            return self.parse_bytes(f.read(), message_format)
+
+    def _content_path(self, reference_id: str) -> Path:
+        return self.storage_dir / f"{reference_id}.json"
+
+    def _info_path(self, reference_id: str) -> Path:
+        return self.storage_dir / f"{reference_id}{INFO_SUFFIX}"
+
+    @staticmethod
+    def _write_json(path: Path, data: str):
+        """先写临时文件再替换，避免读到写了一半的文件"""
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        tmp_path.replace(path)
+
+    def add(self, data: bytes, filename: str) -> ReferenceInfo:
+        """
+        添加参照报文到库中
+
+        Args:
+            data: TXT文件内容
+            filename: 原始文件名
+
+        Returns:
+            参照报文库条目
+
+        Raises:
+            ValueError: 参照报文中没有可识别的数字组
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        reference_id = digest[:12]
+
+        existing = self.get_info(reference_id)
+        if existing is not None:
+            return existing
+
+        content = self.parse_bytes(data)
+        if not content.group_count:
+            raise ValueError("参照报文中未解析到数字组，请检查文件格式")
+
+        info = ReferenceInfo(
+            id=reference_id,
+            filename=filename,
+            sha256=digest,
+            group_count=content.group_count,
+            header_info=content.header,
+            created_at=datetime.now()
+        )
+
+        # 内容先于条目信息写入：条目信息存在即表示内容完整
+        self._write_json(self._content_path(reference_id), content.model_dump_json())
+        self._write_json(self._info_path(reference_id), info.model_dump_json())
+        with self._lock:
+            self._infos[reference_id] = info
+
+        logger.info(f"参照报文已入库: {reference_id} - {filename}，{info.group_count} 组")
+        return info
+
+    def get_info(self, reference_id: str) -> Optional[ReferenceInfo]:
+        """
+        获取参照报文库条目信息
+
+        条目信息常驻内存，首次访问时只读取条目信息文件，不读取报文内容
+        """
+        # ID仅由十六进制字符组成，防止路径穿越
+        if not reference_id or not all(c in '0123456789abcdef' for c in reference_id):
+            return None
+
+        with self._lock:
+            info = self._infos.get(reference_id)
+        if info is not None:
+            return info
+
+        path = self._info_path(reference_id)
+        if not path.exists():
+            return None
+        info = ReferenceInfo.model_validate_json(path.read_bytes())
+        with self._lock:
+            self._infos[reference_id] = info
+        return info
+
+    def get(
+        self,
+        reference_id: str,
+        message_format: Optional[MessageFormat] = None
+    ) -> Optional[MessageContent]:
+        """
+        按ID获取预解析的参照报文内容
+
+        先查内存LRU，未命中时才读取库中保存的内容
+
+        Args:
+            reference_id: 参照ID
+            message_format: 报文格式（为空时使用默认格式）
+
+        Returns:
+            报文内容对象，不存在时返回None
+        """
+        info = self.get_info(reference_id)
+        if info is None:
+            return None
+
+        message_format = self._format(message_format)
+        key = (info.sha256, message_format.spec)
+        content = self._cache_get(key)
+        if content is None:
+            # 入库时已校验，直接构建对象，无需重新解析
+            content = MessageContent.model_validate_json(
+                self._content_path(reference_id).read_bytes()
+            )
+            if content.message_format != message_format.spec:
+                # 入库时的格式与所需格式不同，由保存的原文按所需格式重新切分
+                content = self.parser.parse_txt_content(content.raw_text, message_format)
+            self._cache_put(key, content)
+        return content
+
+    def list(self) -> List[ReferenceInfo]:
+        """列出所有参照报文"""
+        reference_ids = [path.name[:-len(INFO_SUFFIX)] for path in self.storage_dir.glob(f"*{INFO_SUFFIX}")]
+        infos = []
+        for reference_id in reference_ids:
+            info = self.get_info(reference_id)
+            if info is not None:
+                infos.append(info)
+        infos.sort(key=lambda i: i.created_at, reverse=True)
+        return infos
+
+
+def create_reference_library(
+    storage_dir: Path = REFERENCE_DIR,
+    cache_size: int = REFERENCE_CACHE_SIZE
+) -> ReferenceLibrary:
+    """创建参照报文库"""
+    return ReferenceLibrary(storage_dir, cache_size)
@@ -157,7 +157,9 @@ class ReportGenerator:
                     'error_type': e.error_type
                 }
                 for e in result.errors
-            ]
+            ],
+            'escalations': [region.model_dump() for region in result.escalations],
+            'page_routes': [route.model_dump() for route in result.page_routes]
         }
         
         return json.dumps(report_data, ensure_ascii=False, indent=2)
@@ -0,0 +1,256 @@
+"""批阅结果存储模块 - 使用SQLite持久化批阅结果与错误详情"""
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from pydantic import TypeAdapter
+
+from .models import ReviewResult, ReviewSummary, ErrorDetail, EscalatedRegion, MessageHeader, PageRoute
+from .config import RESULT_DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# 列表接口允许的排序字段（均有索引）
+SORT_FIELDS = ("created_at", "score", "error_count", "pdf_filename", "status")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    pdf_filename TEXT NOT NULL,
+    txt_filename TEXT NOT NULL,
+    total_groups INTEGER NOT NULL,
+    error_count INTEGER NOT NULL,
+    score REAL NOT NULL,
+    status TEXT NOT NULL,
+    message TEXT NOT NULL,
+    header_info TEXT NOT NULL,
+    escalations TEXT NOT NULL,
+    page_routes TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reviews_created_at ON reviews (created_at);
+CREATE INDEX IF NOT EXISTS idx_reviews_score ON reviews (score);
+CREATE INDEX IF NOT EXISTS idx_reviews_error_count ON reviews (error_count);
+CREATE INDEX IF NOT EXISTS idx_reviews_status ON reviews (status, created_at);
+CREATE INDEX IF NOT EXISTS idx_reviews_pdf_filename ON reviews (pdf_filename);
+CREATE INDEX IF NOT EXISTS idx_reviews_txt_filename ON reviews (txt_filename);
+
+CREATE TABLE IF NOT EXISTS review_errors (
+    review_id TEXT NOT NULL REFERENCES reviews (id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    segment INTEGER NOT NULL,
+    line INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    global_index INTEGER NOT NULL,
+    submitted_value TEXT NOT NULL,
+    correct_value TEXT NOT NULL,
+    error_type TEXT NOT NULL,
+    PRIMARY KEY (review_id, seq)
+);
+"""
+
+# 高分辨率重识别区域与各页处理路径列表以JSON保存
+_ESCALATIONS = TypeAdapter(List[EscalatedRegion])
+_PAGE_ROUTES = TypeAdapter(List[PageRoute])
+
+_ERROR_FIELDS = (
+    "segment", "line", "position", "global_index",
+    "submitted_value", "correct_value", "error_type"
+)
+
+
+class ReviewResultStore:
+    """
+    批阅结果存储
+
+    结果主表按创建时间、得分、状态、文件名建立索引，列表查询在数据库中
+    完成分页、排序与过滤，不在内存中保留历史结果
+    """
+
+    def __init__(self, db_path: Path = RESULT_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # 连接在批阅线程与请求线程间共享，写操作由锁串行化
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(_SCHEMA)
+            self._recover_interrupted()
+
+    def _recover_interrupted(self):
+        """服务重启前未完成的任务无法继续，标记为失败"""
+        cursor = self._conn.execute(
+            "UPDATE reviews SET status = 'failed', message = ? WHERE status = 'processing'",
+            ("批阅失败: 服务重启，任务中断",)
+        )
+        self._conn.commit()
+        if cursor.rowcount:
+            logger.warning(f"{cursor.rowcount} 个未完成的批阅任务已标记为失败")
+
+    def save(self, result: ReviewResult):
+        """
+        保存批阅结果（相同ID覆盖）
+
+        Args:
+            result: 批阅结果
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reviews VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    result.id,
+                    result.created_at.isoformat(),
+                    result.pdf_filename,
+                    result.txt_filename,
+                    result.total_groups,
+                    result.error_count,
+                    result.score,
+                    result.status,
+                    result.message,
+                    result.header_info.model_dump_json(),
+                    _ESCALATIONS.dump_json(result.escalations).decode('utf-8'),
+                    _PAGE_ROUTES.dump_json(result.page_routes).decode('utf-8'),
+                )
+            )
+            self._conn.execute("DELETE FROM review_errors WHERE review_id = ?", (result.id,))
+            self._conn.executemany(
+                "INSERT INTO review_errors VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (result.id, seq, *(getattr(error, field) for field in _ERROR_FIELDS))
+                    for seq, error in enumerate(result.errors)
+                ]
+            )
+
+    def get(self, review_id: str) -> Optional[ReviewResult]:
+        """
+        获取批阅结果（含错误详情）
+
+        Args:
+            review_id: 批阅ID
+
+        Returns:
+            批阅结果，不存在时返回None
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM reviews WHERE id = ?", (review_id,)).fetchone()
+            if row is None:
+                return None
+            error_rows = self._conn.execute(
+                f"SELECT {', '.join(_ERROR_FIELDS)} FROM review_errors WHERE review_id = ? ORDER BY seq",
+                (review_id,)
+            ).fetchall()
+
+        return ReviewResult(
+            id=row["id"],
+            created_at=datetime.fromisoformat(row["created_at"]),
+            pdf_filename=row["pdf_filename"],
+            txt_filename=row["txt_filename"],
+            total_groups=row["total_groups"],
+            error_count=row["error_count"],
+            score=row["score"],
+            errors=[ErrorDetail(**dict(error)) for error in error_rows],
+            header_info=MessageHeader.model_validate_json(row["header_info"]),
+            status=row["status"],
+            message=row["message"],
+            escalations=_ESCALATIONS.validate_json(row["escalations"]),
+            page_routes=_PAGE_ROUTES.validate_json(row["page_routes"])
+        )
+
+    def list(
+        self,
+        offset: int = 0,
+        limit: int = 20,
+        sort_by: str = "created_at",
+        descending: bool = True,
+        status: Optional[str] = None,
+        filename: Optional[str] = None,
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None
+    ) -> Tuple[int, List[ReviewSummary]]:
+        """
+        分页查询批阅记录
+
+        Args:
+            offset: 跳过的记录数
+            limit: 返回的最大记录数
+            sort_by: 排序字段，见 SORT_FIELDS
+            descending: 是否降序
+            status: 按状态过滤
+            filename: 按PDF或TXT文件名过滤（包含匹配）
+            min_score: 最低得分
+            max_score: 最高得分
+            created_after: 创建时间下限
+            created_before: 创建时间上限
+
+        Returns:
+            (符合条件的总数, 当前页摘要列表)
+
+        Raises:
+            ValueError: 不支持的排序字段
+        """
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"不支持的排序字段: {sort_by}，可选: {', '.join(SORT_FIELDS)}")
+
+        conditions = []
+        params = []
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        if filename:
+            conditions.append("(pdf_filename LIKE ? ESCAPE '\\' OR txt_filename LIKE ? ESCAPE '\\')")
+            pattern = "%" + filename.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            params.extend([pattern, pattern])
+        if min_score is not None:
+            conditions.append("score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            conditions.append("score <= ?")
+            params.append(max_score)
+        if created_after is not None:
+            conditions.append("created_at >= ?")
+            params.append(created_after.isoformat())
+        if created_before is not None:
+            conditions.append("created_at <= ?")
+            params.append(created_before.isoformat())
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        direction = "DESC" if descending else "ASC"
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM reviews {where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT id, created_at, pdf_filename, score, error_count, status FROM reviews {where} "
+                f"ORDER BY {sort_by} {direction}, id {direction} LIMIT ? OFFSET ?",
+                [*params, limit, offset]
+            ).fetchall()
+
+        items = [
+            ReviewSummary(
+                id=row["id"],
+                created_at=datetime.fromisoformat(row["created_at"]),
+                pdf_filename=row["pdf_filename"],
+                score=row["score"],
+                error_count=row["error_count"],
+                status=row["status"]
+            )
+            for row in rows
+        ]
+        return total, items
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+def create_result_store(db_path: Path = RESULT_DB_PATH) -> ReviewResultStore:
+    """创建批阅结果存储"""
+    return ReviewResultStore(db_path)
@@ -1,17 +1,27 @@
 """批阅服务模块 - 整合所有功能模块"""
 import logging
+import threading
 import uuid
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
-from .models import ReviewResult, MessageContent, MessageHeader
-from .ocr_processor import create_ocr_processor
-from .message_parser import create_parser, create_parser_v2
+from .models import ReviewResult, ReviewSummary, MessageContent, MessageHeader
+from .formats import MessageFormat
+from .ocr_processor import PDFRecognition, create_ocr_processor, line_char_confidences
+from .ocr_pool import create_ocr_pool
+from .ocr_cache import create_ocr_cache
+from .reference_library import create_reference_library
+from .result_store import create_result_store
+from .upload_registry import create_upload_registry
+from .message_parser import create_parser
 from .comparator import create_comparator
 from .scorer import create_scorer
 from .report_generator import create_report_generator
-from .config import UPLOAD_DIR, USE_GPU
+from .config import (
+    UPLOAD_DIR, USE_GPU, OCR_WORKERS, OCR_DISPATCH_MODE, OCR_PAGE_WORKERS, OCR_CACHE_ENABLED,
+    OCR_WARMUP_RETRY_INTERVAL
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,51 +31,110 @@ class ReviewService:
     
     def __init__(self):
         self.ocr_processor = create_ocr_processor(use_gpu=USE_GPU)
+        # 配置了OCR工作进程时，PDF识别分派到进程池执行
+        self.ocr_pool = create_ocr_pool(OCR_WORKERS, use_gpu=USE_GPU) if OCR_WORKERS > 0 else None
+        # 相同PDF在相同OCR参数下只识别一次
+        self.ocr_cache = create_ocr_cache() if OCR_CACHE_ENABLED else None
         self.parser = create_parser()
-        self.parser_v2 = create_parser_v2()
+        # 参照报文库（同一参照只解析一次）
+        self.reference_library = create_reference_library()
         self.comparator = create_comparator()
         self.scorer = create_scorer()
         self.report_generator = create_report_generator()
         
-        # 结果存储（生产环境应使用数据库）
-        self.results = {}
+        # OCR引擎状态: cold（未加载）, warming（预热中）, ready（可用）, failed（预热失败，等待重试）
+        self.engine_state = "cold"
+        # 服务关闭后停止预热重试
+        self._closed = threading.Event()
+        
+        # 批阅结果存储（SQLite）
+        self.result_store = create_result_store()
+        # 上传文件登记（文件ID跨重启有效，过期文件定期清理）
+        self.upload_registry = create_upload_registry()
     
-    def process_pdf(self, pdf_path: str) -> MessageContent:
+    def _recognize_pdf(self, pdf_path: str) -> PDFRecognition:
+        """
+        识别PDF，根据配置在本进程或OCR进程池中执行
+        
+        Args:
+            pdf_path: PDF文件路径
+            
+        Returns:
+            识别结果
+        """
+        if self.ocr_pool is not None and OCR_DISPATCH_MODE == "page":
+            # 主进程负责渲染，各页分派到工作进程并行识别
+            return self.ocr_processor.process_pdf(
+                pdf_path, page_mapper=self.ocr_pool.map_pages
+            )
+        if self.ocr_pool is not None:
+            return self.ocr_pool.process_pdf(pdf_path)
+        return self.ocr_processor.process_pdf(pdf_path, page_workers=OCR_PAGE_WORKERS)
+    
+    def process_pdf(
+        self,
+        pdf_path: str,
+        message_format: Optional[MessageFormat] = None
+    ) -> Tuple[MessageContent, PDFRecognition]:
         """
         处理PDF文件
         
         Args:
             pdf_path: PDF文件路径
+            message_format: 报文格式（为空时使用默认格式）
             
         Returns:
-            解析后的报文内容
+            (解析后的报文内容, 识别结果)
         """
         logger.info(f"开始处理PDF: {pdf_path}")
         
-        # OCR识别
-        lines, _ = self.ocr_processor.process_pdf(pdf_path)
+        # OCR识别（优先读取缓存）
+        cache_key = None
+        recognition = None
+        if self.ocr_cache is not None:
+            cache_key = self.ocr_cache.make_key(
+                pdf_path,
+                self.ocr_processor.cache_signature(),
+                content_hash=self.upload_registry.content_hash(pdf_path)
+            )
+            recognition = self.ocr_cache.get(cache_key)
+        
+        if recognition is not None:
+            logger.info(f"OCR缓存命中: {cache_key[:12]}")
+        else:
+            recognition = self._recognize_pdf(pdf_path)
+            if cache_key is not None:
+                self.ocr_cache.put(cache_key, recognition)
         
-        # 解析报文
-        content = self.parser.parse_message(lines)
+        # 解析报文，识别置信度保留到各数字组
+        lines = recognition.lines
+        content = self.parser.parse_message(
+            lines, line_char_confidences(lines, recognition.results), message_format
+        )
         
-        logger.info(f"PDF处理完成，识别到 {len(content.groups)} 组数字")
-        return content
+        logger.info(f"PDF处理完成，识别到 {content.group_count} 组数字")
+        return content, recognition
     
-    def process_txt(self, txt_path: str) -> MessageContent:
+    def process_txt(
+        self,
+        txt_path: str,
+        message_format: Optional[MessageFormat] = None
+    ) -> MessageContent:
         """
         处理TXT参照文件
         
         Args:
             txt_path: TXT文件路径
+            message_format: 报文格式（为空时使用默认格式）
             
         Returns:
             解析后的报文内容
         """
         logger.info(f"开始处理TXT: {txt_path}")
         
-        content = self.parser_v2.parse_txt_file(txt_path)
+        content = self.reference_library.parse_file(txt_path, message_format)
         
-        logger.info(f"TXT处理完成，包含 {len(content.groups)} 组数字")
+        logger.info(f"TXT处理完成，包含 {content.group_count} 组数字")
         return content
     
     def review(
@@ -73,7 +142,10 @@ class ReviewService:
         pdf_path: str,
         txt_path: str,
         pdf_filename: str = "",
-        txt_filename: str = ""
+        txt_filename: str = "",
+        review_id: Optional[str] = None,
+        reference_id: Optional[str] = None,
+        message_format: Optional[MessageFormat] = None
     ) -> ReviewResult:
         """
         执行完整的批阅流程
@@ -83,20 +155,28 @@ class ReviewService:
             txt_path: TXT参照文件路径
             pdf_filename: PDF原始文件名
             txt_filename: TXT原始文件名
+            review_id: 批阅ID（由任务队列预先分配，为空时自动生成）
+            reference_id: 参照报文库ID，指定时使用库中预解析的参照代替TXT文件
+            message_format: 报文格式，提交内容与参照按同一格式解析（为空时使用默认格式）
             
         Returns:
             批阅结果
         """
-        review_id = str(uuid.uuid4())[:8]
+        review_id = review_id or str(uuid.uuid4())[:8]
         
         try:
             logger.info(f"开始批阅任务 {review_id}")
             
             # 处理PDF
-            submitted_content = self.process_pdf(pdf_path)
+            submitted_content, recognition = self.process_pdf(pdf_path, message_format)
             
-            # 处理TXT
-            reference_content = self.process_txt(txt_path)
+            # 处理参照报文
+            if reference_id:
+                reference_content = self.reference_library.get(reference_id, message_format)
+                if reference_content is None:
+                    raise ValueError(f"未找到参照报文: {reference_id}")
+            else:
+                reference_content = self.process_txt(txt_path, message_format)
             
             # 比对
             errors, total_groups, error_count = self.comparator.compare_with_tolerance(
@@ -120,11 +200,13 @@ class ReviewService:
                 errors=errors,
                 header_info=submitted_content.header,
                 status="completed",
-                message=self.scorer.get_feedback(score, error_count)
+                message=self.scorer.get_feedback(score, error_count),
+                escalations=recognition.escalations,
+                page_routes=recognition.routes
             )
             
             # 存储结果
-            self.results[review_id] = result
+            self.save_result(result)
             
             logger.info(
                 f"批阅完成 {review_id}: "
@@ -150,16 +232,28 @@ class ReviewService:
                 message=f"批阅失败: {str(e)}"
             )
             
-            self.results[review_id] = result
+            self.save_result(result)
             return result
     
+    def save_result(self, result: ReviewResult):
+        """保存批阅结果"""
+        self.result_store.save(result)
+    
     def get_result(self, review_id: str) -> Optional[ReviewResult]:
         """获取批阅结果"""
-        return self.results.get(review_id)
+        return self.result_store.get(review_id)
     
-    def list_results(self) -> list:
-        """获取所有批阅结果"""
-        return list(self.results.values())
+    def list_results(self, **filters) -> Tuple[int, List[ReviewSummary]]:
+        """
+        分页查询批阅记录
+        
+        Args:
+            filters: 分页、排序与过滤条件，见 ReviewResultStore.list
+            
+        Returns:
+            (符合条件的总数, 当前页摘要列表)
+        """
+        return self.result_store.list(**filters)
     
     def generate_report(
         self,
@@ -194,6 +288,52 @@ class ReviewService:
         
         else:
             raise ValueError(f"不支持的报告格式: {format}")
+    
+    def warm_up(self, retry_interval: float = OCR_WARMUP_RETRY_INTERVAL):
+        """
+        预热OCR引擎（进程池模式下预热全部工作进程）
+        
+        失败时 engine_state 为 failed，间隔 retry_interval 秒后重试，直至成功或服务关闭
+        
+        Args:
+            retry_interval: 重试间隔（秒），0表示不重试
+        """
+        while not self._closed.is_set():
+            self.engine_state = "warming"
+            try:
+                pool = self.ocr_pool
+                if pool is not None:
+                    loaded = pool.warm_up()
+                    if loaded < pool.num_workers:
+                        raise RuntimeError(
+                            f"OCR工作进程引擎未全部就绪（{loaded}/{pool.num_workers}）"
+                        )
+                else:
+                    self.ocr_processor.warm_up()
+                self.engine_state = "ready"
+                return
+            except Exception as e:
+                self.engine_state = "failed"
+                logger.error(f"OCR引擎预热失败: {str(e)}")
+            if retry_interval <= 0:
+                return
+            logger.info(f"{retry_interval:.0f} 秒后重试OCR引擎预热")
+            self._closed.wait(retry_interval)
+    
+    @property
+    def engine_loaded(self) -> bool:
+        """OCR引擎是否已加载"""
+        if self.ocr_pool is not None:
+            return self.ocr_pool.loaded_workers >= self.ocr_pool.num_workers
+        return self.ocr_processor.is_loaded
+    
+    def close(self):
+        """释放资源（关闭OCR进程池与结果数据库连接）"""
+        self._closed.set()
+        if self.ocr_pool is not None:
+            self.ocr_pool.shutdown()
+            self.ocr_pool = None
+        self.result_store.close()
 
 
 # 全局服务实例
@@ -0,0 +1,134 @@
+"""表格网格模块 - 检测报文表格的横竖线并切分数字组单元格"""
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+import cv2
+
+from .config import GROUPS_PER_LINE
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TableGrid:
+    """表格网格（像素坐标）"""
+    xs: List[int]  # 竖线x坐标，共 列数+1 条
+    ys: List[int]  # 横线y坐标，共 行数+1 条
+
+    @property
+    def rows(self) -> int:
+        return len(self.ys) - 1
+
+    @property
+    def cols(self) -> int:
+        return len(self.xs) - 1
+
+    @property
+    def top(self) -> int:
+        return self.ys[0]
+
+    def cell_box(self, row: int, col: int, inset_ratio: float = 0.08):
+        """
+        获取单元格区域（向内收缩以避开表格线）
+
+        Returns:
+            (x1, y1, x2, y2)
+        """
+        x1, x2 = self.xs[col], self.xs[col + 1]
+        y1, y2 = self.ys[row], self.ys[row + 1]
+        dx = max(2, int((x2 - x1) * inset_ratio))
+        dy = max(2, int((y2 - y1) * inset_ratio))
+        return x1 + dx, y1 + dy, x2 - dx, y2 - dy
+
+
+def _line_positions(profile: np.ndarray, min_coverage: float, max_gap: int = 3) -> List[int]:
+    """
+    从投影曲线中提取表格线位置
+
+    Args:
+        profile: 线条像素在某一方向上的投影
+        min_coverage: 判定为表格线的最小投影值
+        max_gap: 同一条线允许的最大像素间隔（线条较粗时占多个像素）
+
+    Returns:
+        各表格线中心坐标
+    """
+    indices = np.flatnonzero(profile >= min_coverage)
+    if indices.size == 0:
+        return []
+
+    # 将相邻索引合并为一条线
+    breaks = np.flatnonzero(np.diff(indices) > max_gap)
+    starts = np.concatenate(([indices[0]], indices[breaks + 1]))
+    ends = np.concatenate((indices[breaks], [indices[-1]]))
+    return [int((s + e) // 2) for s, e in zip(starts, ends)]
+
+
+def _regularize_rows(ys: List[int]) -> List[int]:
+    """去除间距过小的伪横线（如双线边框、文字下划线）"""
+    if len(ys) < 3:
+        return ys
+    median = float(np.median(np.diff(ys)))
+    kept = [ys[0]]
+    for y in ys[1:]:
+        if y - kept[-1] >= median * 0.5:
+            kept.append(y)
+    return kept
+
+
+def detect_grid(image: np.ndarray, groups_per_line: int = GROUPS_PER_LINE) -> Optional[TableGrid]:
+    """
+    检测报文表格网格
+
+    通过形态学开运算分别提取横线与竖线，再按投影定位各线坐标。
+    竖线多于 groups_per_line+1 条时取最右侧的部分（左侧通常为行号列）
+
+    Args:
+        image: 页面图像（BGR或灰度）
+        groups_per_line: 每行组数
+
+    Returns:
+        表格网格，未检测到符合格式的表格时返回None
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    h, w = gray.shape
+
+    binary = cv2.adaptiveThreshold(
+        gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C,
+        cv2.THRESH_BINARY_INV, 15, 10
+    )
+
+    horizontal = cv2.morphologyEx(
+        binary, cv2.MORPH_OPEN,
+        cv2.getStructuringElement(cv2.MORPH_RECT, (max(w // 30, 10), 1))
+    )
+    vertical = cv2.morphologyEx(
+        binary, cv2.MORPH_OPEN,
+        cv2.getStructuringElement(cv2.MORPH_RECT, (1, max(h // 30, 10)))
+    )
+
+    # 投影值以像素计；表格线至少覆盖最长线的一半
+    row_profile = horizontal.sum(axis=1, dtype=np.int64) // 255
+    col_profile = vertical.sum(axis=0, dtype=np.int64) // 255
+    if row_profile.max() == 0 or col_profile.max() == 0:
+        return None
+
+    ys = _regularize_rows(_line_positions(row_profile, row_profile.max() * 0.5))
+    xs = _line_positions(col_profile, col_profile.max() * 0.5)
+
+    if len(xs) < groups_per_line + 1 or len(ys) < 2:
+        logger.info(f"未检测到完整表格网格: 竖线 {len(xs)} 条, 横线 {len(ys)} 条")
+        return None
+
+    xs = xs[-(groups_per_line + 1):]
+    return TableGrid(xs=xs, ys=ys)
+
+
+def is_blank(cell: np.ndarray, ink_ratio: float = 0.01, ink_level: int = 128) -> bool:
+    """判断单元格是否为空白（深色像素比例低于阈值）"""
+    gray = cv2.cvtColor(cell, cv2.COLOR_BGR2GRAY) if cell.ndim == 3 else cell
+    if gray.size == 0:
+        return True
+    return np.count_nonzero(gray < ink_level) < gray.size * ink_ratio
@@ -0,0 +1,105 @@
+"""数字组切分模块 - 以预编译的转换表单遍取出各行参与分组的字符并按报文格式切分"""
+import unicodedata
+from typing import Dict, Optional
+
+# 未识别字符的占位符，与数字一样参与分组
+PLACEHOLDER = '?'
+
+
+class _CharTable(dict):
+    """
+    str.translate 使用的字符表：查不到的字符首次出现时按 Unicode 类别判定并缓存，
+    十进制数字（与正则 \\d 一致）保留，其余删除
+    """
+
+    def __missing__(self, code: int) -> Optional[int]:
+        value = code if unicodedata.category(chr(code)) == 'Nd' else None
+        self[code] = value
+        return value
+
+
+class _MaskTable(dict):
+    """
+    str.translate 使用的标记表：参与分组的字符映射为 \\x01，其余映射为 \\x00，
+    不删除字符，转换结果与原文逐字符对应
+    """
+
+    def __missing__(self, code: int) -> int:
+        value = 1 if unicodedata.category(chr(code)) == 'Nd' else 0
+        self[code] = value
+        return value
+
+
+def fit_line(chars: str, width: int, max_groups: int) -> str:
+    """
+    按每行最多组数截取，末尾不足一组的以占位符补齐
+
+    Args:
+        chars: 一行参与分组的字符
+        width: 每组字符数
+        max_groups: 每行最多组数
+
+    Returns:
+        该行各组首尾相接的字符串（长度为 width 的整数倍）
+    """
+    chars = chars[:width * max_groups]
+    remainder = len(chars) % width
+    if remainder:
+        chars += PLACEHOLDER * (width - remainder)
+    return chars
+
+
+class GroupTokenizer:
+    """
+    数字组切分器
+
+    转换表在创建时编译：数字（与占位符）保留、易混字符替换为对应数字、其余字符删除，
+    一行文本只经一次 str.translate 即得到该行依序排列的分组字符，
+    切分为组只是定长切片，不再逐行做正则替换、拆分与拼接。
+    修正前的原始值与各字符是否参与分组的标记只在需要时另行计算
+    """
+
+    def __init__(self, confusions: Optional[Dict[str, str]] = None, keep_placeholder: bool = True):
+        """
+        Args:
+            confusions: 易混字符 -> 数字 的映射（为空时不修正）
+            keep_placeholder: 未识别占位符 ? 是否参与分组
+        """
+        self.confusions = dict(confusions or {})
+        kept = '0123456789' + (PLACEHOLDER if keep_placeholder else '')
+        base = {ord(c): ord(c) for c in kept}
+
+        self._plain_table = _CharTable(base)
+        self._table = _CharTable(base)
+        self._table.update({ord(s): ord(t) for s, t in self.confusions.items()})
+        # 原始值：易混字符保留原样，与修正后的字符一一对应
+        self._raw_table = _CharTable(base)
+        self._raw_table.update({ord(s): ord(s) for s in self.confusions})
+        # 参与分组的字符标记，与原始值取出的字符一致
+        self._mask_table = _MaskTable({code: 1 for code in base})
+        self._mask_table.update({ord(s): 1 for s in self.confusions})
+
+    @property
+    def corrects(self) -> bool:
+        """是否修正易混字符"""
+        return bool(self.confusions)
+
+    def chars(self, text: str) -> str:
+        """取出参与分组的字符（易混字符已替换为数字）"""
+        return text.translate(self._table)
+
+    def plain_chars(self, text: str) -> str:
+        """取出参与分组的字符，不修正易混字符（易混字符视为非数字删除）"""
+        return text.translate(self._plain_table)
+
+    def raw_chars(self, text: str) -> str:
+        """取出参与分组的字符修正前的原样，与 chars 逐字符对应"""
+        return text.translate(self._raw_table)
+
+    def char_mask(self, text: str) -> bytes:
+        """
+        逐字符标记是否参与分组（1 为参与），可配合 itertools.compress
+        从逐字符数据中取出与 chars 逐一对应的项
+        """
+        return text.translate(self._mask_table).encode('latin-1')
+
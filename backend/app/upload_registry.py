@@ -0,0 +1,414 @@
+"""上传文件登记模块 - 按内容哈希去重存储上传文件，按过期时间与磁盘配额清理上传目录"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .config import (
+    UPLOAD_DIR, UPLOAD_REGISTRY_PATH, UPLOAD_TTL_HOURS, UPLOAD_QUOTA_MB, REPORT_TTL_MINUTES
+)
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    file_id TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    type TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_uploads_last_access ON uploads (last_access);
+CREATE INDEX IF NOT EXISTS idx_uploads_path ON uploads (path);
+
+CREATE TABLE IF NOT EXISTS blobs (
+    path TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    refcount INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_blobs_sha256 ON blobs (sha256);
+"""
+
+# 报告生成器在上传目录中输出的报告文件前缀
+REPORT_PREFIX = "report_"
+# 接收中的上传文件前缀（哈希计算完成前的临时文件）
+INCOMING_PREFIX = "incoming_"
+
+
+@dataclass
+class SweepStats:
+    """清理统计"""
+    sweeps: int = 0                  # 清理次数
+    last_sweep_at: float = 0.0       # 最近一次清理时间（时间戳）
+    last_duration: float = 0.0       # 最近一次清理耗时（秒）
+    last_reclaimed_bytes: int = 0    # 最近一次释放的字节数
+    last_removed_files: int = 0      # 最近一次删除的文件数
+    total_reclaimed_bytes: int = 0   # 累计释放的字节数
+    total_removed_files: int = 0     # 累计删除的文件数
+    disk_bytes: int = 0              # 清理后上传目录占用的字节数
+    disk_files: int = 0              # 清理后上传目录中的文件数
+
+
+class UploadRegistry:
+    """
+    上传文件登记表
+
+    - 上传内容按SHA-256保存为 <哈希><扩展名>，内容相同的多次上传只保存一份，
+      各文件ID指向同一内容文件，内容文件记录引用计数，引用全部释放后删除
+    - 上传文件的ID、原始文件名、内容文件与最近访问时间保存在SQLite中，
+      服务重启后文件ID仍然有效
+    - 批阅任务执行期间其使用的文件被占用（pin），清理时跳过
+    - sweep() 删除所有引用都超过有效期未访问的内容文件、未登记的遗留文件和过期的报告文件，
+      上传目录总大小超过配额时再按最近访问时间淘汰
+    """
+
+    def __init__(
+        self,
+        db_path: Path = UPLOAD_REGISTRY_PATH,
+        upload_dir: Path = UPLOAD_DIR,
+        ttl_seconds: float = UPLOAD_TTL_HOURS * 3600,
+        quota_bytes: int = UPLOAD_QUOTA_MB * 1024 * 1024,
+        report_ttl_seconds: float = REPORT_TTL_MINUTES * 60
+    ):
+        self.upload_dir = Path(upload_dir)
+        self.ttl_seconds = ttl_seconds
+        self.quota_bytes = quota_bytes
+        self.report_ttl_seconds = report_ttl_seconds
+        self.sweep_stats = SweepStats()
+        # 命中已有内容文件（未写入新文件）的上传次数
+        self.dedup_hits = 0
+
+        db_path = Path(db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        # 正在被批阅任务使用的文件路径及占用计数
+        self._pins: Counter = Counter()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def incoming_path(self) -> Path:
+        """分配接收中上传文件的临时路径（与内容文件位于同一目录，便于原子重命名）"""
+        return self.upload_dir / f"{INCOMING_PREFIX}{uuid.uuid4().hex}.part"
+
+    def blob_path(self, sha256: str, filename: str) -> Path:
+        """内容文件路径（保留原始扩展名，供按扩展名识别格式的库使用）"""
+        return self.upload_dir / f"{sha256}{Path(filename).suffix.lower()}"
+
+    def store(
+        self,
+        file_id: str,
+        temp_path: Path,
+        filename: str,
+        file_type: str,
+        size: int,
+        sha256: str
+    ) -> Path:
+        """
+        将接收完成的临时文件存为内容文件并登记文件ID
+
+        内容文件已存在时删除临时文件，仅增加引用计数；否则将临时文件重命名为内容文件
+
+        Args:
+            file_id: 文件ID
+            temp_path: 临时文件路径（见 incoming_path）
+            filename: 原始文件名
+            file_type: 文件类型（pdf, txt）
+            size: 文件大小（字节）
+            sha256: 内容SHA-256
+
+        Returns:
+            内容文件路径
+        """
+        blob = self.blob_path(sha256, filename)
+        now = time.time()
+        with self._lock, self._conn:
+            if blob.exists():
+                Path(temp_path).unlink(missing_ok=True)
+                self.dedup_hits += 1
+            else:
+                os.replace(temp_path, blob)
+            self._conn.execute(
+                "INSERT INTO blobs VALUES (?, ?, ?, 1, ?) "
+                "ON CONFLICT (path) DO UPDATE SET refcount = refcount + 1",
+                (str(blob), sha256, size, now)
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (file_id, str(blob), filename, file_type, size, sha256, now, now)
+            )
+        return blob
+
+    def get(self, file_id: str) -> Optional[dict]:
+        """
+        获取上传文件信息并刷新访问时间
+
+        Args:
+            file_id: 文件ID
+
+        Returns:
+            文件信息（path, filename, type, size, sha256），不存在或文件已被清理时返回None
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT path, filename, type, size, sha256 FROM uploads WHERE file_id = ?",
+                (file_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            if not Path(row["path"]).exists():
+                self._forget(row["path"])
+                return None
+            self._conn.execute(
+                "UPDATE uploads SET last_access = ? WHERE file_id = ?",
+                (time.time(), file_id)
+            )
+        return dict(row)
+
+    def release(self, file_id: str) -> bool:
+        """
+        释放文件ID，内容文件的引用全部释放且未被占用时删除
+
+        Args:
+            file_id: 文件ID
+
+        Returns:
+            文件ID是否存在
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT path FROM uploads WHERE file_id = ?", (file_id,)
+            ).fetchone()
+            if row is None:
+                return False
+            self._conn.execute("DELETE FROM uploads WHERE file_id = ?", (file_id,))
+            self._conn.execute(
+                "UPDATE blobs SET refcount = refcount - 1 WHERE path = ?", (row["path"],)
+            )
+            self._delete_unreferenced(row["path"])
+        return True
+
+    def content_hash(self, path: str) -> Optional[str]:
+        """已登记内容文件的SHA-256（供下游缓存直接作为内容键，免去重新读取文件计算）"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sha256 FROM blobs WHERE path = ?", (str(Path(path)),)
+            ).fetchone()
+        return row["sha256"] if row else None
+
+    def _forget(self, path: str):
+        """移除内容文件及其全部文件ID的登记（调用方持有锁）"""
+        self._conn.execute("DELETE FROM uploads WHERE path = ?", (path,))
+        self._conn.execute("DELETE FROM blobs WHERE path = ?", (path,))
+
+    def _delete_unreferenced(self, path: str):
+        """内容文件已无引用且未被占用时删除（调用方持有锁）"""
+        if self._pins.get(path):
+            return
+        row = self._conn.execute("SELECT refcount FROM blobs WHERE path = ?", (path,)).fetchone()
+        if row is None or row["refcount"] > 0:
+            return
+        try:
+            Path(path).unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"删除上传文件失败 {path}: {str(e)}")
+            return
+        self._forget(path)
+
+    def pin(self, paths: Iterable[str]):
+        """占用文件（批阅任务开始前调用），清理时跳过"""
+        with self._lock:
+            for path in paths:
+                if path:
+                    self._pins[str(Path(path))] += 1
+
+    def unpin(self, paths: Iterable[str]):
+        """解除占用，并刷新文件的访问时间"""
+        now = time.time()
+        with self._lock, self._conn:
+            for path in paths:
+                if not path:
+                    continue
+                key = str(Path(path))
+                self._pins[key] -= 1
+                if self._pins[key] <= 0:
+                    del self._pins[key]
+                    # 任务执行期间被释放的文件，在任务结束后删除
+                    self._delete_unreferenced(key)
+                self._conn.execute("UPDATE uploads SET last_access = ? WHERE path = ?", (now, key))
+
+    def sweep(self) -> SweepStats:
+        """
+        清理上传目录
+
+        1. 删除超过报告有效期的报告文件
+        2. 删除所有文件ID都超过有效期未访问的内容文件、已无引用的内容文件，
+           以及未登记的遗留文件和中断的临时文件（按修改时间）
+        3. 总大小仍超过配额时，按最近访问时间从旧到新继续淘汰
+
+        被占用的文件、以及扫描期间又被上传或访问的内容文件不会删除；
+        文件已不存在的登记记录一并移除
+
+        Returns:
+            清理统计
+        """
+        with self._sweep_lock:
+            start = time.perf_counter()
+            now = time.time()
+
+            with self._lock:
+                registered = self._blob_access()
+                pinned = set(self._pins)
+
+            # (最近使用时间, 大小, 路径, 是否已登记, 有效期)
+            entries = []
+            for entry in self.upload_dir.iterdir():
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                # 跳过子目录与隐藏文件（如 .gitkeep）
+                if not entry.is_file() or entry.name.startswith('.'):
+                    continue
+                key = str(entry)
+                is_registered = key in registered
+                last_access = registered.get(key)
+                if is_registered and last_access is None:
+                    # 已无引用（释放时被占用）的内容文件
+                    ttl = 0
+                elif entry.name.startswith(REPORT_PREFIX) and not is_registered:
+                    ttl = self.report_ttl_seconds
+                else:
+                    ttl = self.ttl_seconds
+                entries.append((last_access or stat.st_mtime, stat.st_size, entry, is_registered, ttl))
+
+            removed = []
+            kept = []
+            for entry in entries:
+                last_used, _, path, _, ttl = entry
+                if str(path) not in pinned and now - last_used > ttl:
+                    removed.append(entry)
+                else:
+                    kept.append(entry)
+
+            disk_bytes = sum(size for _, size, _, _, _ in kept)
+            if disk_bytes > self.quota_bytes:
+                kept.sort(key=lambda e: e[0])
+                still_kept = []
+                for entry in kept:
+                    if disk_bytes > self.quota_bytes and str(entry[2]) not in pinned:
+                        removed.append(entry)
+                        disk_bytes -= entry[1]
+                    else:
+                        still_kept.append(entry)
+                kept = still_kept
+
+            reclaimed = 0
+            deleted = 0
+            with self._lock, self._conn:
+                # 扫描期间可能有相同内容再次上传或被占用，删除前按最新状态复核
+                current = self._blob_access()
+                for last_used, size, path, is_registered, _ in removed:
+                    key = str(path)
+                    if key in self._pins:
+                        continue
+                    if is_registered and (current.get(key) or 0) > last_used:
+                        continue
+                    if not is_registered and key in current:
+                        continue
+                    try:
+                        path.unlink()
+                    except FileNotFoundError:
+                        pass
+                    except OSError as e:
+                        logger.warning(f"清理上传文件失败 {path}: {str(e)}")
+                        continue
+                    reclaimed += size
+                    deleted += 1
+                    if is_registered:
+                        self._forget(key)
+
+                # 移除文件已丢失的登记记录
+                on_disk = {str(path) for _, _, path, _, _ in kept}
+                for key in current:
+                    if key not in on_disk and not Path(key).exists():
+                        self._forget(key)
+
+            stats = self.sweep_stats
+            stats.sweeps += 1
+            stats.last_sweep_at = now
+            stats.last_duration = time.perf_counter() - start
+            stats.last_reclaimed_bytes = reclaimed
+            stats.last_removed_files = deleted
+            stats.total_reclaimed_bytes += reclaimed
+            stats.total_removed_files += deleted
+            stats.disk_bytes = sum(size for _, size, _, _, _ in kept)
+            stats.disk_files = len(kept)
+
+            if deleted:
+                logger.info(
+                    f"上传目录清理完成: 删除 {deleted} 个文件，释放 {reclaimed} 字节，"
+                    f"耗时 {stats.last_duration * 1000:.1f}ms"
+                )
+            return stats
+
+    def _blob_access(self) -> dict:
+        """各内容文件的最近访问时间（其文件ID中最新的一个，无引用时为None），调用方持有锁"""
+        return {
+            row["path"]: row["last_access"]
+            for row in self._conn.execute(
+                "SELECT b.path, MAX(u.last_access) AS last_access FROM blobs b "
+                "LEFT JOIN uploads u ON u.path = b.path GROUP BY b.path"
+            )
+        }
+
+    def stats(self) -> dict:
+        """登记与清理统计"""
+        with self._lock:
+            registered = self._conn.execute("SELECT COUNT(*) FROM uploads").fetchone()[0]
+            blobs, saved = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size * MAX(refcount - 1, 0)), 0) FROM blobs"
+            ).fetchone()
+            pinned = len(self._pins)
+        stats = self.sweep_stats
+        return {
+            'registered_files': registered,
+            'stored_blobs': blobs,
+            'dedup_hits': self.dedup_hits,
+            'dedup_saved_bytes': saved,
+            'pinned_files': pinned,
+            'disk_bytes': stats.disk_bytes,
+            'disk_files': stats.disk_files,
+            'quota_bytes': self.quota_bytes,
+            'ttl_seconds': self.ttl_seconds,
+            'report_ttl_seconds': self.report_ttl_seconds,
+            'sweeps': stats.sweeps,
+            'last_sweep_at': stats.last_sweep_at,
+            'last_sweep_duration': stats.last_duration,
+            'last_reclaimed_bytes': stats.last_reclaimed_bytes,
+            'last_removed_files': stats.last_removed_files,
+            'total_reclaimed_bytes': stats.total_reclaimed_bytes,
+            'total_removed_files': stats.total_removed_files,
+        }
+
+
+def create_upload_registry(
+    db_path: Path = UPLOAD_REGISTRY_PATH,
+    upload_dir: Path = UPLOAD_DIR
+) -> UploadRegistry:
+    """创建上传文件登记表"""
+    return UploadRegistry(db_path, upload_dir)
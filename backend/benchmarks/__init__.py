@@ -0,0 +1 @@
+# Message Review Tool - Benchmarks
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+报文比对基准测试
+
+生成随机参照报文，按场景构造提交内容（少量抄错、漏抄一组、多抄一组、
+混合、大量抄错），对比逐位置比对与序列对齐比对的耗时和错误数
+
+用法（在 backend 目录下）:
+    python -m benchmarks.bench_compare
+    python -m benchmarks.bench_compare --groups 300 10000 100000 --repeat 20
+"""
+import argparse
+import logging
+import time
+
+import numpy as np
+
+from app.comparator import MessageComparator
+from app.group_table import GroupTableBuilder
+from app.models import MessageContent
+from app.config import GROUPS_PER_LINE
+
+
+def make_content(values) -> MessageContent:
+    builder = GroupTableBuilder()
+    builder.add_digits("".join(values), GROUPS_PER_LINE)
+    return MessageContent(table=builder.build())
+
+
+def random_values(rng, count: int):
+    return [f"{v:04d}" for v in rng.integers(0, 10000, count)]
+
+
+def substitute(rng, values, count: int):
+    values = list(values)
+    for i in rng.choice(len(values), count, replace=False):
+        values[i] = f"{(int(values[i]) + 1) % 10000:04d}"
+    return values
+
+
+def scenarios(rng, reference):
+    """(场景名, 提交内容各组的值)"""
+    n = len(reference)
+    drop = n // 5
+    insert = n * 3 // 5
+    yield "完全一致", list(reference)
+    yield "抄错3组", substitute(rng, reference, 3)
+    yield "漏抄1组", reference[:drop] + reference[drop + 1:]
+    yield "多抄1组", reference[:insert] + ["0000"] + reference[insert:]
+    mixed = reference[:drop] + reference[drop + 1:insert] + ["0000"] + reference[insert:]
+    yield "漏1+多1+错3", substitute(rng, mixed, 3)
+    yield "抄错30%", substitute(rng, reference, n * 3 // 10)
+
+
+def timed(func, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="报文比对基准测试")
+    parser.add_argument("--groups", type=int, nargs="*", default=[300, 10000])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    positional = MessageComparator(align=False)
+    aligned = MessageComparator(align=True)
+
+    print(f"{'组数':>8}  {'场景':<12}{'逐位置(ms)':>12}{'错误数':>8}{'对齐(ms)':>12}{'错误数':>8}")
+    print("-" * 64)
+
+    for count in args.groups:
+        rng = np.random.default_rng(args.seed)
+        reference_values = random_values(rng, count)
+        reference = make_content(reference_values)
+        for name, values in scenarios(rng, reference_values):
+            submitted = make_content(values)
+            (_, _, old_errors), old_ms = timed(lambda: positional.compare(submitted, reference), args.repeat)
+            (_, _, new_errors), new_ms = timed(lambda: aligned.compare(submitted, reference), args.repeat)
+            print(
+                f"{count:>8}  {name:<12}"
+                f"{old_ms:>12.2f}{old_errors:>8}{new_ms:>12.2f}{new_errors:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
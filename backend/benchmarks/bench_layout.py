@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+版面重建基准测试
+
+生成含数千个文本框的合成页面（可带倾斜与抖动），对比原有的固定30像素
+行分组循环与 app.layout 的向量化聚类：耗时与行还原正确率
+
+用法（在 backend 目录下）:
+    python -m benchmarks.bench_layout
+    python -m benchmarks.bench_layout --boxes 2000 8000 --angles 0 1.5 --row-pitch 60
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.layout import build_layout
+
+
+def synthetic_page(
+    box_count: int,
+    angle: float,
+    row_pitch: float,
+    box_height: float,
+    seed: int = 0
+):
+    """
+    生成合成页面的文本框
+
+    Returns:
+        (N x 4 文本框数组, 每个文本框的真实行号)
+    """
+    rng = np.random.default_rng(seed)
+    cols = 40
+    rows = -(-box_count // cols)
+    col_pitch = 2400 / cols
+    box_width = col_pitch * 0.7
+
+    row_ids, col_ids = np.divmod(np.arange(rows * cols)[:box_count], cols)
+    cx = 40 + col_ids * col_pitch + box_width / 2 + rng.normal(0, 2, box_count)
+    cy = 40 + row_ids * row_pitch + box_height / 2 + rng.normal(0, box_height * 0.08, box_count)
+    # 绕页面左上角旋转
+    slope = np.tan(np.radians(angle))
+    cy = cy + slope * cx
+
+    heights = box_height * rng.uniform(0.85, 1.15, box_count)
+    boxes = np.stack([cx - box_width / 2, cy - heights / 2, cx + box_width / 2, cy + heights / 2], axis=1)
+    order = rng.permutation(box_count)
+    return boxes[order], row_ids[order]
+
+
+def legacy_rows(boxes: np.ndarray, y_threshold: float = 30):
+    """原有实现：按(中心y, 中心x)排序，与当前行第一个文本框的y比较"""
+    centers = [((b[0] + b[2]) / 2, (b[1] + b[3]) / 2, i) for i, b in enumerate(boxes.tolist())]
+    centers.sort(key=lambda c: (c[1], c[0]))
+    rows, current_row, current_y = [], [], -1
+    for cx, cy, i in centers:
+        if current_y < 0:
+            current_y = cy
+        if abs(cy - current_y) < y_threshold:
+            current_row.append(i)
+        else:
+            if current_row:
+                rows.append(current_row)
+            current_row = [i]
+            current_y = cy
+    if current_row:
+        rows.append(current_row)
+    return rows
+
+
+def row_accuracy(rows, truth: np.ndarray) -> float:
+    """完全还原（成员一致）的行所占比例"""
+    expected = {}
+    for i, row_id in enumerate(truth.tolist()):
+        expected.setdefault(row_id, set()).add(i)
+    found = {frozenset(int(i) for i in row) for row in rows}
+    return sum(1 for members in expected.values() if frozenset(members) in found) / len(expected)
+
+
+def timed(func, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="版面重建基准测试")
+    parser.add_argument("--boxes", type=int, nargs="*", default=[1000, 3000, 6000])
+    parser.add_argument("--angles", type=float, nargs="*", default=[0.0, 0.5, 1.0], help="页面倾斜角度（度）")
+    parser.add_argument("--row-pitch", type=float, default=70.0, help="行距（像素）")
+    parser.add_argument("--box-height", type=float, default=40.0, help="文本框高度（像素）")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"行距 {args.row_pitch}px, 文本框高度 {args.box_height}px, 每行40个文本框")
+    print()
+    print(f"{'文本框数':>8}{'倾斜(°)':>8}{'原实现(ms)':>12}{'正确率':>8}{'向量化(ms)':>12}{'正确率':>8}")
+    print("-" * 60)
+
+    for box_count in args.boxes:
+        for angle in args.angles:
+            boxes, truth = synthetic_page(box_count, angle, args.row_pitch, args.box_height)
+            old_rows, old_ms = timed(lambda: legacy_rows(boxes), args.repeat)
+            layout, new_ms = timed(lambda: build_layout(boxes), args.repeat)
+            print(
+                f"{box_count:>8}{angle:>8.1f}"
+                f"{old_ms:>12.2f}{row_accuracy(old_rows, truth):>8.0%}"
+                f"{new_ms:>12.2f}{row_accuracy(layout.rows, truth):>8.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+报文解析基准测试
+
+按报文格式生成带头部的随机报文（组间空格与少量标点，个别字符为易混字母或未识别占位符），
+测量OCR结果解析（含/不含逐字符置信度）与参照报文解析的耗时，
+并给出每组耗时以检查解析耗时是否随组数线性增长
+
+用法（在 backend 目录下）:
+    python -m benchmarks.bench_parse
+    python -m benchmarks.bench_parse --groups 300 10000 100000 --format 5x20x10x50 --repeat 3
+"""
+import argparse
+import logging
+import random
+import time
+
+from app.formats import get_format
+from app.message_parser import create_parser, create_parser_v2
+
+# 替换个别字符的易混字母与未识别占位符、组间偶尔出现的标点
+NOISE = "OlSB?"
+SEPARATORS = [" "] * 20 + [" , ", "  ", " . "]
+
+
+def make_lines(rng, message_format, count: int):
+    """生成 count 组的报文行（头部3行 + 主体）"""
+    width = message_format.digits_per_group
+    lines = ["报文手抄练习", f"组数：{count}组", "时间：2026-01-29 09:00:00"]
+    groups = []
+    for _ in range(count):
+        group = [str(rng.randrange(10)) for _ in range(width)]
+        if rng.random() < 0.02:
+            group[rng.randrange(width)] = rng.choice(NOISE)
+        groups.append("".join(group))
+    per_line = message_format.groups_per_line
+    for start in range(0, count, per_line):
+        row = groups[start:start + per_line]
+        lines.append("".join(g + rng.choice(SEPARATORS) for g in row[:-1]) + row[-1])
+    return lines
+
+
+def timed(func, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="报文解析基准测试")
+    parser.add_argument("--groups", type=int, nargs="*", default=[300, 10000, 100000])
+    parser.add_argument("--format", default=None, help="报文格式名或格式串，默认为 MESSAGE_FORMAT")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    message_format = get_format(args.format)
+    message_parser = create_parser(message_format)
+    reference_parser = create_parser_v2(message_format)
+
+    print(f"报文格式: {message_format.name} ({message_format.spec})")
+    print(
+        f"{'组数':>8}{'解析(ms)':>12}{'us/组':>8}{'含置信度(ms)':>14}{'us/组':>8}"
+        f"{'参照(ms)':>12}{'us/组':>8}"
+    )
+    print("-" * 72)
+
+    for count in args.groups:
+        rng = random.Random(args.seed)
+        lines = make_lines(rng, message_format, count)
+        confidences = [[rng.random() for _ in line] for line in lines]
+        text = "\n".join(lines)
+
+        content, parse_ms = timed(lambda: message_parser.parse_message(lines), args.repeat)
+        _, conf_ms = timed(lambda: message_parser.parse_message(lines, confidences), args.repeat)
+        _, ref_ms = timed(lambda: reference_parser.parse_txt_content(text), args.repeat)
+        if content.group_count != count:
+            print(f"警告: 解析得到 {content.group_count} 组，应为 {count} 组")
+
+        print(
+            f"{count:>8}"
+            f"{parse_ms:>12.2f}{parse_ms * 1000 / count:>8.2f}"
+            f"{conf_ms:>14.2f}{conf_ms * 1000 / count:>8.2f}"
+            f"{ref_ms:>12.2f}{ref_ms * 1000 / count:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
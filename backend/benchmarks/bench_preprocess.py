@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+图像预处理预设基准测试
+
+对样例PDF的每一页运行各预处理预设，统计各步骤耗时；
+若已安装PaddleOCR，同时进行识别并与参照报文比对，统计错误数作为准确度
+
+用法（在 backend 目录下）:
+    python -m benchmarks.bench_preprocess
+    python -m benchmarks.bench_preprocess --pdf ../sample/test_message.pdf --noise 15
+"""
+import argparse
+import glob
+import logging
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+from app.ocr_processor import OCRProcessor
+from app.message_parser import create_parser, create_parser_v2
+from app.comparator import create_comparator
+from app.preprocessing import PRESETS, create_pipeline
+
+SAMPLE_DIR = Path(__file__).resolve().parent.parent.parent / "sample"
+
+
+def ocr_available() -> bool:
+    try:
+        import paddleocr  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def add_noise(image: np.ndarray, sigma: float, seed: int = 0) -> np.ndarray:
+    """叠加高斯噪声，模拟低质量扫描"""
+    rng = np.random.default_rng(seed)
+    noisy = image.astype(np.float32) + rng.normal(0, sigma, image.shape)
+    return np.clip(noisy, 0, 255).astype(np.uint8)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="图像预处理预设基准测试")
+    parser.add_argument("--pdf", nargs="*", default=sorted(glob.glob(str(SAMPLE_DIR / "*.pdf"))))
+    parser.add_argument("--reference", default=str(SAMPLE_DIR / "standard_reference.txt"))
+    parser.add_argument("--presets", nargs="*", default=list(PRESETS))
+    parser.add_argument("--noise", type=float, default=0.0, help="叠加的高斯噪声标准差")
+    parser.add_argument("--no-ocr", action="store_true", help="只测耗时，不做识别")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    with_ocr = not args.no_ocr and ocr_available()
+    reference = create_parser_v2().parse_txt_file(args.reference) if with_ocr else None
+    comparator = create_comparator()
+    message_parser = create_parser()
+
+    loader = OCRProcessor()
+    pages = []
+    for pdf_path in args.pdf:
+        for image in loader.iter_pdf_images(pdf_path):
+            pages.append(add_noise(image, args.noise) if args.noise > 0 else image)
+    print(f"共 {len(pages)} 页, 噪声 sigma={args.noise}, 识别比对: {'是' if with_ocr else '否（未安装PaddleOCR）'}")
+    print()
+
+    header = f"{'预设':<10}{'预处理(ms/页)':>14}{'识别(ms/页)':>14}{'错误数':>8}  各步骤耗时(ms/页)"
+    print(header)
+    print("-" * 100)
+
+    for preset in args.presets:
+        pipeline = create_pipeline(preset)
+        stage_totals = defaultdict(float)
+        preprocess_total = 0.0
+        for image in pages:
+            start = time.perf_counter()
+            image, _ = pipeline.prepare_page(image)
+            if pipeline.deskew:
+                stage_totals['deskew'] += time.perf_counter() - start
+                preprocess_total += time.perf_counter() - start
+            _, timings = pipeline.run(image)
+            for name, seconds in timings.items():
+                stage_totals[name] += seconds
+            preprocess_total += sum(timings.values())
+
+        ocr_ms = "-"
+        errors = "-"
+        if with_ocr:
+            processor = OCRProcessor(preprocess_preset=preset)
+            lines = []
+            start = time.perf_counter()
+            for image in pages:
+                page_lines, _ = processor.process_page(image)
+                lines.extend(page_lines)
+            ocr_ms = f"{(time.perf_counter() - start) * 1000 / len(pages):.0f}"
+            content = message_parser.parse_message(lines)
+            _, _, error_count = comparator.compare_with_tolerance(content, reference)
+            errors = str(error_count)
+
+        stages = ", ".join(
+            f"{name} {seconds * 1000 / len(pages):.1f}" for name, seconds in stage_totals.items()
+        )
+        print(f"{preset:<10}{preprocess_total * 1000 / len(pages):>14.1f}{ocr_ms:>14}{errors:>8}  {stages}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""测试配置：以 backend 目录为导入根目录"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,117 @@
+"""带宽受限序列对齐测试（与穷举编辑距离动态规划对照）"""
+import random
+
+import numpy as np
+
+from app.alignment import align_groups
+from app.comparator import MessageComparator
+from app.formats import STANDARD_FORMAT
+from app.group_table import GroupTableBuilder
+from app.models import MessageContent
+
+
+def edit_distance(reference, submitted) -> int:
+    """完整的编辑距离动态规划（替换、缺失、多余各计1）"""
+    n, m = len(reference), len(submitted)
+    previous = list(range(m + 1))
+    for i in range(1, n + 1):
+        current = [i] + [0] * m
+        for j in range(1, m + 1):
+            current[j] = min(
+                previous[j - 1] + (reference[i - 1] != submitted[j - 1]),
+                previous[j] + 1,
+                current[j - 1] + 1
+            )
+        previous = current
+    return previous[m]
+
+
+def check_edits(reference, submitted, edits):
+    """按编辑操作逐组走完两序列：编辑之间的组须相同，编辑位置须与当前位置一致"""
+    i = j = 0
+    for op, ei, ej in edits:
+        while (i, j) != (ei, ej):
+            assert reference[i] == submitted[j]
+            i += 1
+            j += 1
+        if op == "mismatch":
+            assert reference[i] != submitted[j]
+            i += 1
+            j += 1
+        elif op == "missing":
+            i += 1
+        else:
+            j += 1
+    assert list(reference[i:]) == list(submitted[j:])
+
+
+def mutate(rng, values, count):
+    values = list(values)
+    for _ in range(count):
+        op = rng.choice(("replace", "delete", "insert")) if values else "insert"
+        k = rng.randrange(len(values) + (op == "insert"))
+        if op == "replace":
+            values[k] = rng.randrange(10)
+        elif op == "delete":
+            del values[k]
+        else:
+            values.insert(k, rng.randrange(10))
+    return values
+
+
+def test_matches_brute_force_edit_distance():
+    rng = random.Random(7)
+    for _ in range(300):
+        reference = [rng.randrange(10) for _ in range(rng.randrange(0, 40))]
+        submitted = mutate(rng, reference, rng.randrange(0, 8))
+        expected = edit_distance(reference, submitted)
+
+        edits = align_groups(np.array(reference), np.array(submitted), max_edits=40)
+        assert edits is not None
+        assert len(edits) == expected
+        check_edits(reference, submitted, edits)
+
+
+def test_gives_up_beyond_max_edits():
+    rng = random.Random(3)
+    for _ in range(100):
+        reference = [rng.randrange(10) for _ in range(30)]
+        submitted = mutate(rng, reference, 6)
+        expected = edit_distance(reference, submitted)
+        for limit in range(0, expected + 2):
+            edits = align_groups(np.array(reference), np.array(submitted), max_edits=limit)
+            assert (edits is None) == (limit < expected)
+
+
+def make_content(values) -> MessageContent:
+    builder = GroupTableBuilder(STANDARD_FORMAT)
+    for start in range(0, len(values), STANDARD_FORMAT.groups_per_line):
+        builder.add_line(values[start:start + STANDARD_FORMAT.groups_per_line])
+    return MessageContent(table=builder.build())
+
+
+def test_dropped_group_is_one_error():
+    """漏抄一组只计一处缺失，其后各组不再整体错位"""
+    rng = random.Random(11)
+    reference = [f"{rng.randrange(10000):04d}" for _ in range(3000)]
+    submitted = reference[:5] + reference[6:]
+
+    positional = MessageComparator(align=False).compare(make_content(submitted), make_content(reference))
+    assert positional[2] > 2000
+
+    errors, total, count = MessageComparator(align=True, max_edits=50).compare(
+        make_content(submitted), make_content(reference)
+    )
+    assert (total, count) == (3000, 1)
+    assert (errors[0].error_type, errors[0].global_index) == ("missing", 5)
+
+
+def test_inserted_group_is_one_extra():
+    reference = [f"{i:04d}" for i in range(100)]
+    submitted = reference[:40] + ["9999"] + reference[40:]
+
+    errors, _, count = MessageComparator(align=True, max_edits=50).compare(
+        make_content(submitted), make_content(reference)
+    )
+    assert count == 1
+    assert (errors[0].error_type, errors[0].global_index, errors[0].submitted_value) == ("extra", 40, "9999")
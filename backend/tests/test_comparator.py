@@ -0,0 +1,93 @@
+"""逐位置向量化比对测试"""
+import pytest
+
+from app.comparator import MessageComparator, diff_tables
+from app.formats import STANDARD_FORMAT, parse_format_spec
+from app.group_table import GroupTable, GroupTableBuilder
+from app.models import MessageContent
+
+
+def make_table(values, raw_values=None, message_format=STANDARD_FORMAT) -> GroupTable:
+    builder = GroupTableBuilder(message_format)
+    per_line = message_format.groups_per_line
+    for start in range(0, len(values), per_line):
+        builder.add_line(
+            values[start:start + per_line],
+            None,
+            raw_values[start:start + per_line] if raw_values is not None else None
+        )
+    return builder.build()
+
+
+REFERENCE = [f"{i * 7 % 10000:04d}" for i in range(30)]
+
+
+def test_identical_tables_have_no_errors():
+    diff = diff_tables(make_table(REFERENCE), make_table(REFERENCE))
+    assert diff.error_count == 0
+    assert diff.total_groups == 30
+
+
+def test_mismatches_are_positions_that_differ():
+    submitted = list(REFERENCE)
+    for index in (0, 11, 29):
+        submitted[index] = "9999"
+    diff = diff_tables(make_table(submitted), make_table(REFERENCE))
+
+    assert diff.mismatched.tolist() == [0, 11, 29]
+    assert diff.mismatched_submitted.tolist() == [0, 11, 29]
+    assert len(diff.missing) == 0 and len(diff.extra) == 0
+
+
+def test_short_submission_reports_missing_tail():
+    submitted = list(REFERENCE[:24])
+    submitted[3] = "0000"
+    diff = diff_tables(make_table(submitted), make_table(REFERENCE))
+
+    assert diff.mismatched.tolist() == [3]
+    assert diff.missing.tolist() == list(range(24, 30))
+    assert diff.missing_at.tolist() == [24] * 6
+    assert len(diff.extra) == 0
+
+
+def test_long_submission_reports_extra_tail():
+    submitted = REFERENCE + ["1111", "2222"]
+    diff = diff_tables(make_table(submitted), make_table(REFERENCE))
+
+    assert len(diff.mismatched) == 0
+    assert diff.extra.tolist() == [30, 31]
+    assert diff.extra_at.tolist() == [30, 30]
+
+
+def test_raw_compares_values_before_correction():
+    raw = list(REFERENCE)
+    raw[5] = "O" + REFERENCE[5][1:]
+    submitted = make_table(REFERENCE, raw)
+    reference = make_table(REFERENCE)
+
+    assert diff_tables(submitted, reference).error_count == 0
+    assert diff_tables(submitted, reference, raw=True).mismatched.tolist() == [5]
+
+
+def test_format_mismatch_is_rejected():
+    wide = parse_format_spec("5x10x10x3")
+    with pytest.raises(ValueError):
+        diff_tables(make_table(["12345"], message_format=wide), make_table(REFERENCE))
+
+
+def test_compare_builds_errors_in_position_order():
+    submitted = list(REFERENCE[:28])
+    submitted[12] = "0000"
+    comparator = MessageComparator(align=False)
+    errors, total, count = comparator.compare(
+        MessageContent(table=make_table(submitted)),
+        MessageContent(table=make_table(REFERENCE))
+    )
+
+    assert (total, count) == (30, 3)
+    assert [(e.error_type, e.global_index) for e in errors] == [
+        ("mismatch", 12), ("missing", 28), ("missing", 29)
+    ]
+    assert (errors[0].segment, errors[0].line, errors[0].position) == (1, 2, 3)
+    assert errors[0].submitted_value == "0000"
+    assert errors[1].submitted_value == "(缺失)"
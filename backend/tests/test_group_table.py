@@ -0,0 +1,77 @@
+"""数字组紧凑存储测试"""
+import numpy as np
+
+from app.formats import STANDARD_FORMAT
+from app.group_table import GroupTable, GroupTableBuilder
+from app.models import MessageContent, MessageGroup
+
+
+def make_groups():
+    """两段：第1段10行（第2行只有3组），第2段1行（4组），含置信度与修正前的值"""
+    groups = []
+    rows = [(1, line, 3 if line == 2 else 10) for line in range(1, 11)] + [(2, 1, 4)]
+    index = 0
+    for segment, line, count in rows:
+        for position in range(1, count + 1):
+            groups.append(MessageGroup(
+                segment=segment,
+                line=line,
+                position=position,
+                value=f"{index * 37 % 10000:04d}",
+                global_index=index,
+                confidence=None if index % 5 == 0 else round(0.5 + index / 100, 2),
+                raw_value="1O23" if index == 7 else None
+            ))
+            index += 1
+    return groups
+
+
+def test_groups_round_trip():
+    groups = make_groups()
+    content = MessageContent(groups=groups)
+
+    table = content.table
+    assert len(table) == len(groups)
+    assert table.digits == "".join(group.value for group in groups)
+    assert table.line_starts.tolist() == [0, 10, 13, 23, 33, 43, 53, 63, 73, 83, 93]
+    assert content.groups == groups
+
+
+def test_json_round_trip():
+    content = MessageContent(groups=make_groups(), raw_text="raw")
+    restored = MessageContent.model_validate_json(content.model_dump_json())
+
+    assert restored.groups == content.groups
+    assert restored.raw_text == "raw"
+    assert restored.message_format == STANDARD_FORMAT.spec
+
+
+def test_locations_follow_segment_layout():
+    table = MessageContent(groups=make_groups()).table
+    segments, lines, positions = table.locations(np.array([0, 9, 10, 12, 13, 92, 93, 96]))
+
+    assert segments.tolist() == [1, 1, 1, 1, 1, 1, 2, 2]
+    assert lines.tolist() == [1, 1, 2, 2, 3, 10, 1, 1]
+    assert positions.tolist() == [1, 10, 1, 3, 1, 10, 1, 4]
+
+
+def test_builder_keeps_raw_values_only_when_corrected():
+    builder = GroupTableBuilder(STANDARD_FORMAT)
+    builder.add_line(["1234", "5678"], [0.9, None])
+    table = builder.build()
+    assert table.raw_digits is None
+    assert table.confidence_at(0) == 0.9
+    assert table.confidence_at(1) is None
+
+    builder = GroupTableBuilder(STANDARD_FORMAT)
+    builder.add_line(["1234", "5678"], None, ["1234", "S678"])
+    table = builder.build()
+    assert table.raw_value(1) == "S678"
+    assert [group.raw_value for group in table.to_groups()] == [None, "S678"]
+
+
+def test_empty_table():
+    table = GroupTable()
+    assert len(table) == 0
+    assert table.to_groups() == []
+    assert MessageContent().group_count == 0
@@ -0,0 +1,88 @@
+"""报文解析测试"""
+import pytest
+
+from app.formats import STANDARD_FORMAT, parse_format_registry, parse_format_spec
+from app.message_parser import MessageParser, create_parser, create_parser_v2
+from app.normalization import create_normalizer, parse_confusion_map
+
+HEADER = ["报文手抄练习", "组数：300组", "时间：2026-01-29 09:00:00"]
+
+
+def test_confusable_text_line_is_not_data():
+    """易混字母组成的文字行不因修正为数字而被计为数据行"""
+    lines = HEADER + [
+        "lOl SOS BOB lOl SOS",
+        "1234 5678 9O12 3456 789l 2345 6789 0123 4567 8901",
+    ]
+    content = create_parser().parse_message(lines)
+
+    assert content.group_count == 10
+    groups = content.groups
+    assert groups[0].value == "1234"
+    assert groups[2].value == "9012"
+    assert groups[2].raw_value == "9O12"
+    assert groups[4].value == "7891"
+
+
+def test_non_default_format():
+    """5位一组、每行8组、每段2行的格式：按格式切分组并推出段、行、组位置"""
+    fmt = parse_format_spec("5x8x2x2", "wide")
+    rows = [" ".join(f"{row}{col}{row}{col}{row}" for col in range(8)) for row in range(4)]
+    content = create_parser(fmt).parse_message(HEADER + rows)
+
+    assert content.message_format == "5x8x2x2"
+    assert content.group_count == 32
+    group = content.groups[17]
+    assert group.value == "21212"
+    assert (group.segment, group.line, group.position) == (2, 1, 2)
+
+    # 同一解析器按请求指定的格式解析
+    standard = create_parser(fmt).parse_message(HEADER + rows, message_format=STANDARD_FORMAT)
+    assert standard.message_format == STANDARD_FORMAT.spec
+    assert standard.groups[0].value == "0000"
+
+
+def test_reference_parser_uses_format():
+    fmt = parse_format_spec("5x8x2x2")
+    text = "\n".join(" ".join("12345" for _ in range(8)) for _ in range(4))
+    content = create_parser_v2(fmt).parse_txt_content(text)
+
+    assert content.group_count == 32
+    assert {group.value for group in content.groups} == {"12345"}
+    assert content.groups[-1].segment == 2
+
+
+def test_format_registry():
+    formats = parse_format_registry("wide=5x8x2x2, long = 4x10x10x30")
+    assert formats["wide"].digits_per_group == 5
+    assert formats["long"].total_groups == 3000
+    assert formats["standard"] is STANDARD_FORMAT
+    with pytest.raises(ValueError):
+        parse_format_registry("broken")
+    with pytest.raises(ValueError):
+        parse_format_spec("4x10")
+
+
+def test_confusion_map_override():
+    """OCR_CONFUSION_MAP 形式的自定义映射：只修正配置中的字符"""
+    parser = MessageParser(create_normalizer("Z:7,q:4"))
+    content = parser.parse_message(HEADER + ["12Z4 5q78 9O12 3456 7890 2345 6789 0123 4567 8901"])
+
+    values = [group.value for group in content.groups]
+    assert values[0] == "1274"
+    assert values[1] == "5478"
+    assert content.groups[1].raw_value == "5q78"
+    # O 不在自定义映射中，不参与分组：其后各组依次前移，行末不足一组以占位符补齐
+    assert values[2] == "9123"
+    assert values[-1] == "901?"
+
+    # 不修正时易混字符不参与分组
+    plain = MessageParser().parse_message(HEADER + ["12Z4 5678 9012 3456 7890"])
+    assert plain.groups[0].value == "1245"
+
+
+def test_confusion_map_spec_errors():
+    assert parse_confusion_map(" O:0 , l:1 ,") == {"O": "0", "l": "1"}
+    for spec in ("O0", "O:x", "OO:0", "O:00"):
+        with pytest.raises(ValueError):
+            parse_confusion_map(spec)
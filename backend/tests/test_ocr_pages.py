@@ -0,0 +1,123 @@
+"""逐页并行识别与串行识别输出一致性测试（以桩引擎代替PaddleOCR）"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import fitz
+import numpy as np
+import pytest
+
+from app.ocr_processor import OCRProcessor, bounded_map
+
+# 各页绘制的色块数（0 表示该页为文本层页面），色块数不同使各页识别结果不同
+PAGE_BLOCKS = [3, 0, 1, 5, 2, 4]
+TEXT_PAGE_LINES = [
+    "1111 2222 3333 4444 5555",
+    "6666 7777 8888 9999 0000",
+    "1234 5678 9012 3456 7890",
+]
+
+
+class StubEngine:
+    """
+    桩OCR引擎
+
+    以图像中的色块数作为该页的标识，返回 3 行 x 4 个文本框的识别结果；
+    色块少的页面识别得更慢，使并行识别时各页完成顺序与页序不同
+    """
+
+    def ocr(self, image, cls=True):
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        blocks = cv2.connectedComponents((gray < 128).astype(np.uint8))[0] - 1
+        time.sleep(0.02 * (6 - blocks))
+        lines = []
+        for row in range(3):
+            for col in range(4):
+                x, y = 10 + col * 60, 10 + row * 40
+                box = [[x, y], [x + 50, y], [x + 50, y + 30], [x, y + 30]]
+                lines.append([box, (f"{blocks:04d}{row}{col}", 0.95)])
+        return [lines]
+
+
+@pytest.fixture(scope="module")
+def pdf_path(tmp_path_factory):
+    """生成测试PDF：色块页走OCR，含数字组的文字页走文本层"""
+    path = tmp_path_factory.mktemp("pdf") / "pages.pdf"
+    doc = fitz.open()
+    for blocks in PAGE_BLOCKS:
+        page = doc.new_page(width=200, height=200)
+        if blocks == 0:
+            for i, line in enumerate(TEXT_PAGE_LINES):
+                page.insert_text((10, 30 + i * 20), line, fontsize=9)
+        for i in range(blocks):
+            page.draw_rect(fitz.Rect(10 + i * 30, 60, 30 + i * 30, 140), color=(0, 0, 0), fill=(0, 0, 0))
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def make_processor() -> OCRProcessor:
+    processor = OCRProcessor(layout_mode="detect", adaptive=False, preprocess_preset="none")
+    processor._ocr = StubEngine()
+    return processor
+
+
+def test_parallel_pages_match_serial(pdf_path):
+    serial = make_processor().process_pdf(pdf_path)
+    threaded = make_processor().process_pdf(pdf_path, page_workers=4)
+
+    # 模拟OCR进程池：各页交给另一个处理器实例（相当于工作进程）并行识别
+    worker = make_processor()
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        mapped = make_processor().process_pdf(
+            pdf_path,
+            page_mapper=lambda images: bounded_map(executor, worker.process_page, images, 3)
+        )
+
+    assert threaded == serial
+    assert mapped == serial
+
+
+def test_page_order_preserved(pdf_path):
+    recognition = make_processor().process_pdf(pdf_path, page_workers=4)
+    lines, results = recognition.lines, recognition.results
+
+    ocr_pages = sum(1 for blocks in PAGE_BLOCKS if blocks)
+    assert len(lines) == ocr_pages * 3 + len(TEXT_PAGE_LINES)
+    assert len(results) == ocr_pages * 12 + len(TEXT_PAGE_LINES)
+
+    # 每页3行，行首文本框为 "<页标识>00"；文本层页面的行原样插在其页序位置
+    page_ids = []
+    index = 0
+    for blocks in PAGE_BLOCKS:
+        if blocks == 0:
+            assert lines[index:index + len(TEXT_PAGE_LINES)] == TEXT_PAGE_LINES
+            index += len(TEXT_PAGE_LINES)
+            continue
+        page_ids.append(int(lines[index].split()[0][:4]))
+        index += 3
+
+    assert page_ids == [blocks for blocks in PAGE_BLOCKS if blocks]
+
+
+def test_adaptive_reports_escalations(pdf_path):
+    """自适应识别中升级的区域随识别结果返回"""
+    processor = OCRProcessor(layout_mode="detect", adaptive=True, preprocess_preset="none")
+    processor._ocr = StubEngine()
+    recognition = processor.process_pdf(pdf_path)
+
+    # 桩引擎每行24位数字，不足一整行，各OCR页的每行都升级为高分辨率识别
+    assert recognition.escalations
+    assert {region.reason for region in recognition.escalations} == {"digit_count"}
+    ocr_pages = {page for page, blocks in enumerate(PAGE_BLOCKS, 1) if blocks}
+    assert {region.page for region in recognition.escalations} == ocr_pages
+
+
+def test_page_routes_reported(pdf_path):
+    """各页的处理路径（文本层或OCR）随识别结果返回"""
+    recognition = make_processor().process_pdf(pdf_path)
+
+    assert [route.page for route in recognition.routes] == list(range(1, len(PAGE_BLOCKS) + 1))
+    assert [route.route for route in recognition.routes] == [
+        "ocr" if blocks else "text" for blocks in PAGE_BLOCKS
+    ]
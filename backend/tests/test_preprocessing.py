@@ -0,0 +1,39 @@
+"""倾斜校正坐标一致性测试"""
+import cv2
+import numpy as np
+
+from app.ocr_processor import OCRProcessor
+from app.preprocessing import create_pipeline
+
+
+def make_skewed_page(angle: float) -> np.ndarray:
+    page = np.full((800, 1000, 3), 255, np.uint8)
+    for row in range(8):
+        cv2.putText(page, "1234 5678 9012 3456", (50, 80 + row * 80),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 0), 3)
+    matrix = cv2.getRotationMatrix2D((500, 400), angle, 1.0)
+    return cv2.warpAffine(page, matrix, (1000, 800), borderValue=(255, 255, 255))
+
+
+def test_run_keeps_geometry():
+    """逐区域预处理不旋转图像，识别框坐标与输入图像一致"""
+    pipeline = create_pipeline("adaptive")
+    page = make_skewed_page(3)
+    gray, timings = pipeline.run(page)
+    assert "deskew" not in timings
+    assert "deskew" in pipeline.signature()
+    assert gray.shape == page.shape[:2]
+
+
+def test_page_points_map_back_to_page():
+    """倾斜校正后图像中的点能映射回未旋转页面中的同一位置"""
+    pipeline = create_pipeline("adaptive")
+    page = make_skewed_page(3)
+    deskewed, matrix = pipeline.prepare_page(page)
+    assert matrix is not None
+    assert deskewed.shape == page.shape
+
+    points = np.array([[100.0, 200.0], [900.0, 700.0]])
+    rotated = points @ matrix[:, :2].T + matrix[:, 2]
+    np.testing.assert_allclose(OCRProcessor._page_points(rotated, matrix), points, atol=1e-6)
+    np.testing.assert_allclose(OCRProcessor._page_points(points, None), points)
@@ -0,0 +1,42 @@
+"""参照报文库存取测试"""
+from app.formats import parse_format_spec
+from app.reference_library import ReferenceLibrary
+
+REFERENCE_TEXT = "\n".join(
+    " ".join(f"{(row * 10 + col) % 10000:04d}" for col in range(10)) for row in range(10)
+).encode("utf-8")
+
+
+def test_get_info_does_not_read_content(tmp_path):
+    library = ReferenceLibrary(tmp_path)
+    info = library.add(REFERENCE_TEXT, "ref.txt")
+    assert (tmp_path / f"{info.id}.info.json").exists()
+
+    # 新实例：条目信息只读信息文件，内容文件损坏也不影响
+    (tmp_path / f"{info.id}.json").write_text("broken", encoding="utf-8")
+    fresh = ReferenceLibrary(tmp_path)
+    assert fresh.get_info(info.id) == info
+    assert [item.id for item in fresh.list()] == [info.id]
+
+
+def test_get_checks_cache_before_disk(tmp_path):
+    library = ReferenceLibrary(tmp_path)
+    info = library.add(REFERENCE_TEXT, "ref.txt")
+    content = library.get(info.id)
+    assert content.group_count == 100
+
+    # 缓存命中时不再读取内容文件
+    (tmp_path / f"{info.id}.json").unlink()
+    assert library.get(info.id) is content
+    assert library.get("0000000000ff") is None
+    assert library.get("../etc") is None
+
+
+def test_get_other_format_reparses(tmp_path):
+    library = ReferenceLibrary(tmp_path)
+    info = library.add(REFERENCE_TEXT, "ref.txt")
+    wide = parse_format_spec("4x20x5x1")
+    content = ReferenceLibrary(tmp_path).get(info.id, wide)
+    assert content.message_format == wide.spec
+    assert content.group_count == 100
+